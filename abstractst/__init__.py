@@ -8,6 +8,9 @@ class ASTNode(BinaryTreeNode):
     The ASTNode class uses the left child right sibling representation to store the tree structure.
     Each node contains a reference to its node value, left child, and right sibling.
     """
+
+    __slots__ = ()
+
     def __init__(self, value, left=None, right=None):
         super().__init__(value, left, right)
 
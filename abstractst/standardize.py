@@ -46,36 +46,57 @@ class ASTStandardizer:
         
         return True
 
-    def __standardize(self, node:BinaryTreeNode):
+    def __standardize(self, root:BinaryTreeNode):
         """
         Standardize the AST using post order traversal.
         
         AST given by the parser is in the form of a first child right sibling tree.
         Standardized tree is in the form of a binary tree.
 
+        The traversal is iterative, so that deep trees and long lists of siblings do not
+        reach the recursion limit. The nodes are listed in pre-order with the right sibling 
+        before the first child, the reversed list is the post order, and the standardized 
+        subtrees wait on a stack for their parent.
+
         Args: BinaryTreeNode: The root of the AST to be standardized.
 
         Return: Root of the standardized tree.
         """
         
-        if node is None:
+        if root is None:
             return None
-        
-        left = self.__standardize(node.getLeft())
-        right = self.__standardize(node.getRight())
-        node.setLeft(left)
-        
-        transformed_node = None
-        # if the node is a non standardize node, return a copy of it
-        if not ASTStandardizer.check_to_standardize(node):
-            transformed_node = STNode.copy(node)
-        else:
-            # apply the relevent subtree transformation based on the node
-            transformed_node = self.__apply_transformation(node)
-        
-        transformed_node.setRight(right)
-        
-        return transformed_node
+
+        # (node, has a first child, has a right sibling)
+        nodes = []
+        pending = [root]
+        while pending:
+            node = pending.pop()
+            left = node.getLeft()
+            right = node.getRight()
+            nodes.append((node, left is not None, right is not None))
+            if left is not None:
+                pending.append(left)
+            if right is not None:
+                pending.append(right)
+
+        standardized = []
+        for node, has_left, has_right in reversed(nodes):
+            right = standardized.pop() if has_right else None
+            left = standardized.pop() if has_left else None
+            node.setLeft(left)
+        
+            transformed_node = None
+            # if the node is a non standardize node, return a copy of it
+            if not ASTStandardizer.check_to_standardize(node):
+                transformed_node = STNode.copy(node)
+            else:
+                # apply the relevent subtree transformation based on the node
+                transformed_node = self.__apply_transformation(node)
+        
+            transformed_node.setRight(right)
+            standardized.append(transformed_node)
+        
+        return standardized.pop()
         
     def __apply_transformation(self, node:BinaryTreeNode) -> STNode:
         """Calls the relevant transformation function based on the node value."""
@@ -138,11 +159,16 @@ class ASTStandardizer:
 
     @staticmethod
     def __transform_lambda_helper(v_node:BinaryTreeNode)->STNode:
-        if v_node.getRight() is None:
-            return v_node
-        
-        subtree = ASTStandardizer.__transform_lambda_helper(v_node.getRight())
-        lambda_node = STNode.lambda_node(v_node, subtree)
+        """Nests a lambda for each variable of v_node and its siblings, the last sibling is the body."""
+        nodes = []
+        while v_node is not None:
+            nodes.append(v_node)
+            v_node = v_node.getRight()
+
+        # from the innermost lambda out
+        lambda_node = nodes.pop()
+        while nodes:
+            lambda_node = STNode.lambda_node(nodes.pop(), lambda_node)
         return lambda_node
 
     def __transform_lambda(self, node:BinaryTreeNode):
@@ -186,9 +212,11 @@ class ASTStandardizer:
     def __transform_rec(self, node:BinaryTreeNode):
         assign_node:STNode = node.getLeft() # only child
         original_x:STNode = assign_node.getLeft()
+        e:STNode = original_x.getRight()
+        # copy x without e, the copies are given other siblings
+        original_x.setRight(None)
         x1 = STNode.deep_copy(original_x)
         x2 = STNode.deep_copy(original_x)
-        e:STNode = original_x.getRight()
 
         y_star = STNode.ystar_node()
         lambda_ = STNode.lambda_node(x1, e)
@@ -0,0 +1,144 @@
+import concurrent.futures
+import contextlib
+import glob
+import io
+import json
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+from interpreter import Interpreter
+from timelimit import TimeLimit, TimeoutException
+from utils import read_program
+
+
+class BatchRunner:
+    """
+    Evaluates many programs on a pool of worker processes.
+
+    Each program is a job, evaluated by an Interpreter in a worker with its own time limit.
+    The workers are started once, so the startup and the imports are paid once per worker
+    rather than once per program. The result of each job is a dict, written as a JSON line:
+
+        file: The file of the program.
+        status: "ok", "error" if the program could not be read or interpreted, "timeout" if it
+            ran out of time or "crashed" if the worker process died.
+        seconds: The wall time of the job in the worker.
+        output: The output of the program (the tree with -ast or -st), None if it failed.
+        error: The error message, None if it succeeded.
+
+    Attributes:
+        options (dict): The keyword arguments of the Interpreter of each job.
+        switch (str): The switch given to the Interpreter of each job, -ast, -st or None.
+        jobs (int): The number of worker processes.
+        timeout (float): The seconds a job may take, None for no limit.
+    """
+
+    OK = "ok"
+    ERROR = "error"
+    TIMEOUT = "timeout"
+    CRASHED = "crashed"
+
+    DEFAULT_TIMEOUT = 60
+
+    # the characters which make a batch spec a glob rather than a directory or a manifest
+    __GLOB_CHARACTERS = "*?["
+
+    def __init__(self, options = None, switch = None, jobs = None, timeout = DEFAULT_TIMEOUT):
+        self.options = options if options is not None else {}
+        self.switch = switch
+        self.jobs = jobs if jobs is not None else os.cpu_count() or 1
+        self.timeout = timeout
+
+    @staticmethod
+    def files(spec):
+        """
+        Returns the files of a batch spec, sorted unless they are listed by a manifest.
+
+        The spec is a directory, whose files (not hidden, not in subdirectories) are the
+        programs, a glob pattern (** matches any subdirectories), or a manifest file which
+        lists a program on each line. Blank lines and lines starting with # are skipped, and
+        relative paths are relative to the directory of the manifest.
+        """
+        if os.path.isdir(spec):
+            names = sorted(name for name in os.listdir(spec) if not name.startswith("."))
+            return [path for path in (os.path.join(spec, name) for name in names) if os.path.isfile(path)]
+        if any(c in spec for c in BatchRunner.__GLOB_CHARACTERS):
+            return sorted(path for path in glob.glob(spec, recursive=True) if os.path.isfile(path))
+        if not os.path.isfile(spec):
+            raise FileNotFoundError(f"No directory, manifest or files matching {spec}")
+        directory = os.path.dirname(spec)
+        with open(spec, "r") as f:
+            lines = [line.strip() for line in f]
+        return [os.path.join(directory, line) for line in lines if line and not line.startswith("#")]
+
+    def run(self, files):
+        """
+        Evaluates the programs in the files, yields the result of each job as it completes.
+        """
+        files = list(files)
+        if not files:
+            return
+        jobs = max(1, min(self.jobs, len(files)))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs,
+                                                    initializer=Interpreter.raiseRecursionLimit) as pool:
+            futures = {pool.submit(BatchRunner.runJob, file, self.options, self.switch, self.timeout): file
+                       for file in files}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    yield future.result()
+                except BrokenProcessPool as e:
+                    # a worker died (eg. killed or out of memory), the jobs it did not finish fail
+                    yield BatchRunner.__result(futures[future], BatchRunner.CRASHED, 0.0,
+                                               error=str(e) or "The worker process died")
+
+    def write(self, files, out):
+        """
+        Evaluates the programs in the files and writes the result of each job to out as a JSON line.
+
+        Returns the summary of the batch, a dict of the number of files, the number of each
+        status and the wall time of the batch.
+        """
+        summary = {"files": 0, BatchRunner.OK: 0, BatchRunner.ERROR: 0, BatchRunner.TIMEOUT: 0,
+                   BatchRunner.CRASHED: 0}
+        start = time.perf_counter()
+        for result in self.run(files):
+            summary["files"] += 1
+            summary[result["status"]] += 1
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+        summary["seconds"] = round(time.perf_counter() - start, 6)
+        return summary
+
+    @staticmethod
+    def runJob(file, options, switch, timeout):
+        """Evaluates the program in the file, in a worker, and returns the result of the job."""
+        start = time.perf_counter()
+        # the messages the interpreter prints are not part of the output
+        messages = io.StringIO()
+        try:
+            with TimeLimit(timeout), contextlib.redirect_stdout(messages):
+                try:
+                    program = read_program(file)
+                except SystemExit:
+                    # read_program exits on a missing file
+                    raise FileNotFoundError(messages.getvalue().strip() or f"File {file} not found.")
+                interpreter = Interpreter(program, switch, **options)
+                interpreter.interpret()
+                error = interpreter.get_error()
+                output = None if error is not None else interpreter.get_result(switch)
+        except TimeoutException:
+            return BatchRunner.__result(file, BatchRunner.TIMEOUT, time.perf_counter() - start,
+                                        error=f"Timed out after {timeout} seconds")
+        except Exception as e:
+            return BatchRunner.__result(file, BatchRunner.ERROR, time.perf_counter() - start,
+                                        error=f"{e.__class__.__name__}: {e}")
+
+        seconds = time.perf_counter() - start
+        if error is not None:
+            return BatchRunner.__result(file, BatchRunner.ERROR, seconds, error=str(error))
+        return BatchRunner.__result(file, BatchRunner.OK, seconds, output=str(output))
+
+    @staticmethod
+    def __result(file, status, seconds, output = None, error = None):
+        return {"file": file, "status": status, "seconds": round(seconds, 6), "output": output, "error": error}
@@ -0,0 +1,43 @@
+"""
+Benchmark for building tuples with aug.
+
+Builds an n element tuple with the usual recursive aug idiom and reports the time per
+appended item for every engine. With O(1) appends the time per item stays flat as n grows.
+
+Usage: python -m benchmarks.aug [n ...]
+"""
+import sys
+import time
+
+from abstractst.standardize import ASTStandardizer
+from interpreter import Interpreter
+from parser import RPALParser
+
+PROGRAM = """
+let rec Build (N, T) = N eq 0 -> T | Build (N - 1, T aug N)
+in Order (Build ({n}, nil))
+"""
+
+DEFAULT_SIZES = [1000, 4000, 16000]
+
+
+def run(engine, n):
+    """Builds the n element tuple with the engine and returns the seconds it took."""
+    st = ASTStandardizer().standardize(RPALParser(PROGRAM.format(n=n)).parse())
+    machine = Interpreter.ENGINES[engine](st)
+    start = time.perf_counter()
+    machine.evaluate()
+    return time.perf_counter() - start
+
+
+def main(args):
+    sizes = [int(arg) for arg in args] or DEFAULT_SIZES
+    engines = list(Interpreter.ENGINES)
+    print(f"{'n':>8}" + "".join(f"{engine + ' us/item':>16}" for engine in engines))
+    for n in sizes:
+        times = [run(engine, n) for engine in engines]
+        print(f"{n:>8}" + "".join(f"{t / n * 1e6:>16.2f}" for t in times))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,62 @@
+"""
+Benchmark for the batch mode of myrpal.py.
+
+Copies the programs in test_cases/ into a temporary directory until it holds the given
+number of files, then evaluates them once with a python process for each file, as a
+grader running myrpal.py file by file would, and once with the batch mode on one worker
+and on a worker for each core. Reports the wall time and the files evaluated per second.
+
+Usage: python -m benchmarks.batch [files ...]
+"""
+import glob
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MYRPAL = os.path.join(ROOT, "myrpal.py")
+TEST_CASES = os.path.join(ROOT, "test_cases", "*.txt")
+
+DEFAULT_SIZES = [200]
+
+
+def fill(directory, n):
+    """Copies the test cases into the directory until it holds n files."""
+    programs = sorted(glob.glob(TEST_CASES))
+    for i in range(n):
+        program = programs[i % len(programs)]
+        shutil.copy(program, os.path.join(directory, f"{i:06}_{os.path.basename(program)}"))
+
+
+def timed(commands):
+    """Runs the commands one after the other, returns the seconds they took."""
+    start = time.perf_counter()
+    for command in commands:
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+    return time.perf_counter() - start
+
+
+def main(args):
+    sizes = [int(arg) for arg in args] or DEFAULT_SIZES
+    cores = os.cpu_count() or 1
+    print(f"{'files':>6} {'mode':>14} {'seconds':>9} {'files/s':>9}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            fill(directory, n)
+            files = sorted(glob.glob(os.path.join(directory, "*")))
+            modes = {
+                "process/file": [[sys.executable, MYRPAL, "--no-cache", file] for file in files],
+                "batch 1 job": [[sys.executable, MYRPAL, "--no-cache", "--batch", "--jobs=1", directory]],
+                f"batch {cores} jobs": [[sys.executable, MYRPAL, "--no-cache", "--batch", f"--jobs={cores}",
+                                         directory]],
+            }
+            for mode, commands in modes.items():
+                seconds = timed(commands)
+                print(f"{n:>6} {mode:>14} {seconds:>9.2f} {n / seconds:>9.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
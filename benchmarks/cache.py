@@ -0,0 +1,73 @@
+"""
+Benchmark for the cache of compiled programs.
+
+Generates programs of a growing number of definitions and compares the time the front end
+takes to compile them (parsing, standardizing, folding the constants and building the
+control structures) with the time it takes to read them back from the cache, with and
+without the standardized tree the closure engine needs.
+
+Usage: python -m benchmarks.cache [definitions ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from abstractst.standardize import ASTStandardizer
+from cache import ProgramCache
+from cse_machine.control_structures import CSInitializer
+from cse_machine.optimizer import STOptimizer
+from cse_machine.serialize import Serializer
+from interpreter import Interpreter
+from parser import RPALParser
+
+DEFINITION = "let F{i} (X, Y) = X gr Y -> X * {i} + Y | (X - Y, 'v{i}', Y aug X) in\n"
+
+DEFAULT_SIZES = [100, 1000]
+
+REPEAT = 5
+
+
+def build_program(n):
+    """Returns a program of n definitions."""
+    return "".join(DEFINITION.format(i=i) for i in range(n)) + f"Print (F{n - 1} (2, 1))"
+
+
+def compile_program(program):
+    """Runs the front end, returns (tree data, control structures data)."""
+    st = ASTStandardizer().standardize(RPALParser(program).parse())
+    st = STOptimizer().optimize(st)
+    st_data = Serializer.dumpTree(st)
+    return st_data, Serializer.dumpControlStructures(CSInitializer(st).init())
+
+
+def best(func):
+    """Returns the best time of REPEAT calls of func."""
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(args):
+    sizes = [int(arg) for arg in args] or DEFAULT_SIZES
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 100_000))
+    print(f"{'defs':>6} {'compile s':>10} {'load cs s':>10} {'load st s':>10} {'entry KiB':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ProgramCache(directory, Interpreter.VERSION)
+        for n in sizes:
+            program = build_program(n)
+            key = cache.key(program)
+            st_data, cs_data = compile_program(program)
+            cache.storeData(key, cs_data, st_data)
+            compiled = best(lambda: compile_program(program))
+            loaded = best(lambda: cache.load(key))
+            loaded_tree = best(lambda: cache.load(key, withTree=True))
+            size = os.path.getsize(os.path.join(directory, key + ProgramCache.SUFFIX))
+            print(f"{n:>6} {compiled:>10.4f} {loaded:>10.4f} {loaded_tree:>10.4f} {size / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,65 @@
+"""
+Benchmark for the compilation of large programs.
+
+Generates programs with a growing number of lambdas, as a tuple of anonymous functions, as
+a tuple of recursive functions with conditionals and as one function of many parameters
+(lambdas nested as deep as there are parameters), and reports the time of each phase of
+the front end: parsing, standardizing, folding the constants and building the control
+structures. The time per control structure should stay flat as the programs grow.
+
+Usage: python -m benchmarks.compile [lambdas ...]
+"""
+import sys
+import time
+
+from abstractst.standardize import ASTStandardizer
+from cse_machine.control_structures import CSInitializer
+from cse_machine.optimizer import STOptimizer
+from parser import RPALParser
+
+# programs of about n lambdas
+SHAPES = {
+    "fn": lambda n: "Print (Order (" + ", ".join(f"(fn X. X * {i})" for i in range(n)) + "))",
+    # three lambdas and the two deltas of a conditional each
+    "rec": lambda n: ("Print (Order (" + ", ".join(f"(let rec F N = N eq 0 -> {i} | F (N - 1) in F)"
+                                                   for i in range(n // 3)) + "))"),
+    "curried": lambda n: "let F " + " ".join(f"X{i}" for i in range(n)) + " = X0 in Print F",
+}
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+
+def compile_program(program):
+    """Compiles the program, returns the seconds of each phase and the number of control structures."""
+    times = []
+    start = time.perf_counter()
+    ast = RPALParser(program).parse()
+    times.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    st = ASTStandardizer().standardize(ast)
+    times.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    st = STOptimizer().optimize(st)
+    times.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    csMap = CSInitializer(st).init()
+    times.append(time.perf_counter() - start)
+    return times, len(csMap.items())
+
+
+def main(args):
+    sizes = [int(arg) for arg in args] or DEFAULT_SIZES
+    print(f"{'shape':<8} {'lambdas':>8} {'deltas':>8} {'parse s':>8} {'std s':>8} {'opt s':>8} "
+          f"{'cs s':>8} {'us/delta':>9}")
+    for name, build in SHAPES.items():
+        for n in sizes:
+            times, deltas = compile_program(build(n))
+            print(f"{name:<8} {n:>8} {deltas:>8} " + " ".join(f"{t:>8.3f}" for t in times)
+                  + f" {sum(times) / deltas * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
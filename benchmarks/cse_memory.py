@@ -0,0 +1,81 @@
+"""
+Memory benchmark for long running recursive RPAL programs.
+
+Each configuration runs in a fresh python process so that the peak RSS reported by 
+the OS belongs to that run only. A recursive function of a fixed depth is called 
+repeatedly, so the steady-state RSS after the evaluation should not grow with the 
+number of calls, and no environment other than the primitive one should stay alive.
+
+Usage: python -m benchmarks.cse_memory [depth repetitions ...]
+"""
+import gc
+import json
+import subprocess
+import sys
+
+from abstractst.standardize import ASTStandardizer
+from cse_machine import CSEMachine
+from cse_machine.environment import Environment
+from parser import RPALParser
+
+PROGRAM = """
+let rec Count N = N eq 0 -> 0 | 1 + Count (N - 1)
+in let rec Repeat K = K eq 0 -> 0 | Count {depth} + Repeat (K - 1)
+in Repeat {repetitions}
+"""
+
+DEFAULT_RUNS = [(1000, 1), (1000, 10), (1000, 50), (10000, 5)]
+
+
+def rss_kb():
+    """Returns the current resident set size in KB (Linux only, 0 elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        import resource
+        return pages * resource.getpagesize() // 1024
+    except (OSError, ImportError):
+        return 0
+
+
+def measure(depth, repetitions):
+    """Evaluates the program in this process and returns the measurements as a dict."""
+    import resource
+
+    ast = RPALParser(PROGRAM.format(depth=depth, repetitions=repetitions)).parse()
+    cse = CSEMachine(ASTStandardizer().standardize(ast))
+    before = rss_kb()
+    cse.evaluate()
+    gc.collect()
+    return {
+        "steps": cse.stepCount,
+        "rss_before_kb": before,
+        "rss_after_kb": rss_kb(),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "live_envs": sum(1 for o in gc.get_objects() if isinstance(o, Environment)),
+    }
+
+
+def run(depth, repetitions):
+    """Runs measure() in a fresh interpreter and returns its result."""
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.cse_memory", "--child", str(depth), str(repetitions)],
+        capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def main(args):
+    if args[:1] == ["--child"]:
+        print(json.dumps(measure(int(args[1]), int(args[2]))))
+        return
+
+    runs = list(zip(map(int, args[0::2]), map(int, args[1::2]))) or DEFAULT_RUNS
+    print(f"{'depth':>7} {'reps':>5} {'steps':>10} {'start KB':>10} {'peak KB':>10} {'after KB':>10} {'live envs':>10}")
+    for depth, repetitions in runs:
+        r = run(depth, repetitions)
+        print(f"{depth:>7} {repetitions:>5} {r['steps']:>10} {r['rss_before_kb']:>10} "
+              f"{r['peak_rss_kb']:>10} {r['rss_after_kb']:>10} {r['live_envs']:>10}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
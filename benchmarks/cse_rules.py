@@ -0,0 +1,74 @@
+"""
+Per rule microbenchmark of the CSE machine dispatch.
+
+Every case repeats a short pattern of control symbols that exercises one rule, together 
+with the rule 1 steps that push its operands, and reports the time per CSE step. Rules 
+that apply a closure also run the steps of its body, which are listed with the case.
+
+Usage: python -m benchmarks.cse_rules [repetitions]
+"""
+import sys
+import time
+
+from abstractst.standardize import ASTStandardizer
+from cse_machine import CSEMachine
+from cse_machine.symbol import *
+from parser import RPALParser
+
+# delta-1 = [x], delta-2 = [1], delta-3 = [2], delta-4 = [lambda n . delta-5], delta-5 = [n]
+PROGRAM = "(fn x. x) (true -> 1 | 2) (fn f. fn n. n)"
+
+DEFAULT_REPETITIONS = 20000
+
+# (rules, symbols in the order they are evaluated)
+CASES = [
+    ("1 (literal)", lambda: [NameSymbol(1)]),
+    ("1 (identifier)", lambda: [NameSymbol("x", True)]),
+    ("1 (Y*)", lambda: [YStarSymbol()]),
+    ("2", lambda: [LambdaSymbol(1, ["x"])]),
+    ("4, 5 + 1, 2", lambda: [NameSymbol(1), LambdaSymbol(1, ["x"]), GammaSymbol()]),
+    ("6 + 1", lambda: [NameSymbol(1), NameSymbol(2), BinaryOperatorSymbol("+")]),
+    ("7 + 1", lambda: [NameSymbol(1), UnaryOperatorSymbol("neg")]),
+    ("8 + 1", lambda: [NameSymbol(True), BetaSymbol(), DeltaSymbol(3), DeltaSymbol(2)]),
+    ("9 + 1", lambda: [NameSymbol(1), NameSymbol(2), TauSymbol(2)]),
+    ("10 + 1", lambda: [NameSymbol(1), NameSymbol((1, 2)), GammaSymbol()]),
+    ("11, 5 + 1, 2, 9", lambda: [NameSymbol(1), NameSymbol(2), TauSymbol(2),
+                                 LambdaSymbol(1, ["x", "y"]), GammaSymbol()]),
+    ("12 + 1, 2", lambda: [LambdaSymbol(4, ["f"]), YStarSymbol(), GammaSymbol()]),
+    ("13, 12, 4, 5 + 1, 2", lambda: [NameSymbol(1), LambdaSymbol(4, ["f"]), YStarSymbol(),
+                                     GammaSymbol(), GammaSymbol()]),
+    ("14 + 1", lambda: [NameSymbol(1), NameSymbol("Isinteger", True), GammaSymbol()]),
+]
+
+
+def new_machine():
+    """Returns a CSE machine with an empty control, evaluating in an environment binding x."""
+    ast = RPALParser(PROGRAM).parse()
+    cse = CSEMachine(ASTStandardizer().standardize(ast))
+    cse.stack.pushStack(NameSymbol(1))
+    cse.applyLambda(LambdaClosureSymbol(("x",), 1, cse.currentEnv()))
+    cse.control.control.clear()
+    return cse
+
+
+def run(pattern, n):
+    """Evaluates the pattern n times and returns (steps, seconds)."""
+    cse = new_machine()
+    symbols = pattern()[::-1]
+    for _ in range(n):
+        cse.control.control.extend(symbols)
+    start = time.perf_counter()
+    cse.evaluate()
+    return cse.stepCount, time.perf_counter() - start
+
+
+def main(args):
+    n = int(args[0]) if args else DEFAULT_REPETITIONS
+    print(f"{'rules':<22} {'steps':>9} {'ns/step':>9}")
+    for rules, pattern in CASES:
+        steps, elapsed = run(pattern, n)
+        print(f"{rules:<22} {steps:>9} {elapsed / steps * 1e9:>9.0f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,48 @@
+"""
+Per-operation cost of the CSE value stack as its depth grows.
+
+For every depth the stack is filled to that depth and a fixed number of push/pop pairs 
+and top() calls are timed on top of it. The cost per operation should stay flat.
+
+Usage: python -m benchmarks.cse_stack [depth ...]
+"""
+import sys
+import time
+
+from cse_machine.stack import Stack
+from cse_machine.symbol import NameSymbol
+
+DEFAULT_DEPTHS = [10, 1000, 100000, 1000000]
+OPERATIONS = 100000
+
+
+def run(depth):
+    """Returns the nanoseconds per push/pop pair and per top() call at the given depth."""
+    stack = Stack()
+    symbol = NameSymbol(1)
+    for _ in range(depth):
+        stack.pushStack(symbol)
+
+    start = time.perf_counter()
+    for _ in range(OPERATIONS):
+        stack.pushStack(symbol)
+        stack.popStack()
+    push_pop = (time.perf_counter() - start) / OPERATIONS * 1e9
+
+    start = time.perf_counter()
+    for _ in range(OPERATIONS):
+        stack.top()
+    top = (time.perf_counter() - start) / OPERATIONS * 1e9
+    return push_pop, top
+
+
+def main(args):
+    depths = [int(arg) for arg in args] or DEFAULT_DEPTHS
+    print(f"{'depth':>10} {'push+pop ns':>12} {'top ns':>10}")
+    for depth in depths:
+        push_pop, top = run(depth)
+        print(f"{depth:>10} {push_pop:>12.1f} {top:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
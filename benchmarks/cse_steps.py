@@ -0,0 +1,49 @@
+"""
+Steps-per-second benchmark for the CSE machine.
+
+Runs a tail recursive RPAL loop for an increasing number of iterations and reports the
+number of CSE rules applied per second. The larger sizes need far more steps than the
+default python recursion limit would allow with a recursive evaluator.
+
+Usage: python -m benchmarks.cse_steps [iterations ...]
+"""
+import sys
+import time
+
+from abstractst.standardize import ASTStandardizer
+from cse_machine import CSEMachine
+from parser import RPALParser
+
+PROGRAM = """
+let rec Loop (N, Acc) = N eq 0 -> Acc | Loop (N - 1, Acc + N)
+in Loop ({n}, 0)
+"""
+
+DEFAULT_SIZES = [1000, 5000, 20000]
+
+
+def build_st(program):
+    """Parses and standardizes the program."""
+    ast = RPALParser(program).parse()
+    return ASTStandardizer().standardize(ast)
+
+
+def run(n):
+    """Evaluates the loop with n iterations and returns (steps, seconds)."""
+    cse = CSEMachine(build_st(PROGRAM.format(n=n)))
+    start = time.perf_counter()
+    cse.evaluate()
+    elapsed = time.perf_counter() - start
+    return cse.stepCount, elapsed
+
+
+def main(args):
+    sizes = [int(arg) for arg in args] or DEFAULT_SIZES
+    print(f"{'iterations':>12} {'steps':>12} {'seconds':>10} {'steps/s':>12}")
+    for n in sizes:
+        steps, elapsed = run(n)
+        print(f"{n:>12} {steps:>12} {elapsed:>10.3f} {steps / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
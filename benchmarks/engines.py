@@ -0,0 +1,75 @@
+"""
+Compares the evaluation engines of the interpreter.
+
+Every program in test_cases/ is evaluated by every engine. The outputs, and the errors of
+the programs which fail, must be identical, then the evaluation time of each engine is
+reported, together with a few longer programs. Programs an engine handed over to the CSE
+machine (see BytecodeVM and ClosureEngine) are marked with a *.
+
+Usage: python -m benchmarks.engines [engine ...]
+"""
+import glob
+import os
+import sys
+import time
+
+from abstractst.standardize import ASTStandardizer
+from cse_machine.output import BufferSink
+from interpreter import Interpreter
+from parser import RPALParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_CASES = os.path.join(ROOT, "test_cases", "*.txt")
+
+PROGRAMS = {
+    "fib 18": "let rec Fib N = N ls 2 -> N | Fib (N-1) + Fib (N-2) in Print (Fib 18)",
+    "loop 20000": "let rec Loop (N, Acc) = N eq 0 -> Acc | Loop (N - 1, Acc + N) in Print (Loop (20000, 0))",
+    "strings": "let rec Rev S = S eq '' -> '' | Conc (Rev (Stern S)) (Stem S) "
+               "in let rec Rep N = N eq 0 -> '' | Conc (Rev 'abcdefghij') (Rep (N - 1)) in Print (Rep 300)",
+}
+
+ENGINES = list(Interpreter.ENGINES)
+
+
+def run(engine, program):
+    """
+    Evaluates the program and returns ((output, error), seconds, fell back), excluding the front end.
+    The error is None if the program succeeded.
+    """
+    st = ASTStandardizer().standardize(RPALParser(program).parse())
+    output = BufferSink()
+    machine = Interpreter.ENGINES[engine](st, output=output)
+    error = None
+    start = time.perf_counter()
+    try:
+        machine.evaluate()
+    except Exception as e:
+        error = str(e)
+    seconds = time.perf_counter() - start
+    return (output.getvalue(), error), seconds, getattr(machine, "fellBack", False)
+
+
+def main(args):
+    # as myrpal.py does
+    Interpreter.raiseRecursionLimit()
+    engines = args or ENGINES
+    programs = {os.path.basename(f): open(f).read() for f in sorted(glob.glob(TEST_CASES))}
+    programs.update(PROGRAMS)
+
+    print(f"{'program':<18}" + "".join(f"{engine + ' ms':>12}" for engine in engines))
+    totals = dict.fromkeys(engines, 0.0)
+    for name, program in programs.items():
+        outputs = {}
+        row = f"{name:<18}"
+        for engine in engines:
+            outputs[engine], elapsed, fell_back = run(engine, program)
+            totals[engine] += elapsed
+            row += f"{elapsed * 1000:>11.2f}" + ("*" if fell_back else " ")
+        if len(set(outputs.values())) != 1:
+            raise AssertionError(f"{name}: engines disagree: {outputs}")
+        print(row)
+    print(f"{'total':<18}" + "".join(f"{totals[engine] * 1000:>11.2f} " for engine in engines))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
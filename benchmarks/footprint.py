@@ -0,0 +1,108 @@
+"""
+Memory footprint benchmark for tokens, tree nodes and CSE steps.
+
+Builds a large RPAL program (a tuple of many function applications) and measures with
+tracemalloc the memory retained by its tokens and by its AST, and the peak memory of
+the evaluation. The results are reported per token, per AST node and per CSE step,
+together with the size of a single instance of the most common objects.
+
+Usage: python -m benchmarks.footprint [elements]
+"""
+import gc
+import sys
+import tracemalloc
+
+from abstractst.standardize import ASTStandardizer
+from cse_machine import CSEMachine
+from cse_machine.st import STNode
+from cse_machine.symbol import EnvMarkerSymbol, NameSymbol
+from lexer import Lexer
+from lexer.tokens import IdentifierToken
+from parser import RPALParser
+
+PROGRAM = """
+let rec Count N = N eq 0 -> 0 | 1 + Count (N - 1)
+in let Twice f x = f (f x)
+in ({elements})
+"""
+
+ELEMENT = "Twice (fn x. x + {i}) (Count {depth})"
+
+DEFAULT_ELEMENTS = 500
+
+
+def build_program(elements):
+    """Returns a program with a tuple of the given number of elements."""
+    return PROGRAM.format(elements=", ".join(ELEMENT.format(i=i, depth=i % 20) for i in range(elements)))
+
+
+def object_size(obj):
+    """Returns the size of a single instance, including its __dict__ if it has one."""
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def count_nodes(root):
+    """Returns the number of nodes in a left child right sibling tree."""
+    count = 0
+    pending = [root]
+    while len(pending) > 0:
+        node = pending.pop()
+        if node is None:
+            continue
+        count += 1
+        pending.append(node.getLeft())
+        pending.append(node.getRight())
+    return count
+
+
+def traced(fn):
+    """Calls fn and returns (result, retained bytes, peak bytes) as measured by tracemalloc."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn()
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, retained, peak
+
+
+def main(args):
+    elements = int(args[0]) if len(args) > 0 else DEFAULT_ELEMENTS
+    # the tuple elements are siblings, which the tree passes walk recursively
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10 * elements))
+    program = build_program(elements)
+
+    tokens, token_bytes, _ = traced(lambda: Lexer(program).tokenize())
+    n_tokens = len(tokens)
+    del tokens
+
+    ast, ast_bytes, _ = traced(lambda: RPALParser(program).parse())
+    n_nodes = count_nodes(ast)
+    st = ASTStandardizer().standardize(ast)
+    del ast
+
+    def evaluate():
+        cse = CSEMachine(st)
+        cse.evaluate()
+        return cse.stepCount
+
+    steps, _, eval_peak = traced(evaluate)
+
+    print(f"program: {len(program)} chars, {n_tokens} tokens, {n_nodes} AST nodes, {steps} CSE steps")
+    print(f"{'':<22} {'bytes':>12} {'per item':>10}")
+    print(f"{'tokens':<22} {token_bytes:>12} {token_bytes / n_tokens:>10.1f}")
+    print(f"{'AST (incl. tokens)':<22} {ast_bytes:>12} {ast_bytes / n_nodes:>10.1f}")
+    print(f"{'CSE evaluation peak':<22} {eval_peak:>12} {eval_peak / steps:>10.1f}")
+    print()
+    print("size of one instance:")
+    for obj in [IdentifierToken("x", 1, 1), STNode("x"), NameSymbol(1), EnvMarkerSymbol(1)]:
+        print(f"  {obj.__class__.__name__:<20} {object_size(obj):>4} bytes")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,55 @@
+"""
+Benchmark for the throughput of the lexer.
+
+Repeats a program using every kind of token (keywords, identifiers, integers, strings,
+operators, punctuation, comments and spaces) until the source reaches the given size,
+tokenizes it and reports the throughput in MB/s and in tokens per second.
+
+Usage: python -m benchmarks.lexer [megabytes ...]
+"""
+import sys
+import time
+
+from lexer import Lexer
+
+PROGRAM = """// sums the items of a tuple, and prints them with their count
+let Sum (T, N) =
+    let rec Loop I Acc = I gr N -> Acc | Loop (I + 1) (Acc + T I)
+    in Loop 1 0
+within Count T = Order T
+in let Items = (10, 20, 30, 40) aug 50
+and Label = 'items:\\t'
+in Print (Label, Count Items, Sum (Items, Count Items), not (Count Items ls 5) & true)
+where Unused = fn X . X ** 2 - 1 / 3 @ nil;
+"""
+
+DEFAULT_SIZES = [1, 4]
+
+REPEAT = 3
+
+
+def build_source(megabytes):
+    """Returns the program repeated until it is at least the given size."""
+    copies = int(megabytes * 1024 * 1024 / len(PROGRAM)) + 1
+    return PROGRAM * copies
+
+
+def run(source):
+    """Tokenizes the source and returns (tokens, seconds)."""
+    start = time.perf_counter()
+    tokens = Lexer(source).tokenize()
+    return len(tokens), time.perf_counter() - start
+
+
+def main(args):
+    sizes = [float(arg) for arg in args] or DEFAULT_SIZES
+    print(f"{'MB':>6} {'tokens':>10} {'seconds':>9} {'MB/s':>8} {'tokens/s':>12}")
+    for size in sizes:
+        source = build_source(size)
+        megabytes = len(source.encode("utf-8")) / (1024 * 1024)
+        tokens, seconds = min((run(source) for _ in range(REPEAT)), key=lambda result: result[1])
+        print(f"{megabytes:>6.2f} {tokens:>10} {seconds:>9.3f} {megabytes / seconds:>8.2f} {tokens / seconds:>12.0f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
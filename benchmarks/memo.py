@@ -0,0 +1,67 @@
+"""
+Benchmark for the memoization of recursive functions.
+
+Runs naive recursive definitions (Fibonacci numbers, binomial coefficients and lattice path
+counts) with and without memoization on every engine, and reports the evaluation time and
+the hits and misses of the memo table. Without memoization the number of calls grows
+exponentially with the size, with it each distinct call is evaluated once.
+
+Usage: python -m benchmarks.memo [size ...]
+"""
+import sys
+import time
+
+from abstractst.standardize import ASTStandardizer
+from cse_machine.memo import MemoTable
+from interpreter import Interpreter
+from parser import RPALParser
+
+PROGRAMS = {
+    "fib": """
+        let rec Fib N = N ls 2 -> N | Fib (N - 1) + Fib (N - 2)
+        in Fib {n}
+    """,
+    "binomial": """
+        let rec C (N, K) = K eq 0 or K eq N -> 1 | C (N - 1, K - 1) + C (N - 1, K)
+        in C ({n}, {n} / 2)
+    """,
+    "paths": """
+        let rec Paths (X, Y) = X eq 0 or Y eq 0 -> 1 | Paths (X - 1, Y) + Paths (X, Y - 1)
+        in Paths ({n} / 2, {n} / 2)
+    """,
+}
+
+DEFAULT_SIZES = [12, 16]
+
+
+def build_st(program):
+    """Parses and standardizes the program."""
+    ast = RPALParser(program).parse()
+    return ASTStandardizer().standardize(ast)
+
+
+def run(engine, program, memo):
+    """Evaluates the program and returns the seconds it took."""
+    machine = Interpreter.ENGINES[engine](build_st(program), memo=memo)
+    start = time.perf_counter()
+    machine.evaluate()
+    return time.perf_counter() - start
+
+
+def main(args):
+    sizes = [int(arg) for arg in args] or DEFAULT_SIZES
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 100_000))
+    print(f"{'program':<10} {'size':>6} {'engine':>7} {'plain s':>9} {'memo s':>9} {'hits':>8} {'misses':>8}")
+    for name, program in PROGRAMS.items():
+        for n in sizes:
+            for engine in Interpreter.ENGINES:
+                source = program.format(n=n)
+                plain = run(engine, source, None)
+                memo = MemoTable()
+                memoized = run(engine, source, memo)
+                print(f"{name:<10} {n:>6} {engine:>7} {plain:>9.3f} {memoized:>9.3f} "
+                      f"{memo.hits:>8} {memo.misses:>8}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,58 @@
+"""
+Benchmark for lexing memory-mapped source files.
+
+Writes a generated program of the given size to a temporary file, then streams its tokens
+once from the contents read as a string and once from the memory-mapped bytes. Reports the
+time to the first token, the total time and the peak memory allocated by python while
+lexing. The pages of a mapped file belong to the page cache, not to the process heap, so
+only the token window is allocated.
+
+Usage: python -m benchmarks.mmap [megabytes ...]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from lexer import Lexer
+from benchmarks.lexer import build_source
+from utils import map_file, read_file
+
+DEFAULT_SIZES = [8]
+
+
+def run(load, file):
+    """Streams the tokens of the file loaded by load, returns (tokens, first token s, total s, peak bytes)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    tokens = Lexer(load(file)).tokens()
+    first = None
+    count = 0
+    for _ in tokens:
+        if first is None:
+            first = time.perf_counter() - start
+        count += 1
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, first, total, peak
+
+
+def main(args):
+    sizes = [float(arg) for arg in args] or DEFAULT_SIZES
+    print(f"{'MB':>6} {'input':>7} {'tokens':>10} {'first s':>9} {'total s':>9} {'peak MiB':>9}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            file = os.path.join(directory, "program.rpal")
+            with open(file, "w") as f:
+                f.write(build_source(size))
+            megabytes = os.path.getsize(file) / (1024 * 1024)
+            for name, load in [("str", read_file), ("mmap", map_file)]:
+                count, first, total, peak = run(load, file)
+                print(f"{megabytes:>6.1f} {name:>7} {count:>10} {first:>9.4f} {total:>9.2f} "
+                      f"{peak / (1024 * 1024):>9.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,79 @@
+"""
+Benchmark for the output of programs.
+
+Evaluates a program printing a tuple of the given number of strings, with its output
+captured by redirecting sys.stdout into a StringIO (as the interpreter did), collected in a
+BufferSink, written to /dev/null through an FdSink and passed to a callback in chunks.
+Reports the time of the evaluation and the memory python still holds when it returns,
+which is the output kept for the caller: the sinks writing to a file descriptor or a
+callback keep at most a buffer of it.
+
+Usage: python -m benchmarks.output [strings ...]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+from abstractst.standardize import ASTStandardizer
+from cse_machine import CSEMachine
+from cse_machine.control_structures import CSInitializer
+from cse_machine.output import BufferSink, CallbackSink, FdSink
+from parser import RPALParser
+
+PROGRAM = ("let rec Lines N = N eq 0 -> nil | Lines (N - 1) aug 'a line of the output' "
+           "in Print (Lines {n})")
+
+DEFAULT_SIZES = [10_000, 100_000]
+
+
+def evaluate(program, mode, devnull):
+    """Evaluates the program with the output mode, returns what is kept of the output."""
+    csMap = CSInitializer(ASTStandardizer().standardize(RPALParser(program).parse())).init()
+    if mode == "capture":
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            CSEMachine(None, csMap=csMap).evaluate()
+        return output.getvalue()
+    sinks = {
+        "buffer": lambda: BufferSink(),
+        "fd": lambda: FdSink(devnull),
+        "callback": lambda: CallbackSink(lambda chunk: None, bufferSize=FdSink.DEFAULT_BUFFER_SIZE),
+    }
+    sink = sinks[mode]()
+    CSEMachine(None, csMap=csMap, output=sink).evaluate()
+    return sink.getvalue() if mode == "buffer" else None
+
+
+def run(program, mode):
+    """Evaluates the program with the output mode, returns (seconds, bytes held after the evaluation)."""
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    try:
+        start = time.perf_counter()
+        evaluate(program, mode, devnull)
+        seconds = time.perf_counter() - start
+
+        tracemalloc.start()
+        output = evaluate(program, mode, devnull)
+        held, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del output
+    finally:
+        os.close(devnull)
+    return seconds, held
+
+
+def main(args):
+    sizes = [int(arg) for arg in args] or DEFAULT_SIZES
+    print(f"{'strings':>8} {'output':>9} {'seconds':>9} {'held MiB':>9}")
+    for n in sizes:
+        program = PROGRAM.format(n=n)
+        for mode in ["capture", "buffer", "fd", "callback"]:
+            seconds, held = run(program, mode)
+            print(f"{n:>8} {mode:>9} {seconds:>9.3f} {held / (1024 * 1024):>9.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,75 @@
+"""
+Benchmark for the parser.
+
+Parses a program made of many operator expressions and reports the throughput in tokens
+per second, then finds the deepest nesting of parentheses the parser accepts before it
+runs out of recursion.
+
+Usage: python -m benchmarks.parser [definitions ...]
+"""
+import sys
+import time
+
+from lexer import Lexer
+from interpreter import Interpreter
+from parser import RPALParser
+
+DEFINITION = ("V{i} = not (X{i} + 2 * Y ** 2 gr Z - 1 / W) & A @ Max B or C eq -D "
+              "-> (X, Y aug Z) | F X (G Y) {i}\n")
+
+DEFAULT_SIZES = [1000, 4000]
+
+REPEAT = 3
+
+# the deepest nesting tried
+MAX_DEPTH = 200_000
+
+
+def build_program(n):
+    """Returns a program of n simultaneous definitions."""
+    return "let " + "and ".join(DEFINITION.format(i=i) for i in range(n)) + "in Print V0"
+
+
+def parses(program):
+    """Returns True if the program parses within the recursion limit."""
+    try:
+        RPALParser(program).parse()
+        return True
+    except RecursionError:
+        return False
+
+
+def max_depth():
+    """Returns the deepest nesting of parentheses which parses, up to MAX_DEPTH."""
+    low, high = 0, MAX_DEPTH
+    while low < high:
+        depth = (low + high + 1) // 2
+        if parses("(" * depth + "X" + ")" * depth):
+            low = depth
+        else:
+            high = depth - 1
+    return low
+
+
+def timed(program):
+    """Parses the program and returns the seconds it took."""
+    start = time.perf_counter()
+    RPALParser(program).parse()
+    return time.perf_counter() - start
+
+
+def main(args):
+    # as myrpal.py does
+    Interpreter.raiseRecursionLimit()
+    sizes = [int(arg) for arg in args] or DEFAULT_SIZES
+    print(f"{'defs':>6} {'tokens':>8} {'seconds':>9} {'tokens/s':>10}")
+    for n in sizes:
+        program = build_program(n)
+        tokens = len(Lexer(program).tokenize())
+        seconds = min(timed(program) for _ in range(REPEAT))
+        print(f"{n:>6} {tokens:>8} {seconds:>9.3f} {tokens / seconds:>10.0f}")
+    print(f"deepest nesting: {max_depth()} parentheses (recursion limit {sys.getrecursionlimit()})")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
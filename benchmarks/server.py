@@ -0,0 +1,85 @@
+"""
+Benchmark for the evaluation server.
+
+Starts a server on a temporary socket, then evaluates a small program repeatedly: with a
+python process running myrpal.py each time, with a python process running the client each
+time, and with requests sent over the socket from this process, with and without the
+server's cache of compiled programs. Reports the mean latency of each.
+
+Usage: python -m benchmarks.server [requests ...]
+"""
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from protocol import Protocol
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROGRAM = "let rec Fact N = N eq 0 -> 1 | N * Fact (N - 1) in Print (Fact 10, 'done')"
+
+DEFAULT_SIZES = [50]
+
+
+def request(path, cache):
+    """Sends the program to the server and returns the response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        Protocol.send(sock, {"source": PROGRAM, "switch": None, "options": {"cache": cache}})
+        return Protocol.receive(sock)
+
+
+def wait_for(path, timeout = 10):
+    """Waits until the server accepts connections on path."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            request(path, False)
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("The server did not start")
+
+
+def mean(func, n):
+    """Returns the mean seconds of n calls of func."""
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return (time.perf_counter() - start) / n
+
+
+def main(args):
+    sizes = [int(arg) for arg in args] or DEFAULT_SIZES
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "server.sock")
+        file = os.path.join(directory, "program.rpal")
+        with open(file, "w") as f:
+            f.write(PROGRAM)
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT, "server.py"), f"--socket={path}",
+                                   "--workers=1"])
+        try:
+            wait_for(path)
+            run = lambda script, *options: subprocess.run([sys.executable, os.path.join(ROOT, script), *options,
+                                                           "--no-cache", file],
+                                                          stdout=subprocess.DEVNULL, check=True)
+            modes = {
+                "myrpal.py": lambda: run("myrpal.py"),
+                "client.py": lambda: run("client.py", f"--socket={path}"),
+                "request": lambda: request(path, False),
+                "request cached": lambda: request(path, True),
+            }
+            print(f"{'requests':>8} {'mode':>15} {'ms':>8}")
+            for n in sizes:
+                for mode, func in modes.items():
+                    print(f"{n:>8} {mode:>15} {mean(func, n) * 1000:>8.2f}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,127 @@
+"""
+Benchmark and budget for the startup of myrpal.py.
+
+Runs myrpal.py on a small program with -ast, with -st, evaluating it and evaluating it from
+the cache, each under python -X importtime, and reports for each run the time spent
+importing modules beyond a bare python (median of the runs), the wall time of the process
+and the modules which took the longest to import.
+
+Each run has a budget: modules it must not import (eg. the engines when printing the ast)
+and a maximum import time. The benchmark exits with 1 if a budget is exceeded, so it can
+guard the startup against regressions. The import times depend on the machine, the budgets
+leave room for a slower one.
+
+Usage: python -m benchmarks.startup [run ...]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MYRPAL = os.path.join(ROOT, "myrpal.py")
+
+PROGRAM = "let Sum (A, B) = A + B in Print (Sum (1, 2), 'three')"
+
+REPEAT = 7
+
+# the number of modules listed for each run
+TOP = 8
+
+# the modules of the evaluation, which printing the trees does not need
+ENGINE_MODULES = ["cse_machine.machine", "cse_machine.vm", "cse_machine.closures", "cse_machine.control_structures",
+                  "cse_machine.optimizer", "cse_machine.output", "cache"]
+
+# the modules of the batch mode and of the server, and slow modules of the standard library
+# no run needs
+NEVER_IMPORTED = ["batch", "server", "concurrent.futures", "multiprocessing", "json", "typing", "pprint",
+                  "dataclasses", "inspect"]
+
+# the options of each run, with the modules it must not import and its maximum import time in ms
+RUNS = {
+    "ast": (["-ast", "--no-cache"], ENGINE_MODULES + ["abstractst.standardize"] + NEVER_IMPORTED, 40),
+    "st": (["-st", "--no-cache"], ENGINE_MODULES + NEVER_IMPORTED, 40),
+    "evaluate": (["--no-cache"], ["cache", "hashlib"] + NEVER_IMPORTED, 60),
+    "cached": ([], ["parser", "abstractst.standardize"] + NEVER_IMPORTED, 60),
+}
+
+
+def import_times(command):
+    """Runs the command under -X importtime, returns {module: (self us, cumulative us, top level)}."""
+    result = subprocess.run([sys.executable, "-X", "importtime"] + command, cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=False)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        # nested imports are indented by two spaces for each level
+        top_level = len(name) - len(name.lstrip()) == 1
+        times[name.strip()] = (int(own), int(cumulative), top_level)
+    return times
+
+
+def total(times):
+    """Returns the import time of the modules imported, in us."""
+    return sum(cumulative for _, cumulative, top_level in times.values() if top_level)
+
+
+def wall_time(command):
+    """Returns the seconds a python process running the command takes."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable] + command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                   check=False)
+    return time.perf_counter() - start
+
+
+def main(args):
+    runs = args or list(RUNS)
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        file = os.path.join(directory, "program.rpal")
+        with open(file, "w") as f:
+            f.write(PROGRAM)
+        cache = os.path.join(directory, "cache")
+        # fills the cache for the cached run
+        wall_time([MYRPAL, f"--cache-dir={cache}", file])
+
+        bare_samples = [import_times(["-c", "pass"]) for _ in range(REPEAT)]
+        bare = statistics.median(total(times) for times in bare_samples)
+        bare_wall = statistics.median(wall_time(["-c", "pass"]) for _ in range(REPEAT))
+        print(f"bare python: {bare / 1000:.1f} ms importing, {bare_wall * 1000:.1f} ms wall")
+        print(f"{'run':<10} {'import ms':>10} {'budget':>8} {'wall ms':>8}  slowest imports (cumulative ms)")
+
+        for run in runs:
+            options, forbidden, budget = RUNS[run]
+            command = [MYRPAL] + options
+            if run == "cached":
+                command.append(f"--cache-dir={cache}")
+            command.append(file)
+
+            samples = [import_times(command) for _ in range(REPEAT)]
+            imported = statistics.median(total(times) for times in samples) - bare
+            wall = statistics.median(wall_time(command) for _ in range(REPEAT))
+            times = samples[-1]
+            # the modules a bare python imports too are left out
+            slowest = sorted(((cumulative, name) for name, (_, cumulative, top_level) in times.items()
+                              if top_level and name not in bare_samples[-1]), reverse=True)[:TOP]
+            print(f"{run:<10} {imported / 1000:>10.1f} {budget:>8} {wall * 1000:>8.1f}  "
+                  + ", ".join(f"{name} {cumulative / 1000:.1f}" for cumulative, name in slowest))
+
+            unexpected = [name for name in forbidden if name in times]
+            if unexpected:
+                failures.append(f"{run}: imports {', '.join(unexpected)}")
+            if imported / 1000 > budget:
+                failures.append(f"{run}: imports for {imported / 1000:.1f} ms, over the budget of {budget} ms")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        exit(1)
+    print("startup within budget")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
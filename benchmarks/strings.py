@@ -0,0 +1,85 @@
+"""
+Benchmark for string processing with Stem, Stern and Conc.
+
+Runs a string reversal and two tokenizer-style programs (counting the words of a text and
+rewriting its separators) over generated inputs of increasing size, with every engine.
+Stern returns a view and Conc a rope, so the time per character should stay flat as the
+input grows instead of growing linearly with it.
+
+Usage: python -m benchmarks.strings [size ...]
+"""
+import sys
+import time
+
+from abstractst.standardize import ASTStandardizer
+from cse_machine.output import BufferSink
+from interpreter import Interpreter
+from parser import RPALParser
+
+PROGRAMS = {
+    "reverse": """
+        let rec Rev S = S eq '' -> '' | Conc (Rev (Stern S)) (Stem S)
+        in Print (Order (nil aug Rev '{text}'))
+    """,
+    "count words": """
+        let rec Words (S, W, N) =
+            S eq '' -> (W eq '' -> N | N + 1)
+            | Stem S eq ' ' -> Words (Stern S, '', W eq '' -> N | N + 1)
+            | Words (Stern S, Conc W (Stem S), N)
+        in Print (Words ('{text}', '', 0))
+    """,
+    "rewrite": """
+        let rec Map (S, Acc) = S eq '' -> Acc | Map (Stern S, Conc Acc (Stem S eq ' ' -> '_' | Stem S))
+        in Print (Stem (Map ('{text}', '')))
+    """,
+}
+
+WORDS = ["lambda", "gamma", "delta", "rpal", "cse", "machine", "tau", "eta", "beta", "y"]
+
+DEFAULT_SIZES = [10_000, 100_000]
+
+
+def make_text(size):
+    """Returns a text of words separated by spaces, of the given number of characters."""
+    parts = []
+    length = 0
+    i = 0
+    while length < size:
+        word = WORDS[i % len(WORDS)]
+        parts.append(word)
+        length += len(word) + 1
+        i += 1
+    return " ".join(parts)[:size]
+
+
+def run(engine, program):
+    """Evaluates the program and returns (output, seconds), excluding the front end."""
+    st = ASTStandardizer().standardize(RPALParser(program).parse())
+    output = BufferSink()
+    machine = Interpreter.ENGINES[engine](st, output=output)
+    start = time.perf_counter()
+    machine.evaluate()
+    seconds = time.perf_counter() - start
+    return output.getvalue(), seconds
+
+
+def main(args):
+    sizes = [int(arg) for arg in args] or DEFAULT_SIZES
+    engines = list(Interpreter.ENGINES)
+    print(f"{'program':<14} {'size':>8}" + "".join(f"{engine + ' s':>10}{'us/char':>9}" for engine in engines))
+    for name, program in PROGRAMS.items():
+        for size in sizes:
+            source = program.format(text=make_text(size))
+            outputs = set()
+            line = f"{name:<14} {size:>8}"
+            for engine in engines:
+                output, seconds = run(engine, source)
+                outputs.add(output)
+                line += f"{seconds:>10.2f}{seconds / size * 1e6:>9.2f}"
+            if len(outputs) != 1:
+                raise AssertionError(f"the engines disagree on {name}: {outputs}")
+            print(line)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
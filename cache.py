@@ -0,0 +1,276 @@
+import hashlib
+import marshal
+import os
+import sys
+from collections import OrderedDict
+
+from cse_machine.control_structures import ControlStructures
+from cse_machine.serialize import Serializer
+from cse_machine.st import STNode
+
+
+class ProgramCache:
+    """
+    A content-addressed cache of compiled programs on disk.
+
+    An entry holds the control structures of a program and optionally its standardized tree,
+    written with marshal after a magic header. Entries are keyed by a hash of the source, the
+    options it was compiled with, the versions of the interpreter and of the format and the
+    fingerprint of the modules which compile the programs, so an entry is only read by the
+    interpreter which wrote it.
+
+    The version and the fingerprint the entries were written by are kept in a file of the cache
+    directory. When either changes, every entry is removed. Once the entries take more than
+    maxBytes, the least recently used ones are evicted. A hit marks the entry as used by
+    updating its modification time.
+
+    The cache never makes a run fail: entries which can not be read are ignored and removed,
+    and errors writing to the directory are ignored.
+
+    Attributes:
+        directory (str): The cache directory.
+        version (str): The interpreter version.
+        maxBytes (int): The size cap of the entries.
+    """
+
+    MAGIC = b"RPALC\x00"
+    FORMAT_VERSION = 1
+    SUFFIX = ".rpalc"
+    VERSION_FILE = "VERSION"
+
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+    # the packages and modules which build the entries (the front end, the optimizer, the
+    # control structures and their serializer), relative to the directory of this module
+    SOURCES = ["lexer", "parser", "abstractst", "cse_machine/st.py", "cse_machine/operators.py",
+               "cse_machine/optimizer.py", "cse_machine/symbol.py", "cse_machine/functions.py",
+               "cse_machine/control_structures.py", "cse_machine/serialize.py"]
+
+    __fingerprint = None
+
+    def __init__(self, directory, version, maxBytes = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.version = version
+        self.maxBytes = maxBytes
+        self.__checked = False
+
+    @staticmethod
+    def defaultDirectory():
+        """Returns the default cache directory, myrpal in the user's cache directory."""
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        return os.path.join(base, "myrpal")
+
+    @staticmethod
+    def fingerprint():
+        """
+        Returns a hash of the source of the SOURCES, so a change to the code which builds the
+        entries invalidates them without a bump of the interpreter version. Computed once.
+        """
+        if ProgramCache.__fingerprint is None:
+            root = os.path.dirname(os.path.abspath(__file__))
+            digest = hashlib.sha256()
+            for source in ProgramCache.SOURCES:
+                path = os.path.join(root, source)
+                if os.path.isdir(path):
+                    files = sorted(os.path.join(source, name) for name in os.listdir(path) if name.endswith(".py"))
+                else:
+                    files = [source]
+                for file in files:
+                    digest.update(file.encode("utf-8") + b"\0")
+                    try:
+                        with open(os.path.join(root, file), "rb") as f:
+                            digest.update(f.read())
+                    except OSError:
+                        # only the compiled modules are installed
+                        pass
+            ProgramCache.__fingerprint = digest.hexdigest()[:16]
+        return ProgramCache.__fingerprint
+
+    def key(self, program, options = ""):
+        """Returns the key of the program compiled with the given options."""
+        digest = hashlib.sha256()
+        header = (f"{self.FORMAT_VERSION}:{self.version}:{ProgramCache.fingerprint()}:"
+                  f"{sys.implementation.cache_tag}:{options}\n")
+        digest.update(header.encode("utf-8"))
+        # a program given as bytes is ASCII, the same bytes as the string encoded
+        digest.update(program.encode("utf-8") if isinstance(program, str) else program)
+        return digest.hexdigest()
+
+    def load(self, key, withTree = False):
+        """
+        Returns the (control structures, standardized tree) stored for the key, None on a miss.
+
+        The tree is None if it was not requested. An entry without a tree is a miss if the
+        tree is requested.
+        """
+        self.__checkVersion()
+        path = self.__path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        try:
+            if not data.startswith(ProgramCache.MAGIC):
+                raise ValueError("Not a cache entry")
+            format_version, version, cs_data, st_data = marshal.loads(data[len(ProgramCache.MAGIC):])
+            if format_version != ProgramCache.FORMAT_VERSION or version != self.version:
+                raise ValueError("The entry was written by another version")
+            if withTree and st_data is None:
+                return None
+            csMap = Serializer.loadControlStructures(cs_data)
+            st = Serializer.loadTree(st_data) if withTree else None
+        except Exception:
+            # a corrupt or stale entry
+            self.__remove(path)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return csMap, st
+
+    def store(self, key, csMap: ControlStructures, st: STNode = None):
+        """Stores the control structures, and the standardized tree if it is given, for the key."""
+        st_data = None if st is None else Serializer.dumpTree(st)
+        self.storeData(key, Serializer.dumpControlStructures(csMap), st_data)
+
+    def storeData(self, key, cs_data, st_data = None):
+        """Stores control structures and a tree already converted with the Serializer."""
+        self.__checkVersion()
+        data = ProgramCache.MAGIC + marshal.dumps((ProgramCache.FORMAT_VERSION, self.version, cs_data, st_data))
+        path = self.__path(key)
+        temp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp, "wb") as f:
+                f.write(data)
+            # other processes read either the old entry or the new one, never a partial one
+            os.replace(temp, path)
+        except OSError:
+            self.__remove(temp)
+            return
+        self.__evict()
+
+    def clear(self):
+        """Removes every entry."""
+        for entry in self.__entries():
+            self.__remove(entry.path)
+
+    def __path(self, key):
+        return os.path.join(self.directory, key + ProgramCache.SUFFIX)
+
+    def __entries(self):
+        """Returns the entries of the cache directory."""
+        try:
+            with os.scandir(self.directory) as it:
+                return [entry for entry in it if entry.name.endswith(ProgramCache.SUFFIX) and entry.is_file()]
+        except OSError:
+            return []
+
+    def __checkVersion(self):
+        """Removes every entry if they were written by another interpreter version or fingerprint."""
+        if self.__checked:
+            return
+        self.__checked = True
+        path = os.path.join(self.directory, ProgramCache.VERSION_FILE)
+        stamp = f"{ProgramCache.FORMAT_VERSION}:{self.version}:{ProgramCache.fingerprint()}"
+        try:
+            with open(path, "r") as f:
+                if f.read() == stamp:
+                    return
+        except OSError:
+            pass
+        self.clear()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, "w") as f:
+                f.write(stamp)
+        except OSError:
+            pass
+
+    def __evict(self):
+        """Removes the least recently used entries until the entries fit in maxBytes."""
+        sizes = []
+        total = 0
+        for entry in self.__entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            sizes.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+        if total <= self.maxBytes:
+            return
+        sizes.sort()
+        for _, size, path in sizes:
+            if total <= self.maxBytes:
+                break
+            self.__remove(path)
+            total -= size
+
+    @staticmethod
+    def __remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class MemoryProgramCache(ProgramCache):
+    """
+    A cache of compiled programs in memory, for a process which evaluates many programs.
+
+    The entries are kept converted with the Serializer and marshalled, as they are on disk,
+    so each hit loads its own copy of the control structures and the size of an entry is
+    known. Once the entries take more than maxBytes, the least recently used ones are evicted.
+
+    Attributes:
+        version (str): The interpreter version.
+        maxBytes (int): The size cap of the entries.
+        hits (int): The number of loads answered from the cache.
+        misses (int): The number of loads which were not.
+    """
+
+    def __init__(self, version, maxBytes = ProgramCache.DEFAULT_MAX_BYTES):
+        super().__init__(None, version, maxBytes)
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict()
+        self.__bytes = 0
+
+    def load(self, key, withTree = False):
+        data = self.__entries.get(key)
+        if data is not None:
+            cs_data, st_data = marshal.loads(data)
+            if not withTree or st_data is not None:
+                self.hits += 1
+                self.__entries.move_to_end(key)
+                return Serializer.loadControlStructures(cs_data), Serializer.loadTree(st_data) if withTree else None
+        self.misses += 1
+        return None
+
+    def storeData(self, key, cs_data, st_data = None):
+        data = marshal.dumps((cs_data, st_data))
+        if len(data) > self.maxBytes:
+            return
+        self.__remove(key)
+        self.__entries[key] = data
+        self.__bytes += len(data)
+        while self.__bytes > self.maxBytes:
+            _, evicted = self.__entries.popitem(last=False)
+            self.__bytes -= len(evicted)
+
+    def clear(self):
+        self.__entries.clear()
+        self.__bytes = 0
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __remove(self, key):
+        data = self.__entries.pop(key, None)
+        if data is not None:
+            self.__bytes -= len(data)
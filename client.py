@@ -0,0 +1,114 @@
+import socket
+import sys
+
+from protocol import Protocol, ProtocolException
+from utils import init_args, read_file
+
+
+def split_socket(args):
+    """Removes the --socket option from the arguments, returns (path of the socket, arguments)."""
+    path = None
+    rest = []
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg.startswith("--socket="):
+            path = arg[len("--socket="):]
+        elif arg == "--socket" and i + 1 < len(args):
+            i += 1
+            path = args[i]
+        else:
+            rest.append(arg)
+        i += 1
+    return path, rest
+
+
+def connect(path):
+    """Returns a socket connected to the server, None if no server is listening on path."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(Protocol.CONNECT_TIMEOUT)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def main():
+    """
+    Evaluates a program with the evaluation server (see server.py), as myrpal.py would.
+
+    Takes the arguments of myrpal.py, --socket=<path> for a server which does not listen
+    on the default socket and --timeout=<seconds> for a lower time limit than the server's
+    (the server's --timeout is the most an evaluation may take, 0 for the server's limit,
+    which is the default). The client only reads the file and the arguments, so it
+    starts without importing the interpreter. If no server is listening, the program is
+    evaluated by myrpal.py in this process.
+
+    Usage: python3 client.py [--socket=<path>] [--timeout=<seconds>] <arguments of myrpal.py>
+    """
+    path, args = split_socket(sys.argv)
+    file_name, switch, options = init_args(args)
+    if options.get("batch", False):
+        print("The client evaluates a single program, run myrpal.py --batch instead")
+        exit(1)
+
+    sock = connect(path if path is not None else Protocol.defaultSocket())
+    if sock is None:
+        import myrpal
+        sys.argv = args
+        myrpal.main()
+        return
+
+    memo_size = options.get("memo-size")
+    if memo_size is not None and (not memo_size.isdigit() or int(memo_size) < 1):
+        print(f"Invalid value {memo_size} for --memo-size, expected a positive integer")
+        exit(1)
+    timeout = options.get("timeout", 0)
+    try:
+        timeout = float(timeout)
+    except ValueError:
+        timeout = -1
+    if timeout < 0:
+        print(f"Invalid value {options['timeout']} for --timeout, expected a number of seconds (0 for the server's limit)")
+        exit(1)
+
+    request = {
+        "source": read_file(file_name),
+        "switch": switch,
+        "options": {
+            "engine": options.get("engine"),
+            "optimize": not options.get("no-optimize", False),
+            "memoize": options.get("memoize", False) or "memo-size" in options,
+            "memo_size": int(memo_size) if memo_size is not None else None,
+            "cache": not options.get("no-cache", False),
+        },
+    }
+    if timeout:
+        # without it the server's limit applies
+        request["timeout"] = timeout
+    try:
+        with sock:
+            # the server answers once the evaluation ends or runs out of time, the client only
+            # knows when that is if it asked for a limit
+            sock.settimeout(timeout + Protocol.RESPONSE_GRACE if timeout else None)
+            Protocol.send(sock, request)
+            response = Protocol.receive(sock)
+    except (OSError, ProtocolException) as e:
+        print(f"The evaluation server failed: {e}", file=sys.stderr)
+        exit(1)
+    if response is None:
+        print("The evaluation server closed the connection", file=sys.stderr)
+        exit(1)
+
+    sys.stdout.write(response["output"])
+    if response["status"] == Protocol.TIMEOUT:
+        print(response["error"], file=sys.stderr)
+    if options.get("memo-stats", False) and response["memo"] is not None:
+        print(f"memo: {response['memo']}", file=sys.stderr)
+    if response["status"] != Protocol.OK:
+        exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+from .control_structures import ControlStructures
+from .symbol import *
+
+
+class OpCode:
+    """
+    The instructions of the bytecode VM.
+
+    Every instruction takes two slots in the code array, the opcode and its argument.
+    Instructions are stored in execution order, ie. the reverse of the order of the
+    symbols in a control structure.
+    """
+
+    LOAD_CONST = 0      # push consts[arg]
+    LOAD_NAME = 1       # push the value bound to names[arg]
+    LOAD_YSTAR = 2      # push Y*
+    MAKE_CLOSURE = 3    # push a closure of lambdas[arg] over the current environment
+    GAMMA = 4           # apply the stack top to the value below it
+    BINOP = 5           # apply the binary operator operators[arg]
+    UNOP = 6            # apply the unary operator operators[arg]
+    TAU = 7             # form a tuple of the arg values on the top of the stack
+    JUMP_IF_FALSE = 8   # pop the condition, jump by arg slots if it is not true
+    JUMP = 9            # jump by arg slots
+    RETURN = 10         # exit the current environment
+    LOAD_VAR = 11       # push the value at the (depth, slot) addresses[arg]
+    INTRINSIC = 12      # apply the predefined function intrinsics[arg] to the values on the top of the stack
+    MEMO_STORE = 13     # store the stack top as the result of the innermost pending memoized call
+
+    NAMES = ["LOAD_CONST", "LOAD_NAME", "LOAD_YSTAR", "MAKE_CLOSURE", "GAMMA", "BINOP",
+             "UNOP", "TAU", "JUMP_IF_FALSE", "JUMP", "RETURN", "LOAD_VAR",
+             "INTRINSIC", "MEMO_STORE"]
+
+
+class Bytecode:
+    """
+    A program compiled to bytecode.
+
+    Attributes:
+        codes (list): The instruction arrays, indexed by the delta index of the lambda
+            (or delta-0) they were compiled from. Conditional deltas are inlined, their slots are None.
+        consts (list): The constant pool.
+        names (list): The pool of identifiers that are not bound by a lambda.
+        addresses (list): The pool of (depth, slot) addresses of variables.
+        lambdas (list): The (variables, delta index) of every lambda in the program.
+        intrinsics (list): The (name, arity) of the predefined functions applied as intrinsics.
+        operators (list): The operator pool.
+    """
+
+    def __init__(self):
+        self.codes: list[list[int]] = []
+        self.consts = []
+        self.names: list[str] = []
+        self.addresses = []
+        self.lambdas = []
+        self.intrinsics = []
+        self.operators: list[str] = []
+
+    def disassemble(self):
+        """Returns a readable listing of the instructions."""
+        lines = []
+        for index, code in enumerate(self.codes):
+            if code is None:
+                continue
+            lines.append(f"delta-{index}:")
+            for pc in range(0, len(code), 2):
+                op, arg = code[pc], code[pc + 1]
+                operand = ""
+                if op == OpCode.LOAD_CONST:
+                    operand = repr(self.consts[arg])
+                elif op == OpCode.LOAD_NAME:
+                    operand = self.names[arg]
+                elif op == OpCode.LOAD_VAR:
+                    operand = str(self.addresses[arg])
+                elif op == OpCode.MAKE_CLOSURE:
+                    variables, delta = self.lambdas[arg]
+                    operand = f"({', '.join(variables)}) delta-{delta}"
+                elif op == OpCode.INTRINSIC:
+                    name, arity = self.intrinsics[arg]
+                    operand = f"{name}/{arity}"
+                elif op in (OpCode.BINOP, OpCode.UNOP):
+                    operand = self.operators[arg]
+                elif op in (OpCode.JUMP, OpCode.JUMP_IF_FALSE):
+                    operand = f"-> {pc + 2 + arg}"
+                elif op == OpCode.TAU:
+                    operand = str(arg)
+                lines.append(f"  {pc:>4} {OpCode.NAMES[op]:<14} {operand}")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return self.disassemble()
+
+
+class BytecodeCompiler:
+    """
+    Lowers the control structures of a program to bytecode.
+
+    Each lambda body (and delta-0) becomes one instruction array. The deltas of a
+    conditional are inlined into the array of the lambda they appear in, with jumps
+    in place of the beta and delta symbols.
+    """
+
+    def __init__(self, csMap: ControlStructures):
+        self.__csMap = csMap
+        self.__bytecode = Bytecode()
+        self.__pools = {}
+
+    def compile(self) -> Bytecode:
+        """Compiles delta-0 and every lambda reachable from it."""
+        pending = [0]
+        compiled = set()
+        while len(pending) > 0:
+            index = pending.pop()
+            if index in compiled:
+                continue
+            compiled.add(index)
+            code = []
+            self.__compileDelta(index, code, pending)
+            code += [OpCode.RETURN, 0]
+            self.__setCode(index, code)
+        return self.__bytecode
+
+    def __setCode(self, index, code):
+        codes = self.__bytecode.codes
+        while len(codes) <= index:
+            codes.append(None)
+        codes[index] = code
+
+    def __compileDelta(self, index, code: list, pending: list):
+        """Appends the instructions of the delta to code, in execution order."""
+        symbols = list(self.__csMap.get(index))
+        i = len(symbols) - 1
+        while i >= 0:
+            symbol = symbols[i]
+            if symbol.isType(BetaSymbol):
+                # control: delta_then, delta_else, beta -> evaluated right to left
+                _else: DeltaSymbol = symbols[i - 1]
+                _then: DeltaSymbol = symbols[i - 2]
+                self.__compileConditional(_then.index, _else.index, code, pending)
+                i -= 3
+                continue
+            self.__compileSymbol(symbol, code, pending)
+            i -= 1
+
+    def __compileConditional(self, _then, _else, code: list, pending: list):
+        code += [OpCode.JUMP_IF_FALSE, 0]
+        jump_to_else = len(code)
+        self.__compileDelta(_then, code, pending)
+        code += [OpCode.JUMP, 0]
+        jump_to_end = len(code)
+        code[jump_to_else - 1] = jump_to_end - jump_to_else
+        self.__compileDelta(_else, code, pending)
+        code[jump_to_end - 1] = len(code) - jump_to_end
+
+    def __compileSymbol(self, symbol: Symbol, code: list, pending: list):
+        if symbol.isType(NameSymbol):
+            symbol: NameSymbol = symbol
+            if symbol.address is not None:
+                code += [OpCode.LOAD_VAR, self.__pool("addresses", symbol.address)]
+            elif symbol.isId() or symbol.isFunction():
+                code += [OpCode.LOAD_NAME, self.__pool("names", symbol.name)]
+            else:
+                code += [OpCode.LOAD_CONST, self.__pool("consts", symbol.name)]
+        elif symbol.isType(YStarSymbol):
+            code += [OpCode.LOAD_YSTAR, 0]
+        elif symbol.isType(LambdaSymbol):
+            symbol: LambdaSymbol = symbol
+            pending.append(symbol.index)
+            code += [OpCode.MAKE_CLOSURE, self.__pool("lambdas", (symbol.variables, symbol.index))]
+        elif symbol.isType(GammaSymbol):
+            code += [OpCode.GAMMA, 0]
+        elif symbol.isType(BinaryOperatorSymbol):
+            code += [OpCode.BINOP, self.__pool("operators", symbol.operator)]
+        elif symbol.isType(UnaryOperatorSymbol):
+            code += [OpCode.UNOP, self.__pool("operators", symbol.operator)]
+        elif symbol.isType(TauSymbol):
+            code += [OpCode.TAU, symbol.n]
+        elif symbol.isType(TupleSymbol):
+            # a tuple of literals formed before the evaluation, symbols are not hashable so it is not pooled
+            consts = self.__bytecode.consts
+            code += [OpCode.LOAD_CONST, len(consts)]
+            consts.append(symbol)
+        elif symbol.isType(IntrinsicSymbol):
+            symbol: IntrinsicSymbol = symbol
+            code += [OpCode.INTRINSIC, self.__pool("intrinsics", (symbol.func.getName(), symbol.arity))]
+        else:
+            raise Exception(f"Invalid symbol:{symbol, type(symbol)} in control structure")
+
+    def __pool(self, pool, value):
+        """Returns the index of value in the pool, adding it if needed."""
+        # the type is part of the key so that True and 1 get separate entries
+        key = (pool, type(value), value)
+        index = self.__pools.get(key)
+        if index is None:
+            values = getattr(self.__bytecode, pool)
+            index = len(values)
+            values.append(value)
+            self.__pools[key] = index
+        return index
@@ -0,0 +1,460 @@
+from abstractst.nodes import Nodes
+
+from .machine import CSEMachine
+from .control_structures import ControlStructures, LexicalScope
+from .environment import Environment
+from .exceptions import FallbackException, MachineException
+from .functions import DefinedFunction, FunctionFactory
+from .memo import MemoTable, Memoizer
+from .operators import Operators
+from .output import OutputSink, SkipSink
+from .st import STNode
+from .symbol import *
+
+
+class TailCall:
+    """
+    An application in tail position, returned to the caller instead of being evaluated.
+
+    The caller applies it in a loop (see ClosureEngine.apply), so tail recursive functions
+    run without growing the python call stack.
+
+    Attributes:
+        rator: The value applied.
+        rand: The value it is applied to.
+    """
+
+    __slots__ = ("rator", "rand")
+
+    def __init__(self, rator, rand):
+        self.rator = rator
+        self.rand = rand
+
+
+class ClosureCompiler:
+    """
+    Compiles a standardized tree to nested python closures, one for each node.
+
+    Every closure takes the environment it is evaluated in and returns the value of its node,
+    represented as the BytecodeVM represents values on its stack. The children of a node are
+    evaluated right to left, in the order the CSE machine evaluates their control structures.
+    The tree is walked once and is not modified, so the CSE machine can evaluate it afterwards.
+
+    Identifiers are resolved to (depth, slot) addresses with a LexicalScope, as the
+    CSInitializer does. For every lambda the compiler also records whether its body reaches
+    Print and the free variables of the body, which the Memoizer checks.
+
+    Attributes:
+        bodies (list): The compiled bodies of the lambdas, indexed by the lambda index.
+        memoBodies (dict): (reaches Print, free variables) of the body of each lambda, by index.
+    """
+
+    def __init__(self, engine):
+        self.__engine: ClosureEngine = engine
+        self.bodies = []
+        self.memoBodies = {}
+        # [index, reaches Print, free variables] of the lambdas enclosing the compiled node
+        self.__lambdas = []
+
+    def compile(self, st: STNode):
+        """Returns the closure which evaluates the program."""
+        return self.__compile(st, LexicalScope(), False)
+
+    def __compile(self, node: STNode, scope: LexicalScope, tail: bool):
+        """
+        Returns the closure which evaluates the node.
+
+        Args:
+            node (STNode): The node to compile, its siblings are not compiled.
+            scope (LexicalScope): The variables visible at the node.
+            tail (bool): True if the value of the node is the value of the enclosing lambda.
+        """
+        if node.is_gamma():
+            return self.__compileGamma(node, scope, tail)
+        if node.is_lambda():
+            return self.__compileLambda(node, scope)
+        if node.is_conditional():
+            return self.__compileConditional(node, scope, tail)
+        if node.is_tau():
+            return self.__compileTau(node, scope)
+
+        value = node.getValue()
+        if isinstance(value, str) and value in Nodes.BOP:
+            return self.__compileBinop(node, scope)
+        if isinstance(value, str) and value in Nodes.UOP:
+            return self.__compileUnop(node, scope)
+        return self.__compileLeaf(node, scope)
+
+    def __children(self, node: STNode, scope: LexicalScope):
+        """Returns the compiled children of the node."""
+        children = []
+        child = node.getLeft()
+        while child is not None:
+            children.append(self.__compile(child, scope, False))
+            child = child.getRight()
+        return children
+
+    def __compileGamma(self, node: STNode, scope: LexicalScope, tail: bool):
+        engine = self.__engine
+        apply = engine.apply
+        rator_node: STNode = node.getLeft()
+        rand_node: STNode = rator_node.getRight()
+
+        name = scope.primitiveName(rator_node)
+        if name is not None and name != DefinedFunctions.CONC:
+            # CSE Rule 14, the function applied is known when the program is compiled
+            if name == DefinedFunctions.PRINT:
+                self.__reachPrint()
+            function = FunctionFactory.create(name)
+            run_function = engine.runFunction
+            rand = self.__compile(rand_node, scope, False)
+            return lambda env: run_function(function, rand(env))
+
+        if rator_node.is_gamma():
+            # gamma(gamma(A, x), y), Conc takes both of its arguments at once
+            inner_rator = self.__compile(rator_node.getLeft(), scope, False)
+            inner_rand = self.__compile(rator_node.getLeft().getRight(), scope, False)
+            rand = self.__compile(rand_node, scope, False)
+            run_conc = engine.runConc
+
+            def gamma_gamma(env):
+                second = rand(env)
+                first = inner_rand(env)
+                function = inner_rator(env)
+                if function.__class__ is FunctionSymbol and function.func.getName() == DefinedFunctions.CONC:
+                    return run_conc(function.func, first, second)
+                if tail:
+                    return TailCall(apply(function, first), second)
+                return apply(apply(function, first), second)
+            return gamma_gamma
+
+        rator = self.__compile(rator_node, scope, False)
+        rand = self.__compile(rand_node, scope, False)
+        if tail:
+            def tail_gamma(env):
+                value = rand(env)
+                return TailCall(rator(env), value)
+            return tail_gamma
+
+        def gamma(env):
+            value = rand(env)
+            return apply(rator(env), value)
+        return gamma
+
+    def __compileLambda(self, node: STNode, scope: LexicalScope):
+        x: STNode = node.getLeft()
+        if x.isValue(Nodes.COMMA):
+            variables = []
+            variable = x.getLeft()
+            while variable is not None:
+                variables.append(variable.parseValueInToken())
+                variable = variable.getRight()
+            variables = tuple(variables)
+        else:
+            variables = (x.parseValueInToken(),)
+
+        index = len(self.bodies)
+        self.bodies.append(None)
+        info = [index, False, set()]
+        self.__lambdas.append(info)
+        self.bodies[index] = self.__compile(x.getRight(), LexicalScope(variables, scope), True)
+        self.__lambdas.pop()
+        self.memoBodies[index] = (info[1], tuple(info[2]))
+
+        # CSE Rule 2
+        return lambda env: LambdaClosureSymbol(variables, index, env)
+
+    def __compileConditional(self, node: STNode, scope: LexicalScope, tail: bool):
+        condition_node: STNode = node.getLeft()
+        then_node: STNode = condition_node.getRight()
+        condition = self.__compile(condition_node, scope, False)
+        _then = self.__compile(then_node, scope, tail)
+        _else = self.__compile(then_node.getRight(), scope, tail)
+
+        def conditional(env):
+            # CSE Rule 8
+            value = condition(env)
+            if isinstance(value, Symbol):
+                value = value.name
+            if value == True:
+                return _then(env)
+            return _else(env)
+        return conditional
+
+    def __compileTau(self, node: STNode, scope: LexicalScope):
+        elements = self.__children(node, scope)
+        elements.reverse()
+        n = len(elements)
+
+        def tau(env):
+            # CSE Rule 9, the last element is evaluated first
+            values = [element(env) for element in elements]
+            tupleList = []
+            for i in range(n - 1, -1, -1):
+                value = values[i]
+                if not isinstance(value, Symbol):
+                    tupleList.append(value)
+                elif value.__class__ is NameSymbol:
+                    tupleList.append(value.name)
+                elif value.__class__ is TupleSymbol:
+                    tupleList.append(value.tuple)
+                elif value.__class__ is NothingSymbol:
+                    raise FallbackException("The result of Print is used in a tuple")
+            return TupleSymbol(n, tupleList)
+        return tau
+
+    def __compileBinop(self, node: STNode, scope: LexicalScope):
+        operator = node.getValue()
+        function = Operators.get(operator)
+        left, right = self.__children(node, scope)
+
+        def binop(env):
+            # CSE Rule 6
+            rand_2 = right(env)
+            rand_1 = left(env)
+            if isinstance(rand_1, Symbol):
+                rand_1 = rand_1.name
+            if isinstance(rand_2, Symbol):
+                rand_2 = rand_2.name
+            try:
+                value = function(rand_1, rand_2)
+            except ZeroDivisionError as e:
+                raise MachineException(f"Division by zero error: {rand_1} / {rand_2}")
+            except Exception as e:
+                raise MachineException(f"Error in binary operation: {rand_1} {operator} {rand_2}")
+            return StackValue.wrap(value)
+        return binop
+
+    def __compileUnop(self, node: STNode, scope: LexicalScope):
+        function = Operators.get(node.getValue())
+        rand = self.__compile(node.getLeft(), scope, False)
+
+        def unop(env):
+            # CSE Rule 7
+            value = rand(env)
+            if isinstance(value, Symbol):
+                value = value.name
+            return StackValue.wrap(function(value))
+        return unop
+
+    def __compileLeaf(self, node: STNode, scope: LexicalScope):
+        symbol = SymbolFactory.createSymbol(node)
+        if symbol.__class__ is TupleSymbol or symbol.__class__ is YStarSymbol:
+            return lambda env: symbol
+        if symbol.__class__ is not NameSymbol:
+            raise Exception(f"Invalid node type:{node.getValue()}")
+
+        if symbol.isId():
+            address = scope.resolve(symbol.name)
+            if address is not None:
+                self.__addFree(address)
+                return ClosureCompiler.__variable(*address)
+        if not (symbol.isId() or symbol.isFunction()):
+            # CSE Rule 1, a literal
+            value = symbol.name
+            return lambda env: value
+
+        # CSE Rule 1, a name which is not bound by a lambda
+        name = symbol.name
+        if name == DefinedFunctions.PRINT:
+            self.__reachPrint()
+        if not DefinedFunctions.isdefined(name):
+            def undefined(env):
+                raise MachineException(f"{name} is undefined.")
+            return undefined
+        function = FunctionSymbol(FunctionFactory.create(name))
+        return lambda env: function
+
+    def __reachPrint(self):
+        """Records that the bodies of the enclosing lambdas reach Print."""
+        for info in self.__lambdas:
+            info[1] = True
+
+    def __addFree(self, address):
+        """Records the variable at the address as free in the enclosing lambdas it is not bound in."""
+        depth, slot = address
+        lambdas = self.__lambdas
+        # the innermost lambda runs one environment below its closure's one
+        for level in range(1, len(lambdas) + 1):
+            if depth < level:
+                break
+            lambdas[-level][2].add((depth - level, slot))
+
+    @staticmethod
+    def __variable(depth, slot):
+        """Returns a closure which pushes the value of the variable at the address."""
+        closures = (LambdaClosureSymbol, FunctionSymbol)
+        wrap = StackValue.wrap
+        if depth == 0:
+            def variable(env):
+                value = env.values[slot]
+                return value if isinstance(value, closures) else wrap(value)
+        elif depth == 1:
+            def variable(env):
+                value = env.parent.values[slot]
+                return value if isinstance(value, closures) else wrap(value)
+        else:
+            def variable(env):
+                value = env.lookUpAddress(depth, slot)
+                return value if isinstance(value, closures) else wrap(value)
+        return variable
+
+
+class ClosureEngine:
+    """
+    Evaluates a program compiled to python closures. An alternative engine to the CSEMachine.
+
+    The program runs as a tree of python calls, following the CSE machine rules without a
+    control or a stack. Applications in tail position are returned to the caller as TailCalls
+    and applied in a loop, other applications use the python call stack.
+
+    The closures raise the errors the CSE rules raise, so a program which fails is not run
+    again. A program which the closures can not evaluate as the CSE machine would, because it
+    recurses deeper than the python call stack allows or uses the result of Print, raises
+    FallbackException and is evaluated again by the CSE machine. The output of Print is written
+    to the output sink as it runs, the CSE machine prints the same text up to the point the
+    closures stopped at, so it skips as much of its output as was already written.
+
+    The engine does not change the python recursion limit, which is a setting of the whole
+    process, the entry points raise it once (see Interpreter.raiseRecursionLimit).
+
+    Attributes:
+        st (STNode): The standardized tree.
+        csMap (ControlStructures): The control structures for the CSE machine to fall back to, None to build them from st.
+        memo (MemoTable): The table the results of recursive functions are memoized in, None if memoization is off.
+        memoizer (Memoizer): Memoizes the applications of recursive functions, None if memoization is off.
+        fellBack (bool): True if the program was evaluated by the CSE machine.
+        output (OutputSink): The sink the output of Print is written to.
+    """
+
+    def __init__(self, st: STNode, memo: MemoTable = None, csMap: ControlStructures = None, output = None):
+        """
+        Compiles the given standardized tree to closures.
+
+        Args:
+            st (STNode): The standardized tree.
+            memo (MemoTable): The table to memoize the results of recursive functions in,
+                None to turn memoization off.
+            csMap (ControlStructures): The control structures of the program if they are already
+                built, for the CSE machine to fall back to. Built from st if needed otherwise.
+            output: The OutputSink the output of Print is written to, or a function called with each
+                chunk of the output. None to write to sys.stdout.
+        """
+        self.st = st
+        self.memo = memo
+        self.csMap = csMap
+        self.memoizer = None
+        self.fellBack = False
+        self.output = OutputSink.create(output)
+        self.__nothing = NothingSymbol()
+        try:
+            compiler = ClosureCompiler(self)
+            self.__program = compiler.compile(st)
+            self.__bodies = compiler.bodies
+            if memo is not None:
+                self.memoizer = Memoizer(None, memo, compiler.memoBodies)
+        except RecursionError:
+            # the tree is too deep to compile
+            self.__program = None
+
+    def evaluate(self):
+        """Runs the program, with the CSE machine if the closures can not run it."""
+        written = self.output.written
+        if self.__program is not None:
+            try:
+                with self.output.receiving():
+                    self.__program(Environment(0))
+                return
+            except (RecursionError, FallbackException):
+                pass
+
+        self.fellBack = True
+        if self.memo is not None:
+            self.memo.clear()
+        output = SkipSink(self.output, self.output.written - written)
+        CSEMachine(self.st, memo=self.memo, csMap=self.csMap, output=output).evaluate()
+
+    def apply(self, rator, rand):
+        """
+        Applies rator to rand - CSE Rules 4, 10, 11, 12, 13 and 14.
+
+        The TailCalls returned by the body of a closure are applied in the same loop.
+        """
+        bodies = self.__bodies
+        while True:
+            cls = rator.__class__
+
+            if cls is LambdaClosureSymbol:
+                # Rule 4, 11
+                variables = rator.variables
+                if len(variables) == 1:
+                    if rand.__class__ is NameSymbol:
+                        rand = rand.name
+                    elif rand.__class__ is NothingSymbol:
+                        raise FallbackException("The result of Print is bound to a variable")
+                    values = (rand,)
+                elif rand.__class__ is not TupleSymbol:
+                    # the CSE machine fails on the symbol it holds the value in, which the closures do not have
+                    raise FallbackException("A value which is not a tuple is bound to several variables")
+                else:
+                    tuple_ = rand.tuple
+                    values = [tuple_[i] for i in range(len(variables))]
+                value = bodies[rator.index](Environment(0, rator.env, variables, values))
+                if value.__class__ is not TailCall:
+                    return value
+                rator = value.rator
+                rand = value.rand
+
+            elif cls is EtaClosureSymbol:
+                # Rule 13
+                key = None if self.memoizer is None else self.memoizer.key(rator, rand)
+                if key is not None:
+                    result = self.memoizer.table.get(key)
+                    if result is MemoTable.MISSING:
+                        result = self.apply(self.apply(EtaClosureSymbol.toLambdaClosure(rator), rator), rand)
+                        self.memoizer.table.put(key, result)
+                    return result
+                rator = self.apply(EtaClosureSymbol.toLambdaClosure(rator), rator)
+
+            elif cls is YStarSymbol:
+                # Rule 12
+                return EtaClosureSymbol.fromLambdaClosure(rand)
+
+            elif cls is FunctionSymbol:
+                # Rule 14
+                function: DefinedFunction = rator.func
+                if function.getName() == DefinedFunctions.CONC:
+                    raise FallbackException("Conc is not applied to both of its arguments")
+                return self.runFunction(function, rand)
+
+            elif cls is NameSymbol or not isinstance(rator, Symbol):
+                # Rule 10
+                tuple_ = rator.name if cls is NameSymbol else rator
+                tuple_ = tuple_.tuple if isinstance(tuple_, TupleSymbol) else tuple_
+                n = rand.name if isinstance(rand, Symbol) else rand
+                tuple_len = len(tuple_)
+                if n < 1 or n > tuple_len:
+                    raise MachineException(f"The tuple selection value {n} out of range")
+                return StackValue.wrap(tuple_[n - 1])
+
+            elif cls is NothingSymbol:
+                raise FallbackException("The result of Print is applied")
+
+            else:
+                raise Exception(f"Invalid symbol:{rator, type(rator)} in stack for gamma in Control")
+
+    def runFunction(self, function: DefinedFunction, rand):
+        """CSE Rule 14, applies a predefined function other than Conc."""
+        if isinstance(rand, LambdaClosureSymbol):
+            # the CSE machine applies the closure to the value below it on the stack first
+            raise FallbackException(f"{function.getName()} is applied to a function")
+        result = function.run(StackValue.argument(rand))
+        if result is None:
+            return self.__nothing
+        return StackValue.wrap(result)
+
+    def runConc(self, function: DefinedFunction, first, second):
+        """CSE Rule 14, applies Conc to both of its arguments."""
+        if isinstance(first, LambdaClosureSymbol):
+            raise FallbackException("Conc is applied to a function")
+        return StackValue.wrap(function.run([StackValue.argument(first), StackValue.argument(second)]))
@@ -1,4 +1,3 @@
-from typing import List
 from .symbol import EnvMarkerSymbol, GammaSymbol, Symbol
 
 
@@ -9,13 +8,14 @@ class Control:
     
     Methods: 
         removeRightMost() -> Symbol: Removes the rightmost element of the control.
-        insertControlStruct(controlStruct: List[Symbol]): Inserts a control structure to the control.
+        rightMost() -> Symbol: Returns the rightmost element of the control without removing it.
+        insertControlStruct(controlStruct: list[Symbol]): Inserts a control structure to the control.
         insertEnvMarker(env_index: int): Inserts an environment marker to the control.
     
     """
     
     def __init__(self, controlStruct):
-        self.control: List[Symbol] = []
+        self.control: list[Symbol] = []
         self.insertEnvMarker(0)
         self.insertControlStruct(controlStruct)  
     
@@ -30,12 +30,22 @@ class Control:
         right_most = self.control.pop(-1)
         return right_most
         
+    def rightMost(self):
+        """
+        Returns the rightmost element of the control without removing it.
+
+        Returns: Symbol | None
+        """
+        if len(self.control) == 0:
+            return None
+        return self.control[-1]
+
     def insertControlStruct(self, controlStruct) :
         """
         Inserts a control structure to the control.
         
         Args:
-            controlStruct: List[Symbol]
+            controlStruct: list[Symbol]
         """
         for i in controlStruct:
             self.control.append(i)
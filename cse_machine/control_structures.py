@@ -1,6 +1,6 @@
-import pprint
-from typing import Iterator, List
+from collections.abc import Iterator
 
+from .functions import FunctionFactory
 from .symbol import *
 from .st import STNode
 # from logger import logger
@@ -15,7 +15,7 @@ class ControlStruct(Iterable):
     def __init__(self, index):
 
         self.__index = index
-        self.__array: List[Symbol] = []
+        self.__array: list[Symbol] = []
 
     def getIndex(self):
         """Returns the index of the control structure."""
@@ -57,15 +57,58 @@ class ControlStructures:
         
         return self.__control_structure_map[delta_index]
 
+    def items(self):
+        """Returns the (delta index, control structure) pairs."""
+        return self.__control_structure_map.items()
+
     def __repr__(self):
+        # pprint is only imported to print the control structures, it is slow to import
+        import pprint
+
         return pprint.pformat(self.__control_structure_map)
 
 
+class LexicalScope:
+    """
+    The variables declared by a lambda, and the scope of the lambda it is nested in.
+
+    Each scope corresponds to one environment at run time, so an identifier can be 
+    resolved to the (depth, slot) of its environment when the control structures are built.
+    """
+
+    def __init__(self, names=(), parent=None):
+        self.parent: LexicalScope = parent
+        # later bindings of the same name win, as with fn (x, x). x
+        self.__bindings = {name: slot for slot, name in enumerate(names)}
+
+    def resolve(self, name):
+        """Returns the (depth, slot) of the variable bound to name, None if it is not bound."""
+        scope = self
+        depth = 0
+        while scope is not None:
+            slot = scope.__bindings.get(name)
+            if slot is not None:
+                return (depth, slot)
+            scope = scope.parent
+            depth += 1
+        return None
+
+    def primitiveName(self, node: STNode):
+        """Returns the name of the predefined function the node refers to, None if it is not one or is shadowed."""
+        if node is None or not node.is_name() or not node.is_id():
+            return None
+        name = node.parseValueInToken()
+        if DefinedFunctions.isdefined(name) and self.resolve(name) is None:
+            return name
+        return None
+
+
 class CSInitializer:
 
     def __init__(self, st:STNode) -> None:
         self.__st = st
         self.__controlStructureMap = None
+        self.__nextDeltaIndex = 0
         
     def init(self) -> ControlStructures:
         """
@@ -83,6 +126,12 @@ class CSInitializer:
     def __initializeCS(self, st) -> dict:
         """
         Generates the control structures for the CSE machine from the Standardized Tree.
+
+        The tree is traversed in pre-order with a stack of the subtrees left to traverse, rather 
+        than by recursion, so that deep trees and long lists of siblings do not reach the 
+        recursion limit. Visiting a node returns the subtrees it must be followed by (the body 
+        of a lambda, the parts of a conditional, the arguments of an intrinsic), which are 
+        traversed before the children and the siblings of the node.
         
         Args: st (STNode): The Standardized Tree.
         
@@ -90,44 +139,60 @@ class CSInitializer:
             A dictionary of control structures.
         """
         
-        def traverse(node: STNode, deltaIndex: int):
+        def traverse(node: STNode, deltaIndex: int, scope: LexicalScope):
             """
             Traverses the tree using pre-order traversal.
             
             Args:
                 node (STNode): The node to traverse.
                 deltaIndex (int): The index of the control structure.
+                scope (LexicalScope): The variables visible at the node.
 
             """
 
-            if node is None:
-                return
-            visit(node, deltaIndex)
-            # if node is lambda dont traverse left instead traverse right of left
-            traverse(node.getLeft(), deltaIndex)
-            traverse(node.getRight(), deltaIndex)
+            # (node, delta index, scope) of the subtrees left to traverse, the next one on top
+            pending = [(node, deltaIndex, scope)]
+            while pending:
+                node, deltaIndex, scope = pending.pop()
+                if node is None:
+                    continue
+                subtrees = visit(node, deltaIndex, scope)
+                # traverse the siblings after the children
+                pending.append((node.getRight(), deltaIndex, scope))
+                # if node is lambda dont traverse left instead traverse right of left
+                pending.append((node.getLeft(), deltaIndex, scope))
+                if subtrees:
+                    pending.extend(reversed(subtrees))
 
-        def visit(node:STNode, deltaIndex: int):
+        def visit(node:STNode, deltaIndex: int, scope: LexicalScope):
             """
             Visit the node and add the symbol to the control structure.
+
+            Returns the (node, delta index, scope) of the subtrees to traverse next, in order.
             """
             currentCS:ControlStruct = self.__get(deltaIndex)
-            symbol = None
             if node.is_lambda():
-                handleLambda(node, deltaIndex, currentCS)
+                return handleLambda(node, deltaIndex, currentCS, scope)
             elif node.is_conditional():
                 # add beta to the control structure
-                handleConditional(node, deltaIndex, currentCS)
+                return handleConditional(node, deltaIndex, currentCS, scope)
             elif node.is_tau():
                 handleTau(node, deltaIndex, currentCS)
-            else:
-                # add to current CS 
-                symbol = SymbolFactory.createSymbol(node)
-                currentCS.addSymbol(symbol)
+                return None
+            elif node.is_gamma():
+                subtrees = handleIntrinsic(node, deltaIndex, currentCS, scope)
+                if subtrees is not None:
+                    return subtrees
+            # add to current CS 
+            symbol = SymbolFactory.createSymbol(node)
+            if symbol.isType(NameSymbol) and symbol.isId():
+                symbol.address = scope.resolve(symbol.name)
+            currentCS.addSymbol(symbol)
+            return None
             
 
-        def handleLambda(node, deltaIndex, currentCS):
-            deltaIndex = self.__addNewControlStruct(deltaIndex)
+        def handleLambda(node, deltaIndex, currentCS, scope):
+            deltaIndex = self.__addNewControlStruct()
                 # add x to the control structure
             x:STNode = node.getLeft()
             x_value = x.parseValueInToken()
@@ -139,8 +204,7 @@ class CSInitializer:
             currentCS.addSymbol(symbol)
                 # don't traverse left of lambda
             node.setLeft(None)
-            traverse(x.getRight(), deltaIndex)
-            return deltaIndex
+            return [(x.getRight(), deltaIndex, LexicalScope(symbol.variables, scope))]
         
         def valuesOfChildren(node:STNode):
             node = node.getLeft()
@@ -150,10 +214,10 @@ class CSInitializer:
                 node = node.getRight()
             return values
 
-        def handleConditional(node:STNode, deltaIndex:int, currentCS:ControlStruct):
+        def handleConditional(node:STNode, deltaIndex:int, currentCS:ControlStruct, scope:LexicalScope):
             symbol = BetaSymbol()
-            delta_then = self.__addNewControlStruct(deltaIndex)
-            delta_else = self.__addNewControlStruct(delta_then)
+            delta_then = self.__addNewControlStruct()
+            delta_else = self.__addNewControlStruct()
             delta_then_symbol = DeltaSymbol(delta_then)
             delta_else_symbol = DeltaSymbol(delta_else)
             currentCS.addSymbol(delta_then_symbol)
@@ -166,10 +230,27 @@ class CSInitializer:
             boolean_exp.setRight(None)
             else_exp:STNode = then_exp.getRight() 
             then_exp.setRight(None)
-            traverse(boolean_exp, deltaIndex)
-            traverse(then_exp, delta_then)
-            traverse(else_exp, delta_else)
+            return [(boolean_exp, deltaIndex, scope), (then_exp, delta_then, scope), (else_exp, delta_else, scope)]
+
 
+        def handleIntrinsic(node:STNode, deltaIndex:int, currentCS:ControlStruct, scope:LexicalScope):
+            """
+            Replaces the application of a predefined function with an intrinsic symbol.
+
+            gamma(F, x) becomes <F:1> x, and gamma(gamma(Conc, x), y) becomes <Conc:2> x y.
+            Returns the arguments to traverse, None if the gamma does not apply a predefined function.
+            """
+            rator:STNode = node.getLeft()
+            name = scope.primitiveName(rator)
+            if name is not None and name != DefinedFunctions.CONC:
+                currentCS.addSymbol(IntrinsicSymbol(FunctionFactory.create(name)))
+                node.setLeft(None)
+                return [(rator.getRight(), deltaIndex, scope)]
+            if rator.is_gamma() and scope.primitiveName(rator.getLeft()) == DefinedFunctions.CONC:
+                currentCS.addSymbol(IntrinsicSymbol(FunctionFactory.create(DefinedFunctions.CONC), 2))
+                node.setLeft(None)
+                return [(rator.getLeft().getRight(), deltaIndex, scope), (rator.getRight(), deltaIndex, scope)]
+            return None
 
         def handleTau(node:STNode, deltaIndex:int, currentCS:ControlStruct):
             n = node.getChildrenCount()
@@ -179,20 +260,22 @@ class CSInitializer:
 
         # Initialize the control structure map
         self.__controlStructureMap = {}   
+        self.__nextDeltaIndex = 0
         # create the control structure for delta 0
-        deltaIndex = 0
-        self.__addNewControlStruct(deltaIndex)
+        deltaIndex = self.__addNewControlStruct()
 
-        # start the traversal from the root of the tree
-        traverse(st, deltaIndex)
+        # start the traversal from the root of the tree, delta-0 runs in the primitive environment
+        traverse(st, deltaIndex, LexicalScope())
         return self.__controlStructureMap
 
-    def __addNewControlStruct(self, deltaIndex: int):
-        """Adds a new control structure to the Control Structure Map by linear probing"""
-        
-        while deltaIndex in self.__controlStructureMap.keys():
-            deltaIndex+=1
+    def __addNewControlStruct(self):
+        """
+        Adds a new control structure to the Control Structure Map, with the next delta index.
+
+        The indices are the ones linear probing from the index of the enclosing control 
+        structure would find, as the indices in use are always 0 to the last one given.
+        """
+        deltaIndex = self.__nextDeltaIndex
+        self.__nextDeltaIndex += 1
         self.__controlStructureMap[deltaIndex] = ControlStruct(deltaIndex)
         return deltaIndex
-
-
@@ -1,57 +1,70 @@
 from cse_machine.exceptions import MachineException
 from cse_machine.functions import FunctionFactory
 from .symbol import *
-from typing import List
 
-                
+
 class Environment:
     """
-    Represents the environments of the CSE machine as a tree structure. 
-    
+    Represents the environments of the CSE machine as a tree structure.
+
+    An environment is a fixed size frame holding the values of the variables of one lambda,
+    in the order the lambda declares them. Identifiers are resolved to (depth, slot)
+    addresses when the control structures are built, so a lookup follows depth parent
+    links and indexes the frame.
+
     Attributes:
         envMarker (EnvMarkerSymbol): The environment marker symbol.
         parent (Environment): The parent environment.
-        envData (dict): The data in the environment.
-        
+        names (tuple): The names of the variables in the environment.
+        values (list): The values of the variables, indexed by slot.
+
     Methods:
-        insertEnvData(name: str, value: Symbol): Inserts the values for the variables in the environment.
+        lookUpAddress(depth: int, slot: int) -> Symbol: Looks up the value at a resolved address.
         lookUpEnv(name: str) -> Symbol: Looks up the relevant value for a given variable.
     """
-    
-    def __init__(self, envIndex, parent = None):
-        
+
+    __slots__ = ("envMarker", "parent", "names", "values")
+
+    def __init__(self, envIndex, parent = None, names = (), values = ()):
+
         self.envMarker = EnvMarkerSymbol(envIndex)
         self.parent : Environment = parent
-        self.envData = {}    
-        
+        self.names = names
+        self.values = values
+
     def getIndex(self):
         return self.envMarker.envIndex
-        
-        
-    def insertEnvData(self, name, value):
-        self.envData[name] = value
-    
-        
+
+    def lookUpAddress(self, depth: int, slot: int):
+        """Returns the value in the given slot of the environment depth levels up."""
+        env = self
+        while depth > 0:
+            env = env.parent
+            depth -= 1
+        return env.values[slot]
+
     def lookUpEnv(self, name: str):
+        """Looks up a variable which was not resolved to an address, by its name."""
+
+        env = self
+        while env.parent is not None:
+            names = env.names
+            # the last binding of a name wins, as with fn (x, x). x
+            for slot in range(len(names) - 1, -1, -1):
+                if names[slot] == name:
+                    return env.values[slot]
+            env = env.parent
 
         # check if the name is a defined function in the primitive environment
-        if self.parent is None:
-            if DefinedFunctions.isdefined(name):
-                # add a function symbol with the defined Function Object
-                return FunctionSymbol(FunctionFactory.create(name))
-            else:
-                raise MachineException(f"{name} is not defined")
-            
-        if name in self.envData:
-            return self.envData[name]
+        if DefinedFunctions.isdefined(name):
+            # add a function symbol with the defined Function Object
+            return FunctionSymbol(FunctionFactory.create(name))
         else:
-            return self.parent.lookUpEnv(name)
-        
+            raise MachineException(f"{name} is not defined")
+
     def __repr__(self) -> str:
         p = "None"
         if self.parent is not None:
             p = self.parent.envMarker
-        return f"{self.envMarker}: {self.envData}, p - {p}"
-            
-
-        
+        data = dict(zip(self.names, self.values))
+        return f"{self.envMarker}: {data}, p - {p}"
@@ -1,4 +1,8 @@
 
 class MachineException(Exception):
     def __init__(self, message):
-        super().__init__("An error occured while computing the result.\n" + message)
\ No newline at end of file
+        super().__init__("An error occured while computing the result.\n" + message)
+
+
+class FallbackException(Exception):
+    """Raised when a program does something an engine does not model, the CSE machine evaluates it instead."""
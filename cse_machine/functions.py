@@ -1,3 +1,5 @@
+from .output import OutputSink
+from .tuples import PersistentTuple
 
 
 class DefinedFunctions:
@@ -34,8 +36,181 @@ class DefinedFunctions:
         ]
 
     def isdefined(name):
-        return name in DefinedFunctions.get_functions()
-    
+        return isinstance(name, str) and name in DefinedFunctions.NAMES
+
+
+# the names are fixed, so membership is checked against a set built once
+DefinedFunctions.NAMES = frozenset(DefinedFunctions.get_functions())
+
+
+class LazyString:
+    """
+    A string value which is built without copying characters, see StringView and StringRope.
+
+    Stern returns a StringView and Conc a StringRope, so walking or building a string of n 
+    characters takes O(n) instead of O(n^2). The characters are copied into a python str 
+    (flattened) only when the value is printed or compared, and the result is cached.
+    Lazy strings compare, hash and repr like the flattened str.
+    """
+
+    __slots__ = ()
+
+    # concatenations shorter than this are flattened right away
+    ROPE_THRESHOLD = 64
+
+    @staticmethod
+    def isString(value):
+        """Returns True if the value is a python str or a LazyString."""
+        return isinstance(value, (str, LazyString))
+
+    @staticmethod
+    def concat(left, right):
+        """Returns the concatenation of two strings."""
+        if len(left) + len(right) < LazyString.ROPE_THRESHOLD:
+            return str(left) + str(right)
+        return StringRope(left, right)
+
+    @staticmethod
+    def stem(value):
+        """Returns the first character of a string, '' if the string is empty."""
+        if isinstance(value, StringRope):
+            value = str(value)
+        return value[0] if len(value) > 0 else ""
+
+    @staticmethod
+    def stern(value):
+        """Returns the string without its first character, as a view of the same characters."""
+        if len(value) == 0:
+            return ""
+        if isinstance(value, StringView):
+            return value.tail()
+        return StringView(str(value), 1)
+
+    def __eq__(self, other):
+        if not LazyString.isString(other):
+            return NotImplemented
+        # strings of different lengths are told apart without flattening them
+        if len(self) != len(other):
+            return False
+        return str(self) == str(other)
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __lt__(self, other):
+        return str(self) < str(other) if LazyString.isString(other) else NotImplemented
+
+    def __le__(self, other):
+        return str(self) <= str(other) if LazyString.isString(other) else NotImplemented
+
+    def __gt__(self, other):
+        return str(self) > str(other) if LazyString.isString(other) else NotImplemented
+
+    def __ge__(self, other):
+        return str(self) >= str(other) if LazyString.isString(other) else NotImplemented
+
+    def __add__(self, other):
+        return str(self) + str(other) if LazyString.isString(other) else NotImplemented
+
+    def __radd__(self, other):
+        return str(other) + str(self) if LazyString.isString(other) else NotImplemented
+
+    def __mul__(self, n):
+        return str(self) * n
+
+    __rmul__ = __mul__
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __getitem__(self, index):
+        return str(self)[index]
+
+    def __iter__(self):
+        return iter(str(self))
+
+    def __repr__(self):
+        return repr(str(self))
+
+
+class StringView(LazyString):
+    """
+    The characters of a python str from an offset to its end.
+
+    Attributes:
+        text (str): The viewed string.
+        start (int): The offset of the first character of the view.
+    """
+
+    __slots__ = ("text", "start")
+
+    def __init__(self, text, start):
+        self.text = text
+        self.start = start
+
+    def tail(self):
+        """Returns the view without its first character."""
+        return StringView(self.text, self.start + 1)
+
+    def __len__(self):
+        return len(self.text) - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, int) and 0 <= index < len(self):
+            return self.text[self.start + index]
+        return str(self)[index]
+
+    def __eq__(self, other):
+        if isinstance(other, str):
+            return len(self) == len(other) and self.text.startswith(other, self.start)
+        return super().__eq__(other)
+
+    __hash__ = LazyString.__hash__
+
+    def __str__(self):
+        return self.text[self.start:]
+
+
+class StringRope(LazyString):
+    """
+    The concatenation of two strings.
+
+    The rope is flattened iteratively, as the ropes built by recursive RPAL functions are 
+    as deep as the number of concatenations. The flattened string replaces the children.
+
+    Attributes:
+        left (str | LazyString): The first part, None once the rope is flattened.
+        right (str | LazyString): The second part, None once the rope is flattened.
+    """
+
+    __slots__ = ("left", "right", "__length", "__flat")
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+        self.__length = len(left) + len(right)
+        self.__flat = None
+
+    def __len__(self):
+        return self.__length
+
+    def __str__(self):
+        if self.__flat is None:
+            parts = []
+            pending = [self]
+            while len(pending) > 0:
+                part = pending.pop()
+                if isinstance(part, StringRope):
+                    if part.__flat is not None:
+                        parts.append(part.__flat)
+                    else:
+                        pending.append(part.right)
+                        pending.append(part.left)
+                else:
+                    parts.append(str(part))
+            self.__flat = "".join(parts)
+            self.left = self.right = None
+        return self.__flat
 
 
 class DefinedFunction():
@@ -58,32 +233,10 @@ class FunctionFactory:
     """A factory class to create objects to define the functions of each predefined function."""
     @staticmethod
     def create(name):
-        if name == DefinedFunctions.PRINT:
-            return PrintFn()
-        elif name == DefinedFunctions.ORDER:
-            return OrderFn()
-        elif name == DefinedFunctions.ISINTEGER:
-            return IsIntegerFn()
-        elif name == DefinedFunctions.ISSTRING:
-            return IsStringFn()
-        elif name == DefinedFunctions.ISTRUTHVALUE:
-            return IsTruthValueFn()
-        elif name == DefinedFunctions.ISTUPLE:
-            return IsTupleFn()
-        elif name == DefinedFunctions.ISFUNCTION:
-            return IsFunctionFn()
-        elif name == DefinedFunctions.ISDUMMY:
-            return IsDummyFn()
-        elif name == DefinedFunctions.CONC:
-            return ConcFn()
-        elif name == DefinedFunctions.STEM:
-            return StemFn()
-        elif name == DefinedFunctions.STERN:
-            return SternFn()
-        elif name == DefinedFunctions.ITOS:
-            return ItoSFn()
-        else:
+        function = FunctionFactory.FUNCTIONS.get(name)
+        if function is None:
             raise Exception(f"Invalid function name: {name}")
+        return function()
     
 class PrintFn(DefinedFunction):
     """The Print function in the Primitive Environment."""
@@ -93,17 +246,18 @@ class PrintFn(DefinedFunction):
     def run(self, arg):
         # strip ' in the beginning and end
         arg = PrintFn.__handler(arg)
-        print(arg)
+        # to the sink of the engine evaluating the program
+        OutputSink.current().write(str(arg) + "\n")
 
     @staticmethod
     def __handler(arg):
-        if isinstance(arg, str):
+        if LazyString.isString(arg):
             # replace \n with newline
-            arg = arg.replace("\\n", "\n")
+            arg = str(arg).replace("\\n", "\n")
             return arg
         elif isinstance(arg, bool):
             return "true" if arg else "false"
-        elif isinstance(arg, tuple):
+        elif PersistentTuple.isTuple(arg):
             tuple_ = str(arg)
             tuple_ = tuple_.lstrip("(").rstrip(")")
             tuple_ = tuple_.rstrip(",")
@@ -121,14 +275,16 @@ class OrderFn(DefinedFunction):
 
 class ConcFn(DefinedFunction):
     """The Concatenate function in the Primitive Environment.
-    Concatenates the strings in the tuple"""
+    Concatenates its two arguments, which the machine passes as a list"""
     def __init__(self):
         super().__init__(DefinedFunctions.CONC)
     
     def run(self, args):
-        args = [arg for arg in args]
-        # concatenate the strings
-        res = "".join(args)
+        first, second = args
+        if LazyString.isString(first) and LazyString.isString(second):
+            return LazyString.concat(first, second)
+        # the items of any other second argument are joined, eg. a tuple of strings
+        res = "".join([first] + list(second))
         return res
         
 
@@ -139,10 +295,10 @@ class StemFn(DefinedFunction):
         super().__init__(DefinedFunctions.STEM)
     
     def run(self, arg):
-        if type(arg) != str:
+        if not LazyString.isString(arg):
             raise Exception("Stem can only be applied to strings")
         
-        stem = arg[0] if len(arg) > 0 else ""
+        stem = LazyString.stem(arg)
         return stem
     
 class SternFn(DefinedFunction):
@@ -152,9 +308,9 @@ class SternFn(DefinedFunction):
         super().__init__(DefinedFunctions.STERN)
     
     def run(self, arg):
-        if type(arg) != str:
+        if not LazyString.isString(arg):
             raise Exception("Stern can only be applied to strings")
-        return arg[1:] if len(arg) > 0 else ""
+        return LazyString.stern(arg)
     
 class ItoSFn(DefinedFunction):
     """The ItoS function in the Primitive Environment.
@@ -183,7 +339,7 @@ class IsStringFn(DefinedFunction):
         super().__init__(DefinedFunctions.ISSTRING)
     
     def run(self, arg):
-        return isinstance(arg, str)
+        return LazyString.isString(arg)
     
 class IsTruthValueFn(DefinedFunction):
     """The IsTruthValue function in the Primitive Environment.
@@ -201,7 +357,7 @@ class IsTupleFn(DefinedFunction):
         super().__init__(DefinedFunctions.ISTUPLE)
     
     def run(self, arg):
-        is_tuple =  isinstance(arg, tuple)
+        is_tuple =  PersistentTuple.isTuple(arg)
         return is_tuple
     
 class IsFunctionFn(DefinedFunction):
@@ -221,3 +377,19 @@ class IsDummyFn(DefinedFunction):
     
     def run(self, arg):
         return arg == "dummy"
+
+
+FunctionFactory.FUNCTIONS = {
+    DefinedFunctions.PRINT: PrintFn,
+    DefinedFunctions.ORDER: OrderFn,
+    DefinedFunctions.ISINTEGER: IsIntegerFn,
+    DefinedFunctions.ISSTRING: IsStringFn,
+    DefinedFunctions.ISTRUTHVALUE: IsTruthValueFn,
+    DefinedFunctions.ISTUPLE: IsTupleFn,
+    DefinedFunctions.ISFUNCTION: IsFunctionFn,
+    DefinedFunctions.ISDUMMY: IsDummyFn,
+    DefinedFunctions.CONC: ConcFn,
+    DefinedFunctions.STEM: StemFn,
+    DefinedFunctions.STERN: SternFn,
+    DefinedFunctions.ITOS: ItoSFn,
+}
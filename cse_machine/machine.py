@@ -0,0 +1,499 @@
+from cse_machine.exceptions import MachineException
+
+from cse_machine.functions import DefinedFunction
+from .control_structures import CSInitializer, ControlStructures
+from .st import STNode
+from .symbol import *
+from .stack import Stack
+from .environment import Environment
+from .control import Control
+from .memo import MemoTable, Memoizer
+from .operators import Operators
+from .output import OutputSink
+# import logger
+import structs.stack as ds
+
+class CSEMachine:
+    """
+    The CSEMachine class is responsible for simulating the Control Structure Environment (CSE) machine
+    used in the RPAL language interpreter. It manages the control structures, environment, and stack
+    to intepret the RPAL code. This class provides methods to evaluate expressions based on the cse machine rules.  
+
+    Attributes:
+        st (STNode): The standardized tree which is used to generate control structures.
+        csMap (dict): The map of control structures. ie. delta-0, delta-1, etc.
+        control (Control): The control of the cse machine.
+        envIndexCounter (int): The environment index counter use to create new environments - eg e0, e1, etc.
+        __envStack (Stack): The stack of environments.
+        stack (Stack): The stack of the cse machine.
+        stepCount (int): The number of CSE rules applied so far.
+        memoizer (Memoizer): Memoizes the applications of recursive functions, None if memoization is off.
+        output (OutputSink): The sink the output of Print is written to.
+        logger (Logger): The logger object.
+    """
+
+    def __init__(self, st:STNode, memo: MemoTable = None, csMap: ControlStructures = None, output = None):
+        """
+        Initializes the CSE machine with the given standardized tree.
+        
+        Args:
+            st (STNode): The standardized tree which is used to generate control structures.
+            memo (MemoTable): The table to memoize the results of recursive functions in, 
+                None to turn memoization off.
+            csMap (ControlStructures): The control structures of the program if they are already
+                built (eg. read from the cache), st is not used then.
+            output: The OutputSink the output of Print is written to, or a function called with each
+                chunk of the output. None to write to sys.stdout.
+        """
+        # inti control
+        self.csMap  = csMap if csMap is not None else CSInitializer(st).init()
+        self.control = Control(self.csMap.get(0))
+        
+        # init env
+        self.envIndexCounter = 0
+        self.__envStack: ds.Stack[Environment] = ds.Stack()
+        self.__create_env(self.envIndexCounter)
+
+
+        # init stack
+        self.stack = Stack()
+        self.stack.pushEnvMarker(EnvMarkerSymbol(0)) # e0 is the first in the stack
+
+        # number of rules applied by evaluate()
+        self.stepCount = 0
+
+        self.memoizer = Memoizer(self.csMap, memo) if memo is not None else None
+
+        self.output = OutputSink.create(output)
+
+        # rule handlers, selected by the class of the control symbol in a single lookup
+        self.__rules = {
+            NameSymbol: self.stackName,             # Rule 1
+            YStarSymbol: self.stack.pushStack,      # Rule 1
+            LambdaSymbol: self.stackLambda,         # Rule 2
+            GammaSymbol: self.applyGamma,
+            EnvMarkerSymbol: self.exitEnv,          # Rule 5
+            BinaryOperatorSymbol: self.binop,       # Rule 6
+            UnaryOperatorSymbol: self.unop,         # Rule 7
+            BetaSymbol: self.conditional,           # Rule 8
+            TauSymbol: self.tupleFormation,         # Rule 9
+            TupleSymbol: self.stack.pushStack,      # Rule 9, a tuple of literals formed before the evaluation
+            IntrinsicSymbol: self.applyIntrinsic,   # Rule 14
+            MemoStoreSymbol: self.storeResult,
+        }
+
+        # gamma rule handlers, selected by the class of the stack top
+        self.__gammaRules = {
+            YStarSymbol: self.applyYStar,           # Rule 12
+            EtaClosureSymbol: self.applyFP,         # Rule 13
+            NameSymbol: self.tupleSelection,        # Rule 10
+            LambdaClosureSymbol: self.applyLambda,  # Rule 4, 11
+            FunctionSymbol: self.applyFunction,     # Rule 14
+        }
+
+        # set the initialized logger object
+        # self.logger = logger.logger
+        
+        # self.logger.info(f"csMap: \n{self.csMap}\n")
+
+    def __create_env(self, index, parent: Environment = None, names = (), values = ()):
+        """
+        Creates new env and sets it as current env.
+        
+        Environments are only referenced by the env stack, their child environments and
+        the closures created in them, so an environment is released as soon as it is unreachable.
+        """
+        new_env = Environment(index, parent, names, values)
+        self.__envStack.push(new_env)        
+
+    def evaluate(self):
+        """
+        Evaluates the Control, the output of Print is written to the output sink as it runs.
+        """
+        with self.output.receiving():
+            self.__run()
+
+    def __run(self):
+        """
+        Applies the rules until the control is empty.
+        
+        The control is evaluated in a flat loop, one rule per iteration, so the depth of the
+        python call stack does not grow with the number of CSE steps.
+        """
+        
+        # self.logger.debug(f"control {self.control}")
+        # self.logger.debug(f"stack {self.stack}")
+
+        rules = self.__rules
+        control = self.control
+
+        while True:
+            right_most = control.removeRightMost()
+
+            if right_most is None:
+                # End of the evaluation
+                return
+
+            self.stepCount += 1
+
+            rule = rules.get(right_most.__class__)
+            if rule is None:
+                raise Exception(f"Invalid symbol:{right_most, type(right_most)} in control")
+            rule(right_most)
+
+    def applyGamma(self, gamma: GammaSymbol):
+        """
+        Applies the gamma on the control to the top of the stack.
+        
+        The rule is selected by the class of the stack top - Rules 4, 10, 11, 12, 13 and 14.
+        """
+        top = self.stack.popStack() 
+        rule = self.__gammaRules.get(top.__class__)
+        if rule is None:
+            raise Exception(f"Invalid symbol:{top, type(top)} in stack for gamma in Control")
+        rule(top)
+        
+    def currentEnv(self)->Environment:
+        """
+        Returns the current environment.
+        """
+        return self.__envStack.peek()
+    
+
+    def stackName(self, symbol: Symbol):
+        """
+        CSE Rule 1
+        
+        Pushes the value of the name symbol into the stack.
+        """
+
+        # self.logger.debug("rule 1")
+
+        if symbol.isType(YStarSymbol):
+            self.stack.pushStack(symbol)
+            return  
+        
+        symbol:NameSymbol = symbol
+        address = symbol.address
+        if address is not None:
+            # the identifier was resolved to the (depth, slot) of its variable
+            _value = self.currentEnv().lookUpAddress(address[0], address[1])
+            symbol = _value if isinstance(_value, (LambdaClosureSymbol, FunctionSymbol)) else NameSymbol(_value)
+
+        elif symbol.isId() or symbol.isFunction():
+            try:
+                _value = self.currentEnv().lookUpEnv(symbol.name)
+            except Exception as e:
+                # self.logger.error(f"Name {symbol.name} not found in the environment tree.")
+                raise MachineException(f"{symbol.name} is undefined.")
+            
+            if (isinstance(_value, EtaClosureSymbol) or isinstance(_value, LambdaClosureSymbol) 
+                or isinstance(_value, FunctionSymbol)):
+                symbol = _value
+            else:
+                symbol = NameSymbol(_value)
+
+        self.stack.pushStack(symbol)
+        
+    def stackLambda(self, _lambda: LambdaSymbol):
+        """
+        CSE Rule 2
+        
+        Pushes a lambda closure into the stack.
+        """
+
+        # self.logger.debug("rule 2")
+        self.stack.pushStack(LambdaClosureSymbol(_lambda.variables, _lambda.index, self.currentEnv()))         
+            
+    def applyLambda(self, top:LambdaClosureSymbol):
+        """
+        CSE Rule 4 and CSE Rule 11
+        
+        This function evaluates n-ary functions as well.
+        Creates a new environment and make it the current environment.
+        Also Inserts environment data for env_variables with the respective env_values.
+        """	
+ 
+        _lambdaClosure = top
+        
+        #Get the values of the variables from the stack
+        env_variables = _lambdaClosure.variables
+        
+        #Here an error can occur if number of variables != number of values
+        num_variables = len(env_variables)
+        if num_variables == 1:
+            # self.logger.debug("rule 4")
+            stack_top = self.stack.popStack()
+            # if the stack_top is a name symbol, get the value from the environment
+            if stack_top.isType(NameSymbol):
+                stack_top = stack_top.name
+            # else if stack_top is a tuple or an eta closure, just add it as it is 
+            env_values = [stack_top]
+        else:
+            # self.logger.debug("rule 11")
+            stack_top:NameSymbol = self.stack.popStack()
+            tuple_symbol:TupleSymbol = stack_top
+            tuple = tuple_symbol.tuple
+            env_values = [tuple[i] for i in range(num_variables)]
+
+        # a call in tail position does not need the environment of the caller any more
+        self.__exitTailEnv()
+
+        # create new environment
+        self.envIndexCounter = self.envIndexCounter + 1
+        env_index = self.envIndexCounter
+        self.__create_env(env_index, _lambdaClosure.getEnv(), env_variables, env_values)
+            
+        self.__addEnvMarker(env_index)
+        self.control.insertControlStruct(self.csMap.get(_lambdaClosure.index))         
+
+
+    def applyYStar(self, top: YStarSymbol = None):
+        """
+        CSE Rule 12
+        
+        This function evaluates the Y* symbol.
+        """
+        # self.logger.debug("rule 12")
+        top:LambdaClosureSymbol = self.stack.popStack()
+        eta_closure = EtaClosureSymbol.fromLambdaClosure(top)
+        self.stack.pushStack(eta_closure)
+
+    def applyFP(self, top: EtaClosureSymbol):
+        """
+        CSE Rule 13
+        
+        This function handles the eta closure in the stack.
+        """
+        # self.logger.debug("rule 13")
+        if self.memoizer is not None and self.__applyMemoized(top):
+            return
+        lamda_closure = EtaClosureSymbol.toLambdaClosure(top)
+        self.stack.pushStack(top)
+        self.stack.pushStack(lamda_closure)
+        self.control.addGamma()
+        self.control.addGamma()
+
+    def __applyMemoized(self, top: EtaClosureSymbol):
+        """
+        Looks up the result of applying the eta closure to the value on the stack in the memo table.
+
+        Replaces the value with the result and returns True if the result is known. Otherwise
+        adds a MemoStoreSymbol to the control, which stores the result once the call returns.
+        """
+        key = self.memoizer.key(top, self.stack.top())
+        if key is None:
+            return False
+        result = self.memoizer.table.get(key)
+        if result is not MemoTable.MISSING:
+            self.stack.popStack()
+            self.stack.pushStack(result)
+            return True
+        self.control.addSymbol(MemoStoreSymbol(key))
+        return False
+
+    def storeResult(self, symbol: MemoStoreSymbol):
+        """
+        Stores the value on the top of the stack as the result of a memoized call.
+        """
+        self.memoizer.table.put(symbol.key, self.stack.top())
+
+    def __addEnvMarker(self, env_index):
+            
+        """
+        Adds an environment marker to the stack and the control.
+        
+        """
+        self.stack.pushEnvMarker(EnvMarkerSymbol(env_index))
+        self.control.insertEnvMarker(env_index)
+            
+    def __exitTailEnv(self):
+        """
+        Exits the current environment before a call in tail position.
+
+        If the only thing left to do in the current environment after the call is to exit it,
+        ie. its marker is the rightmost in the control and the top of the stack, the environment 
+        is exited before the callee's one is entered. Tail recursive functions then run in 
+        constant control, stack and environment space.
+        """
+        env_marker = self.control.rightMost()
+        if env_marker.__class__ is EnvMarkerSymbol and self.stack.isEnvMarkerOnTop() \
+                and self.stack.top() == env_marker:
+            self.control.removeRightMost()
+            self.exitEnv(env_marker)
+
+    def exitEnv(self, env_marker):
+        """
+        CSE Rule 5
+        
+        Exits from the current environment.
+        """
+        # self.logger.debug("rule 5")
+
+        self.stack.removeEnvironment(env_marker)
+        self.__envStack.pop()
+        
+    def binop(self, symbol: BinaryOperatorSymbol):
+        """
+        CSE Rule 6
+        
+        Evaluates Binary Operators and pushes the computed result into the stack.
+        """
+        operator = symbol.operator
+        # self.logger.debug("rule 6")
+
+        rand_1 = self.stack.popStack().name
+        rand_2 = self.stack.popStack().name
+        # self.logger.debug(f"op:{operator}, rand_1: {rand_1}, rand_2: {rand_2}")
+        try:
+            _value = self.__applyOp(operator, rand_1, rand_2)
+        except ZeroDivisionError as e:
+            raise MachineException(f"Division by zero error: {rand_1} / {rand_2}")
+        except Exception as e:
+            raise MachineException(f"Error in binary operation: {rand_1} {operator} {rand_2}")
+        
+        self.stack.pushStack(NameSymbol(_value))
+        
+    def unop(self, symbol: UnaryOperatorSymbol):
+        """"
+        CSE Rule 7
+        
+        Evaluates Unary Operators and pushes the computed result into the stack.
+        """
+        operator = symbol.operator
+        # self.logger.debug("rule 7")
+
+        rand = self.stack.popStack().name
+        _value = self.__applyOp(operator, rand)
+        self.stack.pushStack(NameSymbol(_value))
+            
+    def __applyOp(self, operator, rator, rand = None):
+        
+        """
+        
+        Applies the operator to the operands.
+        
+        """ 
+        return Operators.apply(operator, rator, rand)
+    
+    def conditional(self, beta: BetaSymbol = None):
+        """
+        CSE Rule 8
+        
+        This evaluates the conditional expression.
+        Conditional functions are defined in the control structure in the form of delta_then, delta_else, beta, B.
+        """
+        # self.logger.debug("rule 8")
+
+        true_or_false = self.stack.popStack()
+        if true_or_false.name == True:
+            self.control.removeRightMost()
+            _then: DeltaSymbol = self.control.removeRightMost()
+            self.control.insertControlStruct(self.csMap.get(_then.index))
+        else:
+            _else: DeltaSymbol = self.control.removeRightMost()
+            self.control.removeRightMost()
+            self.control.insertControlStruct(self.csMap.get(_else.index))
+        
+    def tupleFormation(self, _tau: TauSymbol):
+        """
+        CSE Rule 9
+        """
+        # self.logger.debug("rule 9")
+
+        i = 0
+        n: int = _tau.n
+        tupleList = []
+        for i in range (n):
+            symbol = self.stack.popStack()
+            if symbol.isType(NameSymbol):
+                tupleList.append(symbol.name)
+            elif symbol.isType(TupleSymbol):
+                tupleList.append(symbol.tuple)
+            
+        new_n_tuple = TupleSymbol(n, tupleList)
+        self.stack.pushStack(new_n_tuple)
+
+    def tupleSelection(self, top: NameSymbol):
+        """
+        CSE Rule 10
+        """
+        tuple_:TupleSymbol = top.name
+        # self.logger.debug("rule 10")
+        name_symbol:NameSymbol = self.stack.popStack()
+        n = name_symbol.name
+
+        # self.logger.debug(f"tuple: {tuple_}, access n: {n}")
+        tuple_ = tuple_.tuple if isinstance(tuple_, TupleSymbol) else tuple_
+        tuple_len = len(tuple_)
+
+        if n < 1 or n > tuple_len:
+            raise MachineException(f"The tuple selection value {n} out of range")
+        else:
+            self.stack.pushStack(NameSymbol(tuple_[n-1]))
+
+    def applyFunction(self, top: FunctionSymbol):
+        """
+        CSE Rule 14 - Apply Predefined Function
+        """
+        # self.logger.debug("rule 14 - apply function")
+
+        function:DefinedFunction = top.func
+        rand_symbol = self.stack.popStack()
+        if rand_symbol.isType(LambdaClosureSymbol):
+            # add the function NameSymbol to the control again
+            self.control.addSymbol(NameSymbol(function.getName()))
+            lambda_closure:LambdaClosureSymbol = rand_symbol
+            self.applyLambda(lambda_closure)
+            return 
+        else:
+            args = self.get_arg(rand_symbol)
+            if function.getName() == DefinedFunctions.CONC:
+                args = [args, self.get_arg(self.stack.popStack())]
+                self.control.removeRightMost() # remove the gamma symbol
+
+        function_result = function.run(args)
+
+        if function_result is not None:
+            self.stack.pushStack(NameSymbol(function_result))
+
+    def applyIntrinsic(self, intrinsic: IntrinsicSymbol):
+        """
+        CSE Rule 14 - Apply a predefined function resolved when the control structures were built
+
+        Applies the function to the arguments on the stack, as the gammas it stands for would.
+        """
+        # self.logger.debug("rule 14 - apply intrinsic")
+
+        function:DefinedFunction = intrinsic.func
+        rand_symbol = self.stack.popStack()
+        if rand_symbol.isType(LambdaClosureSymbol):
+            # as in applyFunction, apply the closure and then the function to the result
+            for i in range(intrinsic.arity - 1):
+                self.control.addGamma()
+            self.control.addSymbol(NameSymbol(function.getName()))
+            self.applyLambda(rand_symbol)
+            return
+
+        args = self.get_arg(rand_symbol)
+        if intrinsic.arity == 2:
+            args = [args, self.get_arg(self.stack.popStack())]
+
+        function_result = function.run(args)
+
+        if function_result is not None:
+            self.stack.pushStack(NameSymbol(function_result))
+
+    def get_arg(self, rand_symbol):
+        if isinstance(rand_symbol, TupleSymbol):
+            rand_symbol = rand_symbol.tuple
+        elif isinstance(rand_symbol, NameSymbol):
+            value = rand_symbol.name
+            if isinstance(value, TupleSymbol):
+                rand_symbol = value.tuple
+            else:
+                rand_symbol = value
+        else:
+                # for primitive data types
+            rand_symbol = rand_symbol.name
+        return rand_symbol
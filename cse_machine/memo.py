@@ -0,0 +1,237 @@
+from collections import OrderedDict
+
+from .control_structures import ControlStructures
+from .functions import DefinedFunctions, LazyString
+from .symbol import *
+from .tuples import PersistentTuple
+
+
+class MemoTable:
+    """
+    A bounded table of the results of memoized function calls, evicting the least recently used.
+
+    Attributes:
+        maxsize (int): The maximum number of results kept.
+        hits (int): The number of calls answered from the table.
+        misses (int): The number of memoizable calls whose result was not in the table.
+        evictions (int): The number of results evicted to make room for new ones.
+    """
+
+    DEFAULT_SIZE = 100_000
+
+    # returned by get when the key is not in the table, results may be any value
+    MISSING = object()
+
+    def __init__(self, maxsize = DEFAULT_SIZE):
+        if maxsize < 1:
+            raise ValueError(f"The memo table size must be positive: {maxsize}")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__results = OrderedDict()
+
+    def get(self, key):
+        """Returns the result stored for the key, MISSING if there is none."""
+        result = self.__results.get(key, MemoTable.MISSING)
+        if result is MemoTable.MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.__results.move_to_end(key)
+        return result
+
+    def put(self, key, result):
+        """Stores the result for the key, evicting the least recently used result if the table is full."""
+        results = self.__results
+        results[key] = result
+        results.move_to_end(key)
+        if len(results) > self.maxsize:
+            results.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Removes the results and resets the statistics."""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__results.clear()
+
+    def stats(self):
+        """Returns the hit and miss statistics as a dict."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.__results),
+            "maxsize": self.maxsize,
+        }
+
+    def __len__(self):
+        return len(self.__results)
+
+    def __repr__(self):
+        return ", ".join(f"{name}: {value}" for name, value in self.stats().items())
+
+
+class Memoizer:
+    """
+    Decides which applications of recursive functions are memoized, and the keys of their results.
+
+    A rec-bound function is applied through its eta closure (CSE Rule 13). The application is
+    memoized if the argument is hashable (integers, strings, truth values and tuples of them)
+    and the function can not reach Print.
+
+    Reaching Print is checked conservatively on the control structures: a function is
+    excluded if Print appears in any control structure its body may evaluate (its own lambdas
+    and conditionals), or in the closures bound to the free variables of the body.
+    Whether a predefined function other than Print is applied does not matter, they have no
+    side effects.
+
+    Attributes:
+        csMap (ControlStructures): The control structures of the program.
+        table (MemoTable): The table the results are stored in.
+    """
+
+    # the purity of closures is cached for at most this many environments
+    __MAX_CHECKED = 4096
+
+    def __init__(self, csMap: ControlStructures, table: MemoTable, bodies: dict = None):
+        """
+        Args:
+            csMap (ControlStructures): The control structures the lambda bodies are checked on.
+            table (MemoTable): The table the results are stored in.
+            bodies (dict): (reaches Print, free variables) of the lambda bodies by index, for an
+                engine which does not evaluate control structures. Computed from csMap if not given.
+        """
+        self.csMap = csMap
+        self.table = table
+        # delta index -> (reaches Print, free variable addresses relative to the closure env)
+        self.__bodies = {} if bodies is None else bodies
+        # (delta index, env) -> True if the closure can not reach Print
+        self.__checked = {}
+
+    def key(self, closure: EtaClosureSymbol, rand):
+        """
+        Returns the key of the result of applying the closure to rand, None if the call is not memoized.
+        """
+        value = Memoizer.valueKey(rand)
+        if value is None or not self.isPure(closure):
+            return None
+        return (closure.index, closure.env, value)
+
+    def isPure(self, closure: LambdaClosureSymbol):
+        """Returns True if applying the closure can not reach Print."""
+        checked = self.__checked
+        key = (closure.index, closure.env)
+        pure = checked.get(key)
+        if pure is None:
+            if len(checked) >= Memoizer.__MAX_CHECKED:
+                checked.clear()
+            visited = set()
+            pure = self.__isPureClosure(closure, visited)
+            if pure:
+                # none of the closures reachable from this one reaches Print either
+                for visited_key in visited:
+                    checked[visited_key] = True
+            checked[key] = pure
+        return pure
+
+    def __isPureClosure(self, closure: LambdaClosureSymbol, visited: set):
+        """Checks the body of the closure and the values bound to its free variables."""
+        key = (closure.index, closure.env)
+        pure = self.__checked.get(key)
+        if pure is not None:
+            return pure
+        if key in visited:
+            # closures reaching each other are pure unless one of them reaches Print
+            return True
+        visited.add(key)
+
+        reaches_print, free = self.__body(closure.index)
+        if reaches_print:
+            return False
+        for depth, slot in free:
+            if not self.__isPureValue(closure.env.lookUpAddress(depth, slot), visited):
+                return False
+        return True
+
+    def __isPureValue(self, value, visited: set):
+        """Returns True if the value does not hold a function which can reach Print."""
+        if isinstance(value, LambdaClosureSymbol):
+            return self.__isPureClosure(value, visited)
+        if value.__class__ is FunctionSymbol:
+            return value.func.getName() != DefinedFunctions.PRINT
+        if value.__class__ is TupleSymbol:
+            value = value.tuple
+        if PersistentTuple.isTuple(value):
+            return all(self.__isPureValue(item, visited) for item in value)
+        return True
+
+    def __body(self, index):
+        """
+        Returns (reaches Print, free variables) of the body of the lambda at the index.
+
+        The free variables are the (depth, slot) addresses of the variables the body refers
+        to which are not bound in it, relative to the environment of the closure.
+        """
+        body = self.__bodies.get(index)
+        if body is not None:
+            return body
+
+        free = set()
+        reaches_print = False
+        # the body of the lambda runs one environment below the closure's one
+        pending = [(index, 1)]
+        while len(pending) > 0 and not reaches_print:
+            delta, level = pending.pop()
+            for symbol in self.csMap.get(delta):
+                cls = symbol.__class__
+                if cls is LambdaSymbol:
+                    pending.append((symbol.index, level + 1))
+                elif cls is DeltaSymbol:
+                    pending.append((symbol.index, level))
+                elif cls is IntrinsicSymbol:
+                    reaches_print = reaches_print or symbol.func.getName() == DefinedFunctions.PRINT
+                elif cls is NameSymbol:
+                    if symbol.address is None:
+                        # not bound by a lambda, the machine looks up the string 'Print' as well
+                        reaches_print = reaches_print or symbol.name == DefinedFunctions.PRINT
+                    elif symbol.address[0] >= level:
+                        free.add((symbol.address[0] - level, symbol.address[1]))
+
+        body = (reaches_print, tuple(free))
+        self.__bodies[index] = body
+        return body
+
+    @staticmethod
+    def valueKey(value):
+        """
+        Returns a hashable key for a value on the stack, None if the value is not hashable.
+
+        Truth values are tagged, so that true and 1 get different keys, and a value wrapped in a
+        NameSymbol gets a different key from the bare value, as the machine treats them differently.
+        """
+        cls = value.__class__
+        if cls is int or cls is str:
+            return value
+        if cls is bool:
+            return (bool, value)
+        if cls is NameSymbol:
+            key = Memoizer.valueKey(value.name)
+            return None if key is None else (NameSymbol, key)
+        if cls is TupleSymbol:
+            key = Memoizer.valueKey(value.tuple)
+            return None if key is None else (TupleSymbol, key)
+        if LazyString.isString(value):
+            return str(value)
+        if PersistentTuple.isTuple(value):
+            items = []
+            for item in value:
+                key = Memoizer.valueKey(item)
+                if key is None:
+                    return None
+                items.append(key)
+            return (tuple, tuple(items))
+        # closures and functions
+        return None
@@ -0,0 +1,65 @@
+from abstractst.nodes import Nodes
+from .tuples import PersistentTuple
+
+
+class Operators:
+    """
+    The semantics of the RPAL unary and binary operators.
+
+    Shared by every engine so that they compute the same values.
+    
+    Methods:
+        apply(operator, rator, rand) -> Applies the operator to the operands.
+        get(operator) -> Returns the function implementing the operator.
+    """
+
+    __operator_map = {
+        
+        "+": lambda rator, rand: rator + rand,
+        "-": lambda rator, rand: rator - rand,
+        "*": lambda rator, rand: rator * rand,
+        "**": lambda rator, rand: rator ** rand,
+        "/": lambda rator, rand: int(rator / rand),
+        "or": lambda rator, rand: rator or rand,
+        "&": lambda rator, rand: rator and rand,
+        "gr": lambda rator, rand: rator > rand,
+        "ge": lambda rator, rand: rator >= rand,
+        "ls": lambda rator, rand: rator < rand,
+        "le": lambda rator, rand: rator <= rand,
+        "eq": lambda rator, rand: rator == rand,
+        "ne": lambda rator, rand: rator != rand,
+        "neg": lambda rator: -rator,
+        "not": lambda rator: not rator,
+    }
+
+    @staticmethod
+    def aug(rator, rand):
+        """
+        Appends rand to the tuple rator. nil is the empty tuple and the items of a tuple rand are appended.
+        
+        Returns a PersistentTuple, which shares the items of rator if it is one.
+        """
+        rator = PersistentTuple() if rator == Nodes.NIL else \
+            PersistentTuple.fromValue(rator) if PersistentTuple.isTuple(rator) else PersistentTuple([rator])
+        rand = () if rand == Nodes.NIL else rand if PersistentTuple.isTuple(rand) else (rand,)
+        return rator.extend(rand)
+
+    @staticmethod
+    def get(operator):
+        """Returns the function implementing the operator."""
+        if operator == Nodes.AUG:
+            return Operators.aug
+        return Operators.__operator_map[operator]
+
+    @staticmethod
+    def apply(operator, rator, rand = None):
+        """
+        Applies the operator to the operands.
+        
+        The operator is unary if rand is None.
+        """
+        if rand is None:
+            # apply unary operator
+            return Operators.__operator_map[operator](rator)
+        # apply binary operator, including 'aug'
+        return Operators.get(operator)(rator, rand)
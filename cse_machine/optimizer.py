@@ -0,0 +1,264 @@
+from abstractst.nodes import Nodes
+from lexer.tokens import IntegerToken, StringToken, Token
+
+from .operators import Operators
+from .st import STNode
+from .symbol import TupleSymbol
+
+
+class STOptimizer:
+    """
+    Folds the constant parts of a Standardized Tree before its control structures are built.
+
+    The pass runs between the standardization and the CSInitializer, and rewrites the tree
+    in place:
+        - unary and binary operators applied to literals are replaced by their result,
+        - conditionals with a literal condition are replaced by the selected branch, the other
+          branch is dropped without being visited,
+        - names bound to a literal by let (or where) are replaced by the literal, and the
+          binding is removed,
+        - tuples of literals are formed once, the tau is replaced by the formed TupleSymbol.
+
+    An operation which raises an error (eg. division by zero) is left in the tree, so that the
+    error is reported at run time as before. Results the tree can not hold as a literal
+    (eg. a non integer power) are left as well, and so are operations whose result would be
+    larger than MAX_FOLDED_BITS (eg. a large power), which would take long to compute.
+
+    The visits of the nodes are generators which yield the visits of their children and get
+    back the optimized children, run from a stack rather than by recursion, so that deep trees
+    do not reach the recursion limit. The literals of the names in scope are kept in one dict,
+    which a visit changes for its children and restores before it returns.
+    """
+
+    # the value of a name which is not in the constants
+    __MISSING = object()
+
+    # the operators whose results are not literals
+    __NOT_FOLDED = [Nodes.AUG]
+
+    # the size of the largest result folded
+    MAX_FOLDED_BITS = 4096
+
+    def optimize(self, st: STNode) -> STNode:
+        """
+        Optimizes the standardized tree.
+
+        Args:
+            st (STNode): The standardized tree.
+
+        Returns:
+            The root of the optimized tree.
+        """
+        return self.__run(self.__visit(st, {}))
+
+    def __run(self, visit):
+        """Runs the visit of the root and the visits it yields, returns the optimized root."""
+        visits = [visit]
+        result = None
+        while visits:
+            try:
+                node, constants = visits[-1].send(result)
+            except StopIteration as stop:
+                # the visit is done, its result goes to the visit which yielded it
+                visits.pop()
+                result = stop.value
+                continue
+            visits.append(self.__visit(node, constants))
+            result = None
+        return result
+
+    def __visit(self, node: STNode, constants: dict):
+        """
+        Visits the node, yields the (node, constants) of the children to visit and returns the 
+        optimized node. The right sibling of the node is left to the caller.
+
+        Args:
+            node (STNode): The node to optimize.
+            constants (dict): The literal nodes of the names bound to a literal in scope.
+        """
+        if node.is_id():
+            literal = constants.get(node.parseValueInToken())
+            return node if literal is None else STOptimizer.__copy(literal)
+
+        if node.is_lambda():
+            variables = node.getLeft()
+            # the names bound by the lambda hide the constants of the same names in its body
+            hidden = {name: constants.pop(name) for name in STOptimizer.__boundNames(variables) if name in constants}
+            body = yield (variables.getRight(), constants)
+            constants.update(hidden)
+            STOptimizer.__setChildren(node, [variables, body])
+            return node
+
+        if node.is_gamma() and node.getLeft().is_lambda():
+            # let x = E in P is standardized to gamma(lambda(x, P), E)
+            _lambda: STNode = node.getLeft()
+            variable: STNode = _lambda.getLeft()
+            value = yield (_lambda.getRight(), constants)
+            if variable.is_id() and STOptimizer.__scalar(value) is not None:
+                name = variable.parseValueInToken()
+                previous = constants.get(name, STOptimizer.__MISSING)
+                constants[name] = value
+                body = yield (variable.getRight(), constants)
+                if previous is STOptimizer.__MISSING:
+                    del constants[name]
+                else:
+                    constants[name] = previous
+                return body
+            _lambda = yield (_lambda, constants)
+            STOptimizer.__setChildren(node, [_lambda, value])
+            return node
+
+        value = node.getValue()
+        if isinstance(value, str) and value == Nodes.COND:
+            condition_node: STNode = node.getLeft()
+            # the siblings are read first, visiting a child may relink it
+            then_node: STNode = condition_node.getRight()
+            else_node: STNode = then_node.getRight()
+            condition = yield (condition_node, constants)
+            scalar = STOptimizer.__scalar(condition)
+            if scalar is not None:
+                # the CSE machine takes the then branch if the condition equals True
+                return (yield (then_node if scalar[0] == True else else_node, constants))
+            _then = yield (then_node, constants)
+            _else = yield (else_node, constants)
+            STOptimizer.__setChildren(node, [condition, _then, _else])
+            return node
+
+        children = []
+        child = node.getLeft()
+        while child is not None:
+            # the sibling is read first, visiting the child may relink it
+            sibling = child.getRight()
+            children.append((yield (child, constants)))
+            child = sibling
+        STOptimizer.__setChildren(node, children)
+
+        if not isinstance(value, str):
+            return node
+        if value in Nodes.BOP and value not in STOptimizer.__NOT_FOLDED and len(children) == 2:
+            return STOptimizer.__fold(node, value, children)
+        if value in Nodes.UOP and len(children) == 1:
+            return STOptimizer.__fold(node, value, children)
+        if value == Nodes.TAU:
+            return STOptimizer.__formTuple(node, children)
+        return node
+
+    @staticmethod
+    def __fold(node, operator, children):
+        """Returns a literal for the operator applied to literal operands, the node if it can not be folded."""
+        operands = [STOptimizer.__scalar(child) for child in children]
+        if None in operands:
+            return node
+        operands = [operand[0] for operand in operands]
+        if STOptimizer.__tooLarge(operator, operands):
+            return node
+        try:
+            result = Operators.apply(operator, *operands)
+        except Exception:
+            # leave the error to the run time
+            return node
+        literal = STOptimizer.__literal(result)
+        return node if literal is None else literal
+
+    @staticmethod
+    def __tooLarge(operator, operands):
+        """Returns True if the result of the operator applied to the operands may be larger than MAX_FOLDED_BITS."""
+        if operator == Nodes.POWER:
+            base, exponent = operands
+            return (isinstance(base, int) and isinstance(exponent, int) and exponent > 0
+                    and exponent * max(abs(base).bit_length(), 1) > STOptimizer.MAX_FOLDED_BITS)
+        if operator == Nodes.MULTIPLY:
+            left, right = operands
+            if isinstance(left, str) or isinstance(right, str):
+                # a string multiplied by an integer is repeated
+                string, count = (left, right) if isinstance(left, str) else (right, left)
+                return isinstance(count, int) and len(string) * 8 * count > STOptimizer.MAX_FOLDED_BITS
+            return (isinstance(left, int) and isinstance(right, int)
+                    and abs(left).bit_length() + abs(right).bit_length() > STOptimizer.MAX_FOLDED_BITS)
+        return False
+
+    @staticmethod
+    def __formTuple(node, children):
+        """Returns a node holding the formed tuple if all the elements are literals, else the node."""
+        elements = []
+        for child in children:
+            value = child.getValue()
+            if value.__class__ is TupleSymbol:
+                elements.append(value.tuple)
+                continue
+            scalar = STOptimizer.__scalar(child)
+            if scalar is None:
+                return node
+            elements.append(scalar[0])
+        return STNode(TupleSymbol(len(elements), elements))
+
+    @staticmethod
+    def __scalar(node: STNode):
+        """
+        Returns (value,) if the node is a literal which is not a tuple, None otherwise.
+
+        The value is the one the CSE machine pushes for the literal.
+        """
+        value = node.getValue()
+        if isinstance(value, IntegerToken):
+            return (int(value.getValue()),)
+        if isinstance(value, StringToken):
+            return (value.getValue().strip("'"),)
+        if isinstance(value, Token):
+            return None
+        if value == Nodes.TRUE or value == Nodes.FALSE:
+            return (value == Nodes.TRUE,)
+        if value == Nodes.NIL or value == Nodes.DUMMY:
+            return (value,)
+        if value == Nodes.NEG and isinstance(node.getLeft().getValue(), IntegerToken):
+            # negative integers are kept as neg applied to the absolute value
+            return (-int(node.getLeft().getValue().getValue()),)
+        return None
+
+    @staticmethod
+    def __literal(value):
+        """Returns a literal node for the value, None if the value has no literal."""
+        if value.__class__ is bool:
+            return STNode(Nodes.TRUE if value else Nodes.FALSE)
+        if value.__class__ is int:
+            try:
+                digits = str(abs(value))
+            except ValueError:
+                # too many digits to convert
+                return None
+            literal = STNode(IntegerToken(digits, None, None))
+            # the symbol factory only reads non negative integer literals
+            return literal if value >= 0 else STNode(Nodes.NEG, literal)
+        if value.__class__ is str and "'" not in value:
+            return STNode(StringToken(f"'{value}'", None, None))
+        return None
+
+    @staticmethod
+    def __copy(literal: STNode):
+        """Returns a copy of a literal node without its sibling."""
+        operand = literal.getLeft()
+        if operand is not None:
+            # neg applied to an integer literal
+            operand = STNode(operand.getValue())
+        return STNode(literal.getValue(), operand)
+
+    @staticmethod
+    def __boundNames(variables: STNode):
+        """Returns the names bound by the variables of a lambda."""
+        if variables.isValue(Nodes.COMMA):
+            names = set()
+            variable = variables.getLeft()
+            while variable is not None:
+                names.add(variable.parseValueInToken())
+                variable = variable.getRight()
+            return names
+        return {variables.parseValueInToken()}
+
+    @staticmethod
+    def __setChildren(node: STNode, children):
+        """Links the children to the node as its first child and the siblings of it."""
+        for i in range(len(children) - 1):
+            children[i].setRight(children[i + 1])
+        if len(children) > 0:
+            children[-1].setRight(None)
+        node.setLeft(children[0] if len(children) > 0 else None)
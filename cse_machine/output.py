@@ -0,0 +1,192 @@
+import contextlib
+import contextvars
+import io
+import os
+import sys
+
+
+class OutputSink:
+    """
+    Receives the output of the Print function while a program runs.
+
+    The text written is held in a buffer and emitted in chunks of about bufferSize characters,
+    or less when the sink is flushed, so a program which prints a lot does not have to keep
+    its whole output in memory. An engine makes its sink the current one while it evaluates a
+    program (see receiving), Print writes to the current sink.
+
+    Attributes:
+        written (int): The number of characters written to the sink so far.
+    """
+
+    DEFAULT_BUFFER_SIZE = 64 * 1024
+
+    # the sink of the engine which is evaluating a program, in this thread
+    __CURRENT = contextvars.ContextVar("output", default=None)
+
+    def __init__(self, bufferSize = DEFAULT_BUFFER_SIZE):
+        """
+        Args:
+            bufferSize (int): The number of characters buffered before they are emitted, 0 to
+                emit the output of each Print as it runs.
+        """
+        self.written = 0
+        self.__bufferSize = bufferSize
+        self.__buffer = []
+        self.__buffered = 0
+
+    def write(self, text):
+        """Writes the text to the sink, emits the buffered text if the buffer is full."""
+        self.written += len(text)
+        self.__buffer.append(text)
+        self.__buffered += len(text)
+        if self.__buffered >= self.__bufferSize:
+            self.flush()
+
+    def flush(self):
+        """Emits the buffered text."""
+        if self.__buffer:
+            text = "".join(self.__buffer)
+            self.__buffer.clear()
+            self.__buffered = 0
+            self.emit(text)
+
+    def emit(self, text):
+        """Delivers a chunk of the output, implemented by the subclasses."""
+        raise NotImplementedError
+
+    @contextlib.contextmanager
+    def receiving(self):
+        """Makes the sink the current one while the block runs, flushes it when the block exits."""
+        token = OutputSink.__CURRENT.set(self)
+        try:
+            yield self
+        finally:
+            OutputSink.__CURRENT.reset(token)
+            self.flush()
+
+    @staticmethod
+    def current():
+        """Returns the sink of the engine which is evaluating a program, one writing to sys.stdout if there is none."""
+        sink = OutputSink.__CURRENT.get()
+        if sink is None:
+            return StreamSink(bufferSize=0)
+        return sink
+
+    @staticmethod
+    def create(output):
+        """
+        Returns the sink for output, which is an OutputSink, a function called with each chunk
+        of the output or None for a sink writing to sys.stdout.
+        """
+        if output is None:
+            return StreamSink()
+        if isinstance(output, OutputSink):
+            return output
+        if callable(output):
+            return CallbackSink(output)
+        raise TypeError(f"Invalid output: {output!r}")
+
+
+class StreamSink(OutputSink):
+    """
+    Writes the output to a text stream.
+
+    Attributes:
+        stream: The stream written to, None for the sys.stdout of the time of the write.
+    """
+
+    def __init__(self, stream = None, bufferSize = OutputSink.DEFAULT_BUFFER_SIZE):
+        super().__init__(bufferSize)
+        self.stream = stream
+
+    def emit(self, text):
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.write(text)
+
+
+class FdSink(OutputSink):
+    """
+    Writes the output to a file descriptor, bypassing sys.stdout.
+
+    The chunks are encoded and written a buffer at a time, so at most one buffer of encoded
+    text is held in memory, however long the text of a single Print is.
+
+    Attributes:
+        fd (int): The file descriptor written to.
+        encoding (str): The encoding of the text.
+    """
+
+    def __init__(self, fd, encoding = "utf-8", bufferSize = OutputSink.DEFAULT_BUFFER_SIZE):
+        super().__init__(bufferSize)
+        self.fd = fd
+        self.encoding = encoding
+        self.__chunkSize = max(bufferSize, 1)
+
+    def emit(self, text):
+        for start in range(0, len(text), self.__chunkSize):
+            data = memoryview(text[start:start + self.__chunkSize].encode(self.encoding))
+            while data:
+                # a pipe may take less than it is given
+                data = data[os.write(self.fd, data):]
+
+
+class CallbackSink(OutputSink):
+    """
+    Calls a function with each chunk of the output.
+
+    Attributes:
+        callback: The function called with each chunk.
+    """
+
+    def __init__(self, callback, bufferSize = 0):
+        super().__init__(bufferSize)
+        self.callback = callback
+
+    def emit(self, text):
+        self.callback(text)
+
+
+class BufferSink(OutputSink):
+    """Keeps the whole output in memory, to read it when the program ends."""
+
+    def __init__(self):
+        super().__init__(bufferSize=0)
+        self.__output = io.StringIO()
+
+    def emit(self, text):
+        self.__output.write(text)
+
+    def getvalue(self):
+        """Returns the output written so far."""
+        self.flush()
+        return self.__output.getvalue()
+
+
+class SkipSink(OutputSink):
+    """
+    Passes the output to another sink, except for the characters it has already received.
+
+    Used when a program is evaluated again after a failed attempt which printed some of its
+    output, the evaluations print the same text, so the output is not repeated.
+
+    Attributes:
+        sink (OutputSink): The sink the output is passed to.
+        skip (int): The number of characters still to drop.
+    """
+
+    def __init__(self, sink: OutputSink, skip):
+        super().__init__(bufferSize=0)
+        self.sink = sink
+        self.skip = skip
+
+    def write(self, text):
+        self.written += len(text)
+        if self.skip:
+            dropped = min(self.skip, len(text))
+            self.skip -= dropped
+            text = text[dropped:]
+        if text:
+            self.sink.write(text)
+
+    def flush(self):
+        self.sink.flush()
@@ -0,0 +1,178 @@
+from abstractst.nodes import Nodes
+from lexer.tokens import Token
+
+from .control_structures import ControlStruct, ControlStructures
+from .functions import FunctionFactory
+from .st import STNode
+from .symbol import *
+
+
+class Serializer:
+    """
+    Converts control structures and standardized trees to and from plain data.
+
+    The data is made of tuples, lists, strings, integers, truth values and None only, so it
+    can be written with marshal. Every symbol becomes a tuple of a symbol code and the
+    attributes needed to create it again, including the resolved addresses of identifiers,
+    the (name, arity) of intrinsics and the items of tuples formed before the evaluation.
+    A tree is written in pre-order, each node followed by its number of children.
+    """
+
+    NAME = 0
+    LAMBDA = 1
+    GAMMA = 2
+    DELTA = 3
+    BETA = 4
+    TAU = 5
+    TUPLE = 6
+    BINOP = 7
+    UNOP = 8
+    YSTAR = 9
+    INTRINSIC = 10
+
+    # node values which are not strings
+    __TOKEN = 0
+    __TUPLE = 1
+
+    # the reserved node values, the same objects as in Nodes since some are compared by identity
+    __RESERVED = {value: value for name, value in vars(Nodes).items()
+                  if not name.startswith("_") and isinstance(value, str)}
+
+    # the token classes, by name
+    __TOKENS = {cls.__name__: cls for cls in Token.__subclasses__()}
+
+    @staticmethod
+    def dumpControlStructures(csMap: ControlStructures):
+        """Returns the control structures as a list of (delta index, symbols) pairs."""
+        return [(index, [Serializer.__dumpSymbol(symbol) for symbol in cs]) for index, cs in csMap.items()]
+
+    @staticmethod
+    def loadControlStructures(data) -> ControlStructures:
+        """Creates the control structures written by dumpControlStructures."""
+        control_structure_map = {}
+        for index, symbols in data:
+            cs = ControlStruct(index)
+            for symbol in symbols:
+                cs.addSymbol(Serializer.__loadSymbol(symbol))
+            control_structure_map[index] = cs
+        return ControlStructures(control_structure_map)
+
+    @staticmethod
+    def __dumpSymbol(symbol: Symbol):
+        cls = symbol.__class__
+        if cls is NameSymbol:
+            return (Serializer.NAME, symbol.name, symbol.is_id, symbol.address)
+        if cls is LambdaSymbol:
+            return (Serializer.LAMBDA, symbol.index, symbol.variables)
+        if cls is GammaSymbol:
+            return (Serializer.GAMMA,)
+        if cls is DeltaSymbol:
+            return (Serializer.DELTA, symbol.index)
+        if cls is BetaSymbol:
+            return (Serializer.BETA,)
+        if cls is TauSymbol:
+            return (Serializer.TAU, symbol.n)
+        if cls is TupleSymbol:
+            return (Serializer.TUPLE, symbol.n, symbol.tuple)
+        if cls is BinaryOperatorSymbol:
+            return (Serializer.BINOP, symbol.operator)
+        if cls is UnaryOperatorSymbol:
+            return (Serializer.UNOP, symbol.operator)
+        if cls is YStarSymbol:
+            return (Serializer.YSTAR,)
+        if cls is IntrinsicSymbol:
+            return (Serializer.INTRINSIC, symbol.func.getName(), symbol.arity)
+        raise Exception(f"Invalid symbol:{symbol, type(symbol)} in control structure")
+
+    @staticmethod
+    def __loadSymbol(data):
+        code = data[0]
+        if code == Serializer.NAME:
+            symbol = NameSymbol(data[1], data[2])
+            symbol.address = data[3]
+            return symbol
+        if code == Serializer.LAMBDA:
+            return LambdaSymbol(data[1], data[2])
+        if code == Serializer.GAMMA:
+            return GammaSymbol()
+        if code == Serializer.DELTA:
+            return DeltaSymbol(data[1])
+        if code == Serializer.BETA:
+            return BetaSymbol()
+        if code == Serializer.TAU:
+            return TauSymbol(data[1])
+        if code == Serializer.TUPLE:
+            return TupleSymbol(data[1], data[2])
+        if code == Serializer.BINOP:
+            return BinaryOperatorSymbol(data[1])
+        if code == Serializer.UNOP:
+            return UnaryOperatorSymbol(data[1])
+        if code == Serializer.YSTAR:
+            return YStarSymbol()
+        if code == Serializer.INTRINSIC:
+            return IntrinsicSymbol(FunctionFactory.create(data[1]), data[2])
+        raise ValueError(f"Invalid symbol code: {code}")
+
+    @staticmethod
+    def dumpTree(st: STNode):
+        """Returns the tree as a list of (node value, number of children) in pre-order."""
+        data = []
+        pending = [st]
+        while len(pending) > 0:
+            node: STNode = pending.pop()
+            children = []
+            child = node.getLeft()
+            while child is not None:
+                children.append(child)
+                child = child.getRight()
+            data.append((Serializer.__dumpValue(node.getValue()), len(children)))
+            children.reverse()
+            pending.extend(children)
+        return data
+
+    @staticmethod
+    def loadTree(data) -> STNode:
+        """Creates the tree written by dumpTree."""
+        root = None
+        # [node, children left to read, last child read] of the nodes whose children are being read
+        parents = []
+        for value, n_children in data:
+            node = STNode(Serializer.__loadValue(value))
+            if len(parents) == 0:
+                root = node
+            else:
+                parent = parents[-1]
+                if parent[2] is None:
+                    parent[0].setLeft(node)
+                else:
+                    parent[2].setRight(node)
+                parent[1] -= 1
+                parent[2] = node
+            if n_children > 0:
+                parents.append([node, n_children, None])
+            while len(parents) > 0 and parents[-1][1] == 0:
+                parents.pop()
+        return root
+
+    @staticmethod
+    def __dumpValue(value):
+        if isinstance(value, str):
+            return value
+        if isinstance(value, Token):
+            return (Serializer.__TOKEN, value.__class__.__name__, value.type, value.value, value.line, value.col)
+        if value.__class__ is TupleSymbol:
+            return (Serializer.__TUPLE, value.n, value.tuple)
+        raise Exception(f"Invalid node type:{value}")
+
+    @staticmethod
+    def __loadValue(data):
+        if isinstance(data, str):
+            return Serializer.__RESERVED.get(data, data)
+        if data[0] == Serializer.__TOKEN:
+            cls = Serializer.__TOKENS[data[1]]
+            token = cls.__new__(cls)
+            Token.__init__(token, data[2], data[3], data[4], data[5])
+            return token
+        if data[0] == Serializer.__TUPLE:
+            return TupleSymbol(data[1], data[2])
+        raise ValueError(f"Invalid node value: {data}")
@@ -11,6 +11,8 @@ class STNode(ASTNode):
     Each node contains a reference to its node value, left child, and right sibling.
     """
 
+    __slots__ = ()
+
     @staticmethod
     def createFCRSNode(value, left:BinaryTreeNode= None, right:BinaryTreeNode = None):
         """
@@ -1,4 +1,3 @@
-from typing import List
 from .symbol import EnvMarkerSymbol, Symbol
 
 
@@ -6,30 +5,59 @@ class Stack:
     
     """
     The stack to evaluate the CONTROL.
+
+    The top of the stack is kept at the end of the underlying list so that 
+    push, pop and top are amortized O(1).
     
     Methods:
         popStack() -> Symbol: Pops the top element from the stack.
         top() -> Symbol: Returns the top element of the stack.
         pushStack(symbol: Symbol): Pushes the symbol to the stack.
+        pushEnvMarker(envMarker: EnvMarkerSymbol): Pushes an environment marker to the stack.
         removeEnvironment(envMarker: EnvMarkerSymbol): Removes the environment marker from the stack.
+        isEnvMarkerOnTop() -> bool: Checks whether the top of the stack is the innermost environment marker.
     """    
     
     def __init__(self):
-        self.__arr: List[Symbol] = []
+        self.__arr: list[Symbol] = []
+        # positions of the environment markers in __arr, the innermost marker is last
+        self.__markers: list[int] = []
 
     def popStack(self) -> Symbol:
-        popElement = self.__arr.pop(0)
+        popElement = self.__arr.pop()
         return popElement
     
     def top(self) -> Symbol:
-        return self.__arr[0]
+        return self.__arr[-1]
     
     def pushStack(self, symbol: Symbol):
-        self.__arr.insert(0,symbol)
+        self.__arr.append(symbol)
+    
+    def pushEnvMarker(self, envMarker: EnvMarkerSymbol):
+        """Pushes an environment marker to the stack and records its position."""
+        self.__markers.append(len(self.__arr))
+        self.__arr.append(envMarker)
     
     def removeEnvironment(self, envMarker: EnvMarkerSymbol):
-        self.__arr.remove(envMarker)
+        """
+        Removes the innermost environment marker from the stack.
+
+        Environments are exited in the reverse order they were entered, so the marker 
+        of the exited environment is always the last recorded one. The recorded position is
+        checked to still hold the marker (the control holds an equal marker, not the same
+        one), so a stale position is not mistaken for whatever was pushed in its place.
+        """
+        if (len(self.__markers) == 0 or self.__markers[-1] >= len(self.__arr)
+                or self.__arr[self.__markers[-1]] != envMarker):
+            raise ValueError(f"Environment marker {envMarker} is not in the stack")
+        del self.__arr[self.__markers.pop()]
+
+    def isEnvMarkerOnTop(self) -> bool:
+        """Returns True if the top of the stack is the innermost environment marker."""
+        return len(self.__markers) > 0 and self.__markers[-1] == len(self.__arr) - 1
+
+    def __len__(self):
+        return len(self.__arr)
 
     def __repr__(self) -> str:
-        return f"{self.__arr}"
- 
\ No newline at end of file
+        return f"{self.__arr[::-1]}"
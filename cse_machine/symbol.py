@@ -1,5 +1,6 @@
-from typing import Iterable
+from collections.abc import Iterable
 from abstractst.nodes import Nodes
+from cse_machine.exceptions import FallbackException
 from cse_machine.functions import DefinedFunctions
 from .st import STNode
 # from logger import logger
@@ -7,6 +8,8 @@ from .st import STNode
 class Symbol:
     
     """Represents symbols in the CSE machine."""
+
+    __slots__ = ()
     
     def __init__(self):
         pass
@@ -24,6 +27,9 @@ class SymbolFactory:
     @staticmethod
     def createSymbol(node:STNode):
         value = node.getValue()
+        if isinstance(value, TupleSymbol):
+            # a tuple of literals formed by the STOptimizer
+            return value
         if node.is_gamma():
             return GammaSymbol()
         elif node.is_name():
@@ -57,8 +63,12 @@ class NameSymbol(Symbol):
         name (str): The name of the symbol.
         nameType (type): The type of the symbol.
         is_id (bool): True if the symbol is an identifier.
+        address (tuple): The (depth, slot) of the variable the identifier refers to, 
+            None if the identifier is not bound by an enclosing lambda.
     """
 
+    __slots__ = ("name", "nameType", "is_id", "address")
+
     def __repr__(self):
         name = self.name
         # if the name is a string(non identifier), add quotes for representation
@@ -74,6 +84,7 @@ class NameSymbol(Symbol):
         self.name = name  
         self.nameType = name.__class__
         self.is_id = is_id
+        self.address = None
 
     def isId(self):
         """Returns if the symbol is an identifier."""
@@ -81,7 +92,7 @@ class NameSymbol(Symbol):
 
     def isFunction(self):
         """Returns True if the symbol is a function."""
-        return self.name in DefinedFunctions.get_functions()
+        return DefinedFunctions.isdefined(self.name)
 
     def isString(self):
         """Returns True if the symbol is a string."""
@@ -104,6 +115,9 @@ class NameSymbol(Symbol):
             
 class OperatorSymbol(Symbol):
     """"Represents an operator symbol."""
+
+    __slots__ = ("operator",)
+
     def __init__(self, operator):
         super().__init__()
         self.operator = operator
@@ -114,6 +128,8 @@ class OperatorSymbol(Symbol):
 class FunctionSymbol(Symbol):
     """Represents a function symbol."""
 
+    __slots__ = ("func",)
+
     def __init__(self, func):
         super().__init__()
         self.func = func
@@ -121,21 +137,53 @@ class FunctionSymbol(Symbol):
     def __repr__(self):
         return f"<{self.func}>"
     
+
+class IntrinsicSymbol(Symbol):
+    """
+    Represents the application of a predefined function, resolved when the control structures are built.
+
+    Stands for the function name and the gammas that apply it, so the function is neither 
+    looked up nor created at run time.
+
+    Attributes:
+        func (DefinedFunction): The predefined function.
+        arity (int): The number of arguments (and gammas) it takes, 2 for Conc and 1 otherwise.
+    """
+
+    __slots__ = ("func", "arity")
+
+    def __init__(self, func, arity = 1):
+        super().__init__()
+        self.func = func
+        self.arity = arity
+
+    def __repr__(self):
+        return f"<{self.func}:{self.arity}>"
+    
     
 class BinaryOperatorSymbol(OperatorSymbol):
     """Represents a binary operator symbol."""
+
+    __slots__ = ()
+
     def __init__(self, operator):
         super().__init__(operator)
 
         
 class UnaryOperatorSymbol(OperatorSymbol):
     """Represents a unary operator symbol."""
+
+    __slots__ = ()
+
     def __init__(self, operator):
         super().__init__(operator)
         
               
 class GammaSymbol(Symbol):
     """Represents a gamma Symbol."""
+
+    __slots__ = ()
+
     
     def __init__(self):
         super().__init__()
@@ -151,6 +199,9 @@ class LambdaSymbol(Symbol):
         index (int): The index of the lambda in the control structure array.
         variables (Iterable): The variables of the lambda.
     """
+
+    __slots__ = ("index", "variables")
+
     
     def __init__(self, index, variables:Iterable):
         super().__init__()
@@ -166,12 +217,21 @@ class LambdaClosureSymbol(LambdaSymbol):
     Extends the Lambda class.
        
     Attributes:
+        env (Environment): The environment the lambda closure was created in.
         envMarker (EnvMarkerSymbol): The environment marker the lambda closure.    
     """
+
+    __slots__ = ("env", "envMarker")
+
     
-    def __init__(self, variables, index, envIndex):
+    def __init__(self, variables, index, env):
         super().__init__(index, variables)
-        self.envMarker: EnvMarkerSymbol = EnvMarkerSymbol(envIndex)
+        # hold the environment itself so that it lives exactly as long as its closures
+        self.env = env
+        self.envMarker: EnvMarkerSymbol = env.envMarker
+    
+    def getEnv(self):
+        return self.env
     
     def getEnvMarkerIndex(self):
         return self.envMarker.envIndex
@@ -189,9 +249,12 @@ class EtaClosureSymbol(LambdaClosureSymbol):
         fromLambdaClosure(lambdaClosure:LambdaClosureSymbol) -> EtaClosureSymbol: Creates an eta closure from a lambda closure.
         toLambdaClosure(etaClosure) -> LambdaClosureSymbol: Converts an eta closure to a lambda closure.
     """
+
+    __slots__ = ()
+
     
-    def __init__(self, variables, index, envIndex):
-        super().__init__(variables, index, envIndex)
+    def __init__(self, variables, index, env):
+        super().__init__(variables, index, env)
     
     def __repr__(self):
         return f"<eta, ({', '.join(self.variables)}), {self.index}, {self.envMarker}>"
@@ -199,12 +262,12 @@ class EtaClosureSymbol(LambdaClosureSymbol):
     @staticmethod
     def fromLambdaClosure(lambdaClosure:LambdaClosureSymbol):
         
-        return EtaClosureSymbol(lambdaClosure.variables, lambdaClosure.index, lambdaClosure.getEnvMarkerIndex())
+        return EtaClosureSymbol(lambdaClosure.variables, lambdaClosure.index, lambdaClosure.getEnv())
     
     @staticmethod
     def toLambdaClosure(etaClosure):
         
-        return LambdaClosureSymbol(etaClosure.variables, etaClosure.index, etaClosure.getEnvMarkerIndex())
+        return LambdaClosureSymbol(etaClosure.variables, etaClosure.index, etaClosure.getEnv())
 
 class EnvMarkerSymbol(Symbol):
     
@@ -217,6 +280,9 @@ class EnvMarkerSymbol(Symbol):
     Methods:
         __eq__(other) -> bool: Checks whether an instance of the EnvMarkerSymbol and then checks whether equal.
     """
+
+    __slots__ = ("envIndex",)
+
     
     def __init__(self, envIndex):
         super().__init__()
@@ -238,6 +304,9 @@ class DeltaSymbol(Symbol):
     Attributes: 
         index (int): Points to relevant control structure in the control structure array.
     """
+
+    __slots__ = ("index",)
+
     
     def __init__(self, index):
         super().__init__()
@@ -253,6 +322,9 @@ class BetaSymbol(Symbol):
     
     Used when representing a conditonal operator in the control without standardizing.
     """
+
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
 
@@ -267,6 +339,9 @@ class TauSymbol(Symbol):
     
     Used when representing a tau node in the control.	
     """
+
+    __slots__ = ("n",)
+
     def __init__(self, n):
         super().__init__()
         self.n = n
@@ -280,6 +355,9 @@ class TupleSymbol(TauSymbol):
     
     Used in standardizing the tau node in the st.
     """
+
+    __slots__ = ("tuple",)
+
     def __init__(self, n, tupleList):
         super().__init__(n)
         self.tuple = tuple(tupleList)
@@ -294,5 +372,86 @@ class YStarSymbol(Symbol):
     
     """Represents a Y* symbol."""
 
+    __slots__ = ()
+
     def __repr__(self):
         return f"Y*"
+
+
+class MemoStoreSymbol(Symbol):
+
+    """
+    Stores the value on the top of the stack as the result of a memoized function call.
+
+    Added to the control below the gammas of CSE Rule 13, so it is evaluated when the call returns.
+
+    Attributes:
+        key (tuple): The key of the call in the memo table.
+    """
+
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        super().__init__()
+        self.key = key
+
+    def __repr__(self):
+        return f"memo"
+
+
+class NothingSymbol(Symbol):
+
+    """
+    The result of a predefined function which returns nothing (Print), in the BytecodeVM and
+    the ClosureEngine.
+
+    The CSE machine pushes nothing to the stack for it, so a program which uses the result
+    reads whatever is below it on the stack. The other engines can not do that, so they fall
+    back to the CSE machine when the result is used. Reading its name, as operators, conditions
+    and predefined functions do, raises FallbackException.
+    """
+
+    __slots__ = ()
+
+    @property
+    def name(self):
+        raise FallbackException("The result of Print is used")
+
+    def __repr__(self):
+        return "nothing"
+
+
+class StackValue:
+
+    """
+    The values the BytecodeVM and the ClosureEngine hold where the CSE machine holds a NameSymbol.
+
+    Plain values (integers, strings, truth values) are kept without wrapping them, so the
+    engines convert the values they push and the arguments of the predefined functions here.
+    """
+
+    @staticmethod
+    def wrap(value):
+        """
+        Returns value as it is held on the stack when the CSE machine wraps it in a NameSymbol.
+
+        Plain values are kept as they are, NameSymbol strips the quotes of strings. Symbols
+        (eg. a tuple bound to a variable) stay wrapped in a NameSymbol.
+        """
+        if value.__class__ is str:
+            return value.strip("'")
+        if isinstance(value, Symbol):
+            return NameSymbol(value)
+        return value
+
+    @staticmethod
+    def argument(rand):
+        """Returns the argument passed to a predefined function for a stack value. See CSEMachine.get_arg"""
+        if not isinstance(rand, Symbol):
+            return rand
+        if rand.__class__ is TupleSymbol:
+            return rand.tuple
+        value = rand.name
+        if isinstance(value, TupleSymbol):
+            return value.tuple
+        return value
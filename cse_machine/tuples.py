@@ -0,0 +1,104 @@
+class PersistentTuple:
+    """
+    An immutable RPAL tuple with amortized O(1) aug.
+
+    A tuple is a view of the first length items of a buffer shared with the tuples it was
+    augmented from. aug appends to the buffer in place when the tuple is the longest view
+    of it, so building a tuple with the usual recursive aug idiom appends to a single list.
+    Augmenting an older view copies its items into a new buffer first, which keeps every
+    tuple immutable.
+
+    The tuple compares, hashes, indexes and prints like the python tuple of its items, so
+    Order, tuple selection, Istuple, eq and Print accept it without copying it.
+
+    Attributes:
+        __buffer (list): The items, shared with the other views of the buffer.
+        __length (int): The number of items of the buffer in this tuple.
+    """
+
+    __slots__ = ("__buffer", "__length")
+
+    def __init__(self, buffer = None, length = None):
+        self.__buffer = [] if buffer is None else buffer
+        self.__length = len(self.__buffer) if length is None else length
+
+    @staticmethod
+    def isTuple(value):
+        """Returns True if the value is an RPAL tuple, a python tuple or a PersistentTuple."""
+        return isinstance(value, (tuple, PersistentTuple))
+
+    @staticmethod
+    def fromValue(value):
+        """Returns the value as a PersistentTuple, copying it only if it is a python tuple."""
+        if isinstance(value, PersistentTuple):
+            return value
+        return PersistentTuple(list(value))
+
+    def extend(self, items):
+        """Returns a new tuple with the items appended."""
+        buffer = self.__buffer
+        if len(buffer) != self.__length:
+            # a longer tuple already shares the buffer, so this one gets a copy
+            buffer = buffer[:self.__length]
+        buffer.extend(items)
+        return PersistentTuple(buffer, len(buffer))
+
+    def __len__(self):
+        return self.__length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self)[index]
+        if index < 0:
+            index += self.__length
+        if index < 0 or index >= self.__length:
+            raise IndexError("tuple index out of range")
+        return self.__buffer[index]
+
+    def __iter__(self):
+        buffer = self.__buffer
+        for i in range(self.__length):
+            yield buffer[i]
+
+    def __eq__(self, other):
+        if not PersistentTuple.isTuple(other):
+            return NotImplemented
+        if len(other) != self.__length:
+            return False
+        buffer = self.__buffer
+        for i, item in enumerate(other):
+            if buffer[i] != item:
+                return False
+        return True
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __lt__(self, other):
+        return tuple(self) < tuple(other) if PersistentTuple.isTuple(other) else NotImplemented
+
+    def __le__(self, other):
+        return tuple(self) <= tuple(other) if PersistentTuple.isTuple(other) else NotImplemented
+
+    def __gt__(self, other):
+        return tuple(self) > tuple(other) if PersistentTuple.isTuple(other) else NotImplemented
+
+    def __ge__(self, other):
+        return tuple(self) >= tuple(other) if PersistentTuple.isTuple(other) else NotImplemented
+
+    def __add__(self, other):
+        return tuple(self) + tuple(other) if PersistentTuple.isTuple(other) else NotImplemented
+
+    def __radd__(self, other):
+        return tuple(other) + tuple(self) if PersistentTuple.isTuple(other) else NotImplemented
+
+    def __mul__(self, n):
+        return tuple(self) * n
+
+    __rmul__ = __mul__
+
+    def __repr__(self):
+        # the same as the repr of the python tuple of the items
+        if self.__length == 1:
+            return f"({self.__buffer[0]!r},)"
+        return f"({', '.join(repr(item) for item in self)})"
@@ -0,0 +1,375 @@
+from cse_machine.exceptions import FallbackException, MachineException
+
+from .bytecode import Bytecode, BytecodeCompiler, OpCode
+from .control_structures import CSInitializer, ControlStructures
+from .environment import Environment
+from .functions import DefinedFunction, FunctionFactory
+from .memo import MemoTable, Memoizer
+from .operators import Operators
+from .output import OutputSink, SkipSink
+from .st import STNode
+from .symbol import *
+
+
+class BytecodeVM:
+    """
+    Evaluates a program compiled to bytecode. An alternative engine to the CSEMachine.
+
+    The VM follows the CSE machine rules, but executes each lambda body from a flat
+    instruction array instead of copying its control structure into the control.
+    The control is represented by the current instruction array and program counter
+    plus a stack of return frames, and plain values (integers, strings, truth values)
+    are kept on the stack without wrapping them in NameSymbols. A call in tail position
+    (followed only by a RETURN) does not push a return frame.
+
+    A program the VM can not evaluate as the CSE machine would, because it uses the result of
+    Print (see NothingSymbol) or a predefined function reads below the bottom of the stack, is
+    evaluated again by the CSE machine, which skips as much of its output as was already written.
+
+    Attributes:
+        csMap (ControlStructures): The control structures the bytecode was compiled from.
+        bytecode (Bytecode): The compiled program.
+        envIndexCounter (int): The environment index counter use to create new environments.
+        memoizer (Memoizer): Memoizes the applications of recursive functions, None if memoization is off.
+        output (OutputSink): The sink the output of Print is written to.
+        fellBack (bool): True if the program was evaluated by the CSE machine.
+    """
+
+    # evaluates the two gammas of CSE Rule 13 in the current environment
+    __FP_CODE = [OpCode.GAMMA, 0, OpCode.GAMMA, 0, OpCode.RETURN, 0]
+    # the same, then stores the result of the memoized call
+    __MEMO_FP_CODE = [OpCode.GAMMA, 0, OpCode.GAMMA, 0, OpCode.MEMO_STORE, 0, OpCode.RETURN, 0]
+
+    def __init__(self, st: STNode, memo: MemoTable = None, csMap: ControlStructures = None, output = None):
+        """
+        Compiles the given standardized tree to bytecode.
+
+        Args:
+            st (STNode): The standardized tree which is used to generate control structures.
+            memo (MemoTable): The table to memoize the results of recursive functions in, 
+                None to turn memoization off.
+            csMap (ControlStructures): The control structures of the program if they are already
+                built (eg. read from the cache), st is not used then.
+            output: The OutputSink the output of Print is written to, or a function called with each
+                chunk of the output. None to write to sys.stdout.
+        """
+        self.csMap = csMap if csMap is not None else CSInitializer(st).init()
+        self.bytecode: Bytecode = BytecodeCompiler(self.csMap).compile()
+        self.envIndexCounter = 0
+        self.memoizer = Memoizer(self.csMap, memo) if memo is not None else None
+        self.output = OutputSink.create(output)
+        self.fellBack = False
+        # instruction arrays that push a predefined function, used by CSE Rule 14
+        self.__pushFunctionCodes = {}
+        self.__intrinsicClosureCodes = {}
+
+    def __pushFunctionCode(self, name):
+        """Returns an instruction array that pushes the function bound to name and returns."""
+        code = self.__pushFunctionCodes.get(name)
+        if code is None:
+            names = self.bytecode.names
+            if name not in names:
+                names.append(name)
+            code = [OpCode.LOAD_NAME, names.index(name), OpCode.RETURN, 0]
+            self.__pushFunctionCodes[name] = code
+        return code
+
+    def __intrinsicClosureCode(self, name, arity):
+        """
+        Returns an instruction array that applies the closure on the stack, then pushes the 
+        function bound to name and applies the rest of the gammas the intrinsic stands for.
+        """
+        code = self.__intrinsicClosureCodes.get((name, arity))
+        if code is None:
+            code = [OpCode.GAMMA, 0] + self.__pushFunctionCode(name)[:2]
+            code += [OpCode.GAMMA, 0] * (arity - 1) + [OpCode.RETURN, 0]
+            self.__intrinsicClosureCodes[(name, arity)] = code
+        return code
+
+    def evaluate(self):
+        """Runs the program, with the CSE machine if the VM can not run it."""
+        written = self.output.written
+        try:
+            with self.output.receiving():
+                self.__run()
+            return
+        except FallbackException:
+            pass
+
+        from .machine import CSEMachine
+        self.fellBack = True
+        memo = None
+        if self.memoizer is not None:
+            memo = self.memoizer.table
+            memo.clear()
+        output = SkipSink(self.output, self.output.written - written)
+        CSEMachine(None, memo=memo, csMap=self.csMap, output=output).evaluate()
+
+    def __run(self):
+        """Executes the instructions until the program returns."""
+        bytecode = self.bytecode
+        codes = bytecode.codes
+        consts = bytecode.consts
+        names = bytecode.names
+        addresses = bytecode.addresses
+        lambdas = bytecode.lambdas
+        operator_names = bytecode.operators
+        operators = [Operators.get(operator) for operator in operator_names]
+        intrinsics = [(FunctionFactory.create(name), arity) for name, arity in bytecode.intrinsics]
+        fp_code = BytecodeVM.__FP_CODE
+        memo_fp_code = BytecodeVM.__MEMO_FP_CODE
+        memoizer = self.memoizer
+        missing = MemoTable.MISSING
+        # the keys of the memoized calls which have not returned yet, the innermost is last
+        memo_keys = []
+        y_star = YStarSymbol()
+        nothing = NothingSymbol()
+        name_value = StackValue.wrap
+        argument = StackValue.argument
+
+        LOAD_CONST = OpCode.LOAD_CONST
+        LOAD_NAME = OpCode.LOAD_NAME
+        LOAD_VAR = OpCode.LOAD_VAR
+        LOAD_YSTAR = OpCode.LOAD_YSTAR
+        MAKE_CLOSURE = OpCode.MAKE_CLOSURE
+        GAMMA = OpCode.GAMMA
+        BINOP = OpCode.BINOP
+        UNOP = OpCode.UNOP
+        TAU = OpCode.TAU
+        JUMP_IF_FALSE = OpCode.JUMP_IF_FALSE
+        JUMP = OpCode.JUMP
+        RETURN = OpCode.RETURN
+        INTRINSIC = OpCode.INTRINSIC
+        MEMO_STORE = OpCode.MEMO_STORE
+
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        frames = []
+
+        env = Environment(self.envIndexCounter)
+        code = codes[0]
+        pc = 0
+
+        while True:
+            op = code[pc]
+            arg = code[pc + 1]
+            pc += 2
+
+            if op == LOAD_VAR:
+                # Rule 1
+                depth, slot = addresses[arg]
+                frame = env
+                while depth > 0:
+                    frame = frame.parent
+                    depth -= 1
+                value = frame.values[slot]
+                if not isinstance(value, (LambdaClosureSymbol, FunctionSymbol)):
+                    value = name_value(value)
+                push(value)
+
+            elif op == LOAD_NAME:
+                # Rule 1
+                name = names[arg]
+                try:
+                    value = env.lookUpEnv(name)
+                except Exception as e:
+                    raise MachineException(f"{name} is undefined.")
+                if not isinstance(value, (LambdaClosureSymbol, FunctionSymbol)):
+                    value = name_value(value)
+                push(value)
+
+            elif op == LOAD_CONST:
+                # Rule 1
+                push(consts[arg])
+
+            elif op == GAMMA:
+                top = pop()
+                cls = top.__class__
+
+                if cls is LambdaClosureSymbol:
+                    # Rule 4, 11
+                    closure = top
+                elif cls is EtaClosureSymbol:
+                    # Rule 13
+                    key = None if memoizer is None else memoizer.key(top, stack[-1])
+                    if key is not None:
+                        result = memoizer.table.get(key)
+                        if result is not missing:
+                            stack[-1] = result
+                            continue
+                        # the result is stored when the call returns to the memo code
+                        push(top)
+                        push(EtaClosureSymbol.toLambdaClosure(top))
+                        frames.append((code, pc, env))
+                        memo_keys.append(key)
+                        code = memo_fp_code
+                        pc = 0
+                        continue
+                    push(top)
+                    push(EtaClosureSymbol.toLambdaClosure(top))
+                    next_pc = pc
+                    if code[next_pc] == JUMP:
+                        next_pc += 2 + code[next_pc + 1]
+                    if code[next_pc] != RETURN:
+                        frames.append((code, pc, env))
+                    code = fp_code
+                    pc = 0
+                    continue
+                elif cls is YStarSymbol:
+                    # Rule 12
+                    push(EtaClosureSymbol.fromLambdaClosure(pop()))
+                    continue
+                elif cls is FunctionSymbol:
+                    # Rule 14
+                    function: DefinedFunction = top.func
+                    rand = pop()
+                    if rand.__class__ is LambdaClosureSymbol:
+                        # apply the closure first, then push the function again
+                        if not stack:
+                            raise FallbackException(f"{function.getName()} is applied to a function")
+                        frames.append((code, pc, env))
+                        code = self.__pushFunctionCode(function.getName())
+                        pc = 0
+                        closure = rand
+                    else:
+                        args = argument(rand)
+                        if function.getName() == DefinedFunctions.CONC:
+                            # Conc consumes the next gamma as well
+                            if code[pc] != GAMMA:
+                                raise FallbackException("Conc is not applied to both of its arguments")
+                            args = [args, argument(pop())]
+                            pc += 2
+                        result = function.run(args)
+                        push(nothing if result is None else name_value(result))
+                        continue
+                elif cls is NameSymbol or not isinstance(top, Symbol):
+                    # Rule 10
+                    tuple_ = top.name if cls is NameSymbol else top
+                    tuple_ = tuple_.tuple if isinstance(tuple_, TupleSymbol) else tuple_
+                    n = pop()
+                    n = n.name if isinstance(n, Symbol) else n
+                    tuple_len = len(tuple_)
+                    if n < 1 or n > tuple_len:
+                        raise MachineException(f"The tuple selection value {n} out of range")
+                    push(name_value(tuple_[n - 1]))
+                    continue
+                elif cls is NothingSymbol:
+                    raise FallbackException("The result of Print is applied")
+                else:
+                    raise Exception(f"Invalid symbol:{top, type(top)} in stack for gamma in Control")
+
+                # Rule 4, 11 - apply the closure in a new environment
+                variables = closure.variables
+                rand = pop()
+                if rand.__class__ is NothingSymbol:
+                    raise FallbackException("The result of Print is bound to a variable")
+                if len(variables) == 1:
+                    if rand.__class__ is NameSymbol:
+                        rand = rand.name
+                    values = [rand]
+                elif rand.__class__ is not TupleSymbol:
+                    # the CSE machine fails on the symbol it holds the value in, which the VM does not have
+                    raise FallbackException("A value which is not a tuple is bound to several variables")
+                else:
+                    tuple_ = rand.tuple
+                    values = [tuple_[i] for i in range(len(variables))]
+                self.envIndexCounter += 1
+                # a call in tail position returns straight to the caller's caller
+                next_pc = pc
+                if code[next_pc] == JUMP:
+                    next_pc += 2 + code[next_pc + 1]
+                if code[next_pc] != RETURN:
+                    frames.append((code, pc, env))
+                code = codes[closure.index]
+                pc = 0
+                env = Environment(self.envIndexCounter, closure.env, variables, values)
+
+            elif op == INTRINSIC:
+                # Rule 14
+                function, arity = intrinsics[arg]
+                rand = pop()
+                if rand.__class__ is LambdaClosureSymbol:
+                    # apply the closure first, then the function to its result
+                    if not stack:
+                        raise FallbackException(f"{function.getName()} is applied to a function")
+                    push(rand)
+                    frames.append((code, pc, env))
+                    code = self.__intrinsicClosureCode(function.getName(), arity)
+                    pc = 0
+                    continue
+                args = argument(rand)
+                if arity == 2:
+                    args = [args, argument(pop())]
+                result = function.run(args)
+                push(nothing if result is None else name_value(result))
+
+            elif op == RETURN:
+                # Rule 5
+                if len(frames) == 0:
+                    return
+                code, pc, env = frames.pop()
+
+            elif op == MAKE_CLOSURE:
+                # Rule 2
+                variables, index = lambdas[arg]
+                push(LambdaClosureSymbol(variables, index, env))
+
+            elif op == BINOP:
+                # Rule 6
+                rand_1 = pop()
+                rand_2 = pop()
+                if isinstance(rand_1, Symbol):
+                    rand_1 = rand_1.name
+                if isinstance(rand_2, Symbol):
+                    rand_2 = rand_2.name
+                try:
+                    value = operators[arg](rand_1, rand_2)
+                except ZeroDivisionError as e:
+                    raise MachineException(f"Division by zero error: {rand_1} / {rand_2}")
+                except Exception as e:
+                    raise MachineException(f"Error in binary operation: {rand_1} {operator_names[arg]} {rand_2}")
+                push(name_value(value))
+
+            elif op == JUMP_IF_FALSE:
+                # Rule 8
+                condition = pop()
+                if isinstance(condition, Symbol):
+                    condition = condition.name
+                if not condition == True:
+                    pc += arg
+
+            elif op == JUMP:
+                pc += arg
+
+            elif op == UNOP:
+                # Rule 7
+                rand = pop()
+                if isinstance(rand, Symbol):
+                    rand = rand.name
+                push(name_value(operators[arg](rand)))
+
+            elif op == TAU:
+                # Rule 9
+                tupleList = []
+                for i in range(arg):
+                    symbol = pop()
+                    if not isinstance(symbol, Symbol):
+                        tupleList.append(symbol)
+                    elif symbol.__class__ is NameSymbol:
+                        tupleList.append(symbol.name)
+                    elif symbol.__class__ is TupleSymbol:
+                        tupleList.append(symbol.tuple)
+                    elif symbol.__class__ is NothingSymbol:
+                        raise FallbackException("The result of Print is used in a tuple")
+                push(TupleSymbol(arg, tupleList))
+
+            elif op == MEMO_STORE:
+                memoizer.table.put(memo_keys.pop(), stack[-1])
+
+            elif op == LOAD_YSTAR:
+                # Rule 1
+                push(y_star)
+
+            else:
+                raise Exception(f"Invalid opcode: {op}")
@@ -1,19 +1,49 @@
 import sys
 import os
-import io
 
 # Add current directory to path to ensure local imports work
 current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
+import importlib
+from collections.abc import Mapping
+
+# the modules of each phase are imported when the phase runs (see __parse, __standardize_ast
+# and __compute), so printing the ast does not load the standardizer or the engines
 from abstractst import ASTNode
 from cse_machine.st import STNode
-from abstractst.standardize import ASTStandardizer
-from cse_machine import CSEMachine, MachineException
-from parser import RPALParser
 from lexer.tokens import *
 
+class _LazyClasses(Mapping):
+    """A map of names to classes, each class is imported from its module when it is first looked up."""
+
+    def __init__(self, paths):
+        """
+        Args:
+            paths (dict): The names, with the module path and the name of each class, eg. "cse_machine.vm.BytecodeVM".
+        """
+        self.__paths = paths
+        self.__classes = {}
+
+    def __getitem__(self, name):
+        cls = self.__classes.get(name)
+        if cls is None:
+            module, _, attr = self.__paths[name].rpartition(".")
+            cls = getattr(importlib.import_module(module), attr)
+            self.__classes[name] = cls
+        return cls
+
+    def __contains__(self, name):
+        # without importing the class
+        return name in self.__paths
+
+    def __iter__(self):
+        return iter(self.__paths)
+
+    def __len__(self):
+        return len(self.__paths)
+
 class Interpreter:
     """
     Represents the Interpreter.
@@ -23,14 +53,79 @@ class Interpreter:
         __switch: Switch specifying to print the ast or st.
         __ast: The abstract syntax tree.
         __st: The standardized tree.
+        __engine: The engine which evaluates the standardized tree, CSE_ENGINE, VM_ENGINE or CLOSURE_ENGINE.
+        __optimize: Whether constant expressions are folded before the evaluation.
+        __memo: The table the results of recursive functions are memoized in, None if memoization is off.
+        __cache: The cache of compiled programs, None if the cache is off.
+        __cached: Whether the program was read from the cache.
+        __error: The exception the interpretation failed with, None if it succeeded.
+        __sink: The sink the output of the program is written to as it runs, None to collect the output
+            for get_result.
     """
 
+    # the version of the interpreter. The cache keys also hold a fingerprint of the source of the
+    # front end and of the control structures (see ProgramCache.fingerprint), so the programs they
+    # compiled are removed from the cache when they change without a bump of the version
+    VERSION = "1.0"
+
+
     __AST_SWITCH = "-ast"
     __ST_SWITCH = "-st"
 
-    def __init__(self, program, switch=None):
+    CSE_ENGINE = "cse"
+    VM_ENGINE = "vm"
+    CLOSURE_ENGINE = "closure"
+
+    # the engines available to evaluate the program, imported when they are first used
+    ENGINES = _LazyClasses({
+        CSE_ENGINE: "cse_machine.machine.CSEMachine",
+        VM_ENGINE: "cse_machine.vm.BytecodeVM",
+        CLOSURE_ENGINE: "cse_machine.closures.ClosureEngine",
+    })
+
+    # the engines which evaluate the standardized tree rather than the control structures
+    __TREE_ENGINES = [CLOSURE_ENGINE]
+
+    # the python recursion limit the entry points set, the parser takes nine frames for each
+    # nested parenthesis and the closure engine a few for each nested application
+    RECURSION_LIMIT = 20_000
+
+    @staticmethod
+    def raiseRecursionLimit():
+        """
+        Raises the python recursion limit of the process to RECURSION_LIMIT, if it is lower.
+
+        The limit is a setting of the whole process, so it is set once by the entry points
+        (myrpal.py, the workers of the batch mode and the evaluation server) rather than around
+        each evaluation, where it would change under any other thread.
+        """
+        sys.setrecursionlimit(max(sys.getrecursionlimit(), Interpreter.RECURSION_LIMIT))
+
+    def __init__(self, program, switch=None, engine=None, optimize=True, memoize=False,
+                 memo_size=None, cache_dir=None, output=None, cache=None):
+        if engine is None:
+            engine = Interpreter.CSE_ENGINE
+        if engine not in Interpreter.ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
         self.__program = program
         self.__switch = switch
+        self.__engine = engine
+        self.__optimize = optimize
+        self.__memo = None
+        if memoize:
+            from cse_machine.memo import MemoTable
+            self.__memo = MemoTable(memo_size if memo_size is not None else MemoTable.DEFAULT_SIZE)
+        if cache is None and cache_dir is not None:
+            from cache import ProgramCache
+            cache = ProgramCache(cache_dir, Interpreter.VERSION)
+        # a cache given to the interpreter (eg. a MemoryProgramCache) is used instead of cache_dir
+        self.__cache = cache
+        self.__cached = False
+        self.__error = None
+        self.__sink = None
+        if output is not None:
+            from cse_machine.output import OutputSink
+            self.__sink = OutputSink.create(output)
         self.__ast: ASTNode = None
         self.__st: STNode = None
 
@@ -51,32 +146,51 @@ class Interpreter:
         else:
             return self.__output
 
+    def get_error(self):
+        """Returns the exception the interpretation failed with, None if it succeeded."""
+        return self.__error
+
+    def is_cached(self):
+        """Returns True if the compiled program was read from the cache."""
+        return self.__cached
+
+    def get_memo_stats(self):
+        """Returns the hit and miss statistics of the memo table, None if memoization is off."""
+        if self.__memo is None:
+            return None
+        return self.__memo.stats()
+
     def interpret(self):
         """
         Interprets the given program.
         """
         try:
-            # Parse the program to get the ast
-            self.__parse()
-            if self.__switch == Interpreter.__AST_SWITCH:
-                # exit if the switch is -ast
-                return
+            # a cached program is evaluated without the front end
+            cached = self.__load_cached()
+            if cached is None:
+                # Parse the program to get the ast
+                self.__parse()
+                if self.__switch == Interpreter.__AST_SWITCH:
+                    # exit if the switch is -ast
+                    return
 
-            # Get the st from the ast
-            self.__standardize_ast()
+                # Get the st from the ast
+                self.__standardize_ast()
 
             if self.__switch != Interpreter.__ST_SWITCH:
-                # Compute the result if no switch is given, capture the output from stdout
-                original_stdout = sys.stdout
-                stdout_capture = io.StringIO()
-                sys.stdout = stdout_capture
-                self.__compute()
-                sys.stdout = original_stdout
-                captured_output = stdout_capture.getvalue()
-                stdout_capture.close()
-                self.__output = captured_output
+                # Compute the result if no switch is given, the output goes to the sink as it is printed
+                if self.__sink is None:
+                    from cse_machine.output import BufferSink
+                    sink = BufferSink()
+                    self.__compute(cached, sink)
+                    self.__output = sink.getvalue()
+                else:
+                    self.__compute(cached, self.__sink)
+                    # the output was written to the sink already
+                    self.__output = ""
 
         except Exception as e:
+            self.__error = e
             print("An error occurred during interpretation ", e)
             # logger.error(e)
 
@@ -84,6 +198,8 @@ class Interpreter:
         """
         Parses the program given to the interpreter. Prints the AST if the switch is -ast.
         """
+        from parser import RPALParser
+
         parser = RPALParser(self.__program)
         try:
             self.__ast = parser.parse()
@@ -110,6 +226,8 @@ class Interpreter:
         """
         Standardizes the ast. Print the ST if the switch is -st.
         """
+        from abstractst.standardize import ASTStandardizer
+
         standardizer = ASTStandardizer()
 
         try:
@@ -122,12 +240,59 @@ class Interpreter:
         if self.__switch == Interpreter.__ST_SWITCH:
             print(self.__st)
 
-    def __compute(self):
+    def __cache_key(self):
+        return self.__cache.key(self.__program, f"optimize={self.__optimize}")
+
+    def __load_cached(self):
+        """
+        Returns the (control structures, standardized tree) of the program from the cache, None on a miss.
+
+        The cache is only used to evaluate the program, not to print its trees.
+        """
+        if self.__cache is None or self.__switch is not None:
+            return None
+        cached = self.__cache.load(self.__cache_key(), self.__engine in Interpreter.__TREE_ENGINES)
+        self.__cached = cached is not None
+        return cached
+
+    def __compile_cached(self, st: STNode):
+        """
+        Builds the control structures of the standardized tree and stores them in the cache.
+
+        Returns the control structures and the tree the engine evaluates, a copy of st if the engine
+        evaluates the tree, as building the control structures modifies it.
         """
-        Computes the result by inputting the standardized tree (ST) to the CSE machine.
+        from cse_machine.control_structures import CSInitializer
+        from cse_machine.serialize import Serializer
+
+        needs_tree = self.__engine in Interpreter.__TREE_ENGINES
+        st_data = Serializer.dumpTree(st) if needs_tree else None
+        csMap = CSInitializer(st).init()
+        self.__cache.storeData(self.__cache_key(), Serializer.dumpControlStructures(csMap), st_data)
+        return csMap, Serializer.loadTree(st_data) if needs_tree else None
+
+    def __compute(self, cached=None, output=None):
         """
-        st = self.__st
-        cse = CSEMachine(st)
+        Computes the result by inputting the standardized tree (ST) to the selected engine.
+
+        Args:
+            cached: The (control structures, standardized tree) of the program read from the cache, None to 
+                compile the standardized tree.
+            output (OutputSink): The sink the output of the program is written to.
+        """
+        from cse_machine.exceptions import MachineException
+        from cse_machine.optimizer import STOptimizer
+
+        if cached is not None:
+            csMap, st = cached
+        else:
+            st = self.__st
+            if self.__optimize:
+                st = STOptimizer().optimize(st)
+            csMap = None
+            if self.__cache is not None:
+                csMap, st = self.__compile_cached(st)
+        cse = Interpreter.ENGINES[self.__engine](st, memo=self.__memo, csMap=csMap, output=output)
         try:
             cse.evaluate()
         except RecursionError as e:
@@ -1,34 +1,68 @@
 import re
+from collections import deque
+from itertools import islice
 from .tokens import *
-import queue as q
 
 class Lexer:
     """
     The Lexer class is responsible for tokenizing a program string into a list of tokens.
 
+    Tokens are read lazily: the lexer scans the program only as far as the tokens asked for,
+    and keeps the tokens looked ahead at in a buffer until they are consumed.
+
+    The program can also be ASCII bytes, such as a memory-mapped file, which are scanned
+    without decoding them. Only the values of the tokens are decoded.
+
     Attributes:
-        program (str): The program string to be tokenized.
-        tokens (list): The list of tokens generated from the program string.
+        program (str | bytes): The program string to be tokenized.
         position (int): The current position in the program string.
         line_no (int): The current line number.
         char_pos (int): The current character position.
+        look_ahead (deque): The tokens scanned but not consumed yet.
+        stream (generator): The tokens scanned from the current position.
 
     Methods:
         reset(): Resets the lexer to its initial state.
+        tokens(): Returns a generator of the remaining tokens.
         tokenize(count=-1): Tokenizes the program string up to a specified count.
+        lookAhead(k=1): Retrieves the k-th next token without consuming it.
         nextToken(): Retrieves the next token from the program string.
-        __nextToken(): Retrieves the next token from the program string (internal method).
 
     Raises:
         InvalidTokenException: If the next token is invalid.
     """
 
+    # the order of the token types is important as some tokens are substrings of others
+    __TOKEN_TYPES = [CommentToken, SpacesToken, IdentifierToken,
+                     IntegerToken, StringToken, OperatorToken,
+                     LParenToken, RParenToken, SemiColonToken, CommaToken]
+
+    # one regex for all the token types, its alternatives are tried in the order above and the
+    # name of the group which matched is the name of the token type
+    __TOKEN_REGEX = re.compile("|".join(f"(?P<{token_type.__name__}>{token_type.regex().pattern})"
+                                        for token_type in __TOKEN_TYPES))
+
+    # the same regex for programs given as bytes, where \s only matches ASCII whitespace while
+    # it also matches the separators \x1c-\x1f in a string
+    __BYTES_TOKEN_REGEX = re.compile(__TOKEN_REGEX.pattern.replace(r"\s", r"\s\x1c-\x1f").encode("ascii"))
+
+    __TOKEN_TYPES_BY_NAME = {token_type.__name__: token_type for token_type in __TOKEN_TYPES}
+
+    # punctions have no arguments in their constructor
+    __PUNCTUATIONS = (LParenToken, RParenToken, SemiColonToken, CommaToken)
+
+    __KEYWORDS = frozenset(KeywordToken.values())
+
     def __init__(self, program):
         self.__program = program
+        self.__binary = not isinstance(program, str)
+        self.__regex = Lexer.__BYTES_TOKEN_REGEX if self.__binary else Lexer.__TOKEN_REGEX
+        self.__newline = b'\n' if self.__binary else '\n'
         self.__position = 0
         self.__line_no = 1
         self.__char_pos = 1
-        self.__look_ahead_q = q.Queue()
+        self.__look_ahead = deque()
+        self.__stream = self.__scan()
         
     def reset(self):
         """
@@ -37,22 +71,35 @@ class Lexer:
         self.__position = 0
         self.__line_no = 1
         self.__char_pos = 1
+        self.__look_ahead.clear()
+        self.__stream = self.__scan()
+
+    def tokens(self):
+        """
+        Returns a generator of the remaining tokens, the tokens looked ahead at first. 
+        Consumes the tokens as they are generated.
+        """
+        look_ahead = self.__look_ahead
+        while look_ahead:
+            yield look_ahead.popleft()
+        yield from self.__stream
 
-    def lookAhead(self):
+    def lookAhead(self, k:int=1):
         """
-        Retrieves the next token from the program string without consuming the token
+        Retrieves the k-th next token from the program string without consuming the token
         
-        Returns: Next Token or None if there are no more tokens.
+        Args:
+            k (int, optional): The position of the token after the consumed ones. Defaults to 1.
+
+        Returns: The k-th next Token or None if there are less than k tokens left.
         """
-        if self.__look_ahead_q.empty():
-            tokens = self.tokenize(count=1)
-            if len(tokens) == 0:
+        look_ahead = self.__look_ahead
+        while len(look_ahead) < k:
+            token = next(self.__stream, None)
+            if token is None:
                 return None
-            else:
-                self.__look_ahead_q.put(tokens[0])
-                return tokens[0]
-        else:
-            return self.__look_ahead_q.queue[0]
+            look_ahead.append(token)
+        return look_ahead[k - 1]
             
     
     def nextToken(self):
@@ -64,56 +111,39 @@ class Lexer:
             Token: The next token from the program string | None if there are no more tokens.
         """        
 
-        if not self.__isScanning():
+        # a token looked ahead at is dropped once the program is scanned to the end
+        if self.__position >= len(self.__program):
             return None
         
-        if self.__look_ahead_q.empty():
-            self.__tokenize()
-               
-        try:
-            t = self.__look_ahead_q.get(block=False) 
-        except q.Empty:
-            t = None
-        return t
+        if self.__look_ahead:
+            return self.__look_ahead.popleft()
+        return next(self.__stream, None)
 
     def tokenize(self, count:int=-1):
         """
         Tokenizes the program string up to a specified count and 
-        returns the list of tokens from the look ahead queue.
+        returns the list of tokens looked ahead at followed by the tokens tokenized.
 
         Args:
-            count (int, optional): The number of tokens to tokenize. Defaults to -1.
+            count (int, optional): The number of tokens to tokenize, all of them if not positive. Defaults to -1.
 
         Returns:
             list: The list of tokens generated from the program string.
         """
-        tokens = []
-        self.__tokenize(count)
-        while not self.__look_ahead_q.empty():
-            tokens.append(self.__look_ahead_q.get())
+        tokens = list(self.__look_ahead)
+        self.__look_ahead.clear()
+        tokens.extend(islice(self.__stream, count) if count > 0 else self.__stream)
         return tokens
 
-    def __tokenize(self, count:int=1):
+    def __scan(self):
         """
-        Tokenizes the program by extracting tokens using the __lexToken method.
-        This method adds the tokens to the look ahead queue.
-
-        Args:
-            count (int, optional): The number of tokens to tokenize. Defaults to 1.
-
-        Returns:
-            None
-
+        Generates the tokens of the program from the current position, skipping the <DELETE> tokens.
         """
-        counter = 0
         while self.__isScanning():
             token = self.__lexToken()
-            if token == None:
-                break
-            self.__look_ahead_q.put(token)
-            counter += 1
-            if counter == count:
+            if token is None:
                 break
+            yield token
 
     def __isScanning(self):
         return self.__position < len(self.__program)
@@ -151,53 +181,35 @@ class Lexer:
         line_no = self.__line_no
         char_pos = self.__char_pos
 
-        # using re get the first token that matches the pattern and the position at which it ends
-        match = None
+        # match all the token types at once, the first one matching in order wins
+        match = self.__regex.match(program, position)
+        if not match:
+            raise InvalidTokenException.fromLine(line_no, char_pos)
+
+        token_type = Lexer.__TOKEN_TYPES_BY_NAME[match.lastgroup]
+        token_val = match.group()
+        position = match.end()
         res = None
-        
-        # the order of the token types is important as some tokens are substrings of others
-        for token_type in [CommentToken, SpacesToken, IdentifierToken,
-                               IntegerToken, StringToken, OperatorToken, 
-                               LParenToken, RParenToken, SemiColonToken, CommaToken]:
-            regex = token_type.regex()
-            match = regex.match(program, position)
-            if not(match):
-                continue
-
-            # get the matched token
-            token_val = match.group(0)
-            position = match.end()
-            
+
+        newline = self.__newline
+        if newline in token_val:
             # update line number if token has newlines - this includes CommentTokens and SpaceTokens with \n
-            if '\n' in token_val:
-                line_no += token_val.count('\n')
-                char_pos = 1 # reset character position
-                break
-            
+            line_no += token_val.count(newline)
+            char_pos = 1 # reset character position
+        elif token_type is SpacesToken:
             # count spaces and tabs
-            if token_type == SpacesToken:
-                char_pos += len(token_val)
-                break
-                            
-            # punctions have no arguments in their constructor
-            if (token_type == LParenToken 
-                or token_type == RParenToken 
-                or token_type == SemiColonToken 
-                or token_type == CommaToken):
-                    res = token_type(line_no, char_pos)
+            char_pos += len(token_val)
+        else:
+            if self.__binary:
+                token_val = token_val.decode("ascii")
+            if token_type in Lexer.__PUNCTUATIONS:
+                res = token_type(line_no, char_pos)
+            elif token_val in Lexer.__KEYWORDS:
+                res = KeywordToken(token_val, line_no, char_pos)
             else:
-                if token_val in KeywordToken.values():
-                    res = KeywordToken(token_val, line_no, char_pos)
-                else:
-                    res = token_type(token_val, line_no, char_pos)     
-
+                res = token_type(token_val, line_no, char_pos)
             char_pos += len(token_val)
-            break         
-            
-        if not match:   
-            raise InvalidTokenException.fromLine(line_no, char_pos)
-                
-        
+
         # update the position, line number and character position
         self.__position = position
         self.__line_no = line_no
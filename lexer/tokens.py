@@ -30,6 +30,8 @@ class Token:
         getType() -> str: Returns the type of the token.
     """
 
+    __slots__ = ("type", "value", "line", "col")
+
     def __init__(self, type, value, line = None, col = None):
         self.type = type
         self.value = value
@@ -70,6 +72,9 @@ class Token:
     
 class IdentifierToken(Token):
     """Represents an identifier token."""
+
+    __slots__ = ()
+
     def __init__(self, value, line, col):
         super().__init__("<IDENTIFIER>", value, line, col)
         
@@ -81,6 +86,8 @@ class IdentifierToken(Token):
     
 class KeywordToken(Token):
     """Represents a keyword token."""
+
+    __slots__ = ()
     
     ___VALUES = ["let", "fn", "in", "where", "aug", 
                  "or", "not", "gr", "ge", "ls", "le", 
@@ -107,6 +114,9 @@ class KeywordToken(Token):
         
 class IntegerToken(Token):
     """Represents an integer token."""
+
+    __slots__ = ()
+
     def __init__(self, value, line, col):
         super().__init__("<INTEGER>", value, line, col)
         
@@ -118,6 +128,9 @@ class IntegerToken(Token):
     
 class OperatorToken(Token):      
     """Represents an operator token."""      
+
+    __slots__ = ()
+
     def __init__(self, value, line, col):
         super().__init__("<OPERATOR>", value, line, col)
     
@@ -129,6 +142,9 @@ class OperatorToken(Token):
         
 class StringToken(Token):
     """Represents a string token."""	
+
+    __slots__ = ()
+
     def __init__(self, value, line, col):
         super().__init__("<STRING>", value, line, col)
         
@@ -141,6 +157,9 @@ class StringToken(Token):
     
 class SpacesToken(Token):
     """Represents a space token."""
+
+    __slots__ = ()
+
     def __init__(self, line, col):
         super().__init__("<DELETE>", None, line, col)
         
@@ -149,6 +168,9 @@ class SpacesToken(Token):
 
 class CommentToken(Token):
     """Represents a comment."""	
+
+    __slots__ = ()
+
     
     def __init__(self, line, col):
         super().__init__("<DELETE>", None, line, col)
@@ -159,6 +181,9 @@ class CommentToken(Token):
 class LParenToken(Token):
     """Represents a left parenthesis token."""
 
+    __slots__ = ()
+
+
     def __init__(self, line, col):
         super().__init__("(", None, line, col)
     
@@ -171,6 +196,9 @@ class LParenToken(Token):
     
 class RParenToken(Token):
     """Represents a right parenthesis token."""
+
+    __slots__ = ()
+
     
     def __init__(self, line, col):
         super().__init__(")", None, line, col)
@@ -183,6 +211,9 @@ class RParenToken(Token):
     
 class SemiColonToken(Token):
     """Represents a semicolon token in the interpreter."""
+
+    __slots__ = ()
+
     
     def __init__(self, line, col):
         super().__init__(";", None, line, col)
@@ -195,6 +226,9 @@ class SemiColonToken(Token):
     
 class CommaToken(Token): 
     """Represents a comma token."""
+
+    __slots__ = ()
+
     
     def __init__(self, line, col):
         super().__init__(",", None, line, col)
@@ -1,8 +1,12 @@
 
+import os
 import sys
 from interpreter import Interpreter
 from utils import *
 
+# the modules of the batch mode, of the cache and of the evaluation are imported when they
+# are used, so that a run which does not need them (eg. printing the ast) starts faster
+
 def main():
     """
     Entry point for the RPAL lexical analyzer and parser.
@@ -12,17 +16,94 @@ def main():
     Returns: None
     """
 
+    # the parser and the engines recurse as deep as the program nests
+    Interpreter.raiseRecursionLimit()
+
     # initialize args
     args = sys.argv
-    file_name, switch = init_args(args)
-        
-    # Read the file "file_name"
-    program = read_file(file_name)
+    file_name, switch, options = init_args(args)
   
-    interpreter = Interpreter(program, switch)
+    memo_size = options.get("memo-size")
+    if memo_size is not None and (not str(memo_size).isdigit() or int(memo_size) < 1):
+        print(f"Invalid value {memo_size} for --memo-size, expected a positive integer")
+        exit(1)
+
+    # the cache is only used to evaluate programs, not to print their trees
+    cache_dir = None
+    if not options.get("no-cache", False) and (switch is None or options.get("batch", False)):
+        cache_dir = options.get("cache-dir")
+        if cache_dir is None:
+            from cache import ProgramCache
+            cache_dir = ProgramCache.defaultDirectory()
+
+    interpreter_options = dict(engine=options.get("engine"),
+                               optimize=not options.get("no-optimize", False),
+                               memoize=options.get("memoize", False) or "memo-size" in options,
+                               memo_size=int(memo_size) if memo_size is not None else None,
+                               cache_dir=cache_dir)
+
+    if options.get("batch", False):
+        run_batch(file_name, switch, options, interpreter_options)
+        return
+
+    # Read the file "file_name"
+    program = read_program(file_name)
+
+    # the output of the program is written to stdout in chunks as it is printed, rather than
+    # collected and printed when the program ends
+    output = None
+    if switch is None:
+        from cse_machine.output import FdSink
+        sys.stdout.flush()
+        output = FdSink(sys.stdout.fileno())
+
+    interpreter = Interpreter(program, switch, output=output, **interpreter_options)
     interpreter.interpret()
     print(interpreter.get_result(switch))
+    if options.get("memo-stats", False) and interpreter.get_memo_stats() is not None:
+        # to stderr, so the output of the program is left as it is
+        print(f"memo: {interpreter.get_memo_stats()}", file=sys.stderr)
     return
 
+def run_batch(spec, switch, options, interpreter_options):
+    """
+    Evaluates the programs of a directory, glob or manifest on a pool of worker processes.
+
+    Writes the result of each program as a JSON line to the --results file or stdout, and
+    a summary to stderr. Exits with 1 if a program failed.
+    """
+    import json
+    from batch import BatchRunner
+
+    jobs = options.get("jobs", os.cpu_count() or 1)
+    if not str(jobs).isdigit() or int(jobs) < 1:
+        print(f"Invalid value {jobs} for --jobs, expected a positive integer")
+        exit(1)
+    timeout = options.get("timeout", BatchRunner.DEFAULT_TIMEOUT)
+    try:
+        timeout = float(timeout)
+    except ValueError:
+        timeout = -1
+    if timeout < 0:
+        print(f"Invalid value {options['timeout']} for --timeout, expected a number of seconds (0 for no limit)")
+        exit(1)
+
+    try:
+        files = BatchRunner.files(spec)
+    except OSError as e:
+        print(e)
+        exit(1)
+
+    runner = BatchRunner(interpreter_options, switch, int(jobs), timeout or None)
+    if "results" in options:
+        with open(options["results"], "w") as out:
+            summary = runner.write(files, out)
+    else:
+        summary = runner.write(files, sys.stdout)
+    # to stderr, so the results can be piped
+    print(f"batch: {json.dumps(summary)}", file=sys.stderr)
+    if summary["files"] != summary[BatchRunner.OK]:
+        exit(1)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -15,10 +15,47 @@ class RPALParser(Parser):
     __FIRST_RN = [IdentifierToken, IntegerToken, StringToken, LParenToken]
     __FIRST_VB = [IdentifierToken, LParenToken]
 
+    # the binding powers of the operators of the layers B to Ap, from the loosest to the tightest
+    __OR_PREC = 1   # B  -> B 'or' Bt
+    __AND_PREC = 2  # Bt -> Bt '&' Bs
+    __NOT_PREC = 3  # Bs -> 'not' Bp
+    __REL_PREC = 4  # Bp -> A ('gr' | '>' | 'ge' | '>=' | 'ls' | '<' | 'le' | '<=' | 'eq' | 'ne') A
+    __ADD_PREC = 5  # A  -> A ('+' | '-') At | ('+' | '-') At
+    __MUL_PREC = 6  # At -> At ('*' | '/') Af
+    __POW_PREC = 7  # Af -> Ap '**' Af
+    __AT_PREC = 8   # Ap -> Ap '@' <IDENTIFIER> R
+
+    # token value -> (binding power, node built, binding power of the right operand)
+    # the right operand of a left associative operator binds tighter than the operator
+    __OPERATORS = {
+        Nodes.OR: (__OR_PREC, Nodes.OR, __AND_PREC),
+        Nodes.AND_OP: (__AND_PREC, Nodes.AND_OP, __NOT_PREC),
+        Nodes.GR: (__REL_PREC, Nodes.GR, __ADD_PREC),
+        ">": (__REL_PREC, Nodes.GR, __ADD_PREC),
+        Nodes.GE: (__REL_PREC, Nodes.GE, __ADD_PREC),
+        ">=": (__REL_PREC, Nodes.GE, __ADD_PREC),
+        Nodes.LS: (__REL_PREC, Nodes.LS, __ADD_PREC),
+        "<": (__REL_PREC, Nodes.LS, __ADD_PREC),
+        Nodes.LE: (__REL_PREC, Nodes.LE, __ADD_PREC),
+        "<=": (__REL_PREC, Nodes.LE, __ADD_PREC),
+        Nodes.EQ: (__REL_PREC, Nodes.EQ, __ADD_PREC),
+        Nodes.NE: (__REL_PREC, Nodes.NE, __ADD_PREC),
+        Nodes.PLUS: (__ADD_PREC, Nodes.PLUS, __MUL_PREC),
+        Nodes.MINUS: (__ADD_PREC, Nodes.MINUS, __MUL_PREC),
+        Nodes.MULTIPLY: (__MUL_PREC, Nodes.MULTIPLY, __POW_PREC),
+        Nodes.DIVIDE: (__MUL_PREC, Nodes.DIVIDE, __POW_PREC),
+        Nodes.POWER: (__POW_PREC, Nodes.POWER, __POW_PREC),
+        Nodes.AT: (__AT_PREC, Nodes.AT, None),
+    }
+
     def parse(self):
         """
         Parses the source program and returns the Abstract Syntax Tree (AST).
 
+        Each nested parenthesis takes nine python frames. The parser does not change the
+        recursion limit, which is a setting of the whole process, the entry points raise it
+        once (see Interpreter.raiseRecursionLimit).
+
         Returns:
             The Abstract Syntax Tree (AST) of the source program.
         """
@@ -87,156 +124,72 @@ class RPALParser(Parser):
             self.buildTree(Nodes.COND, 3)
 
     def proc_B(self):
-        self.proc_Bt()
-        if self.nextToken() == None:
-            return
-        while self.nextToken() != None and self.nextToken().isValue(Nodes.OR):
-            self.read(KeywordToken.fromValue(Nodes.OR))
-            self.proc_Bt()
-            self.buildTree(Nodes.OR, 2)
-
-    def proc_Bt(self):
-        self.proc_Bs()
-        if self.nextToken() == None:
-            return
-        while self.nextToken() != None and self.nextToken().isValue(Nodes.AND_OP):
-            self.read(OperatorToken.fromValue(Nodes.AND_OP))
-            self.proc_Bs()
-            self.buildTree(Nodes.AND_OP, 2)
-
-    def proc_Bs(self):
-        if self.nextToken() != None and self.nextToken().isValue(Nodes.NOT):
-            self.read(KeywordToken.fromValue(Nodes.NOT))
-            self.proc_Bp()
-            self.buildTree(Nodes.NOT, 1)
-        else:
-            self.proc_Bp()
-
-    def proc_Bp(self):
-        self.proc_A()
-
-        if self.nextToken() == None:
-            return
-
-        if self.nextToken().isValue("gr"):
-            self.read(KeywordToken.fromValue("gr"))
-            self.proc_A()
-            self.buildTree("gr", 2)
-        elif self.nextToken().isValue(">"):
-            self.read(OperatorToken.fromValue(">"))
-            self.proc_A()
-            self.buildTree("gr", 2)
-        elif self.nextToken().isValue("ge"):
-            self.read(KeywordToken.fromValue("ge"))
-            self.proc_A()
-            self.buildTree("ge", 2)
-        elif self.nextToken().isValue(">="):
-            self.read(OperatorToken.fromValue(">="))
-            self.proc_A()
-            self.buildTree("ge", 2)
-        elif self.nextToken().isValue("ls"):
-            self.read(KeywordToken.fromValue("ls"))
-            self.proc_A()
-            self.buildTree("ls", 2)
-        elif self.nextToken().isValue("<"):
-            self.read(OperatorToken.fromValue("<"))
-            self.proc_A()
-            self.buildTree("ls", 2)
-        elif self.nextToken().isValue("le"):
-            self.read(KeywordToken.fromValue("le"))
-            self.proc_A()
-            self.buildTree("le", 2)
-        elif self.nextToken().isValue("<="):
-            self.read(OperatorToken.fromValue("<="))
-            self.proc_A()
-            self.buildTree("le", 2)
-        elif self.nextToken().isValue("eq"):
-            self.read(KeywordToken.fromValue("eq"))
-            self.proc_A()
-            self.buildTree("eq", 2)
-        elif self.nextToken().isValue("ne"):
-            self.read(KeywordToken.fromValue("ne"))
-            self.proc_A()
-            self.buildTree("ne", 2)
-        elif self.nextToken().isValue(";"):
-            self.read(SemiColonToken.instance())
-
-    def proc_A(self):
-        # A -> (At; | +At | -At) ( ('+' At) | ('-' At) )+
-        if self.nextToken().__class__ == OperatorToken:
-            if self.nextToken().isValue("+"):
-                self.read(OperatorToken.fromValue("+"))
-                self.proc_At()
-            elif self.nextToken().isValue("-"):
-                self.read(OperatorToken.fromValue("-"))
-                self.proc_At()
-                self.buildTree("neg", 1)
-            else:
-                raise InvalidTokenException.fromToken(self.nextToken())
-        # SELECT(At) = FIRST(Rn)
-        elif RPALParser.__isInFirstRn(self.nextToken()):
-            self.proc_At()
-
-        elif self.nextToken() == None:
-            return
-        while(self.nextToken().__class__ == OperatorToken
-              and (self.nextToken().isValue("+") or self.nextToken().isValue("-"))):
-            if self.nextToken().isValue("+"):
-                self.read(OperatorToken.fromValue("+"))
-                self.proc_At()
-                self.buildTree("+", 2)
-            else:
-                self.read(OperatorToken.fromValue("-"))
-                self.proc_At()
-                self.buildTree("-", 2)
-
-    def proc_At(self):
+        self.__parseOperators(RPALParser.__OR_PREC)
 
-        self.proc_Af()
+    def __parseOperators(self, minPrec):
+        """
+        Parses the operator layers B to Ap by precedence climbing, with the operators binding at 
+        least as tight as minPrec.
 
-        _next_token = self.nextToken()
-        if _next_token == None:
-            return
-        while ((_next_token.isValue("*")) or _next_token.isValue("/")):
+        The layers build the same trees as their grammar procedures would, including on invalid 
+        programs: an A which does not start with an operand is empty, and is left to the operator 
+        after it.
 
-            # read the operator token and build the tree using the appropriate transduction rule
-            if _next_token.isValue("*"):
-                self.read(OperatorToken.fromValue("*"))
-                self.proc_Af()
-                self.buildTree("*", 2)
-            else:
-                self.read(OperatorToken.fromValue("/"))
-                self.proc_Af()
-                self.buildTree("/", 2)
-            # update the next token
-            _next_token = self.nextToken()
+        Args:
+            minPrec (int): The binding power of the loosest operator parsed.
+        """
+        token = self.nextToken()
+        maxPrec = RPALParser.__AT_PREC
+        if minPrec <= RPALParser.__NOT_PREC and token != None and token.isValue(Nodes.NOT):
+            # Bs -> 'not' Bp
+            self.skip()
+            self.__parseOperators(RPALParser.__REL_PREC)
+            self.buildTree(Nodes.NOT, 1)
+            # the comparison in Bp is the operand of not
+            maxPrec = RPALParser.__NOT_PREC
+        elif minPrec <= RPALParser.__ADD_PREC:
+            # A -> '+' At | '-' At | At
+            if token.__class__ == OperatorToken:
+                if token.isValue("+"):
+                    self.skip()
+                    self.__parseOperators(RPALParser.__MUL_PREC)
+                elif token.isValue("-"):
+                    self.skip()
+                    self.__parseOperators(RPALParser.__MUL_PREC)
+                    self.buildTree(Nodes.NEG, 1)
+                else:
+                    raise InvalidTokenException.fromToken(token)
+            elif RPALParser.__isInFirstRn(token):
+                self.proc_R()
+        else:
+            self.proc_R()
 
-            if _next_token == None:
+        operators = RPALParser.__OPERATORS
+        while True:
+            token = self.nextToken()
+            if token == None:
+                break
+            operator = operators.get(token.value)
+            if operator == None:
+                break
+            prec, node, rightPrec = operator
+            if prec < minPrec or prec > maxPrec:
                 break
 
-    def proc_Af(self):
-
-        self.proc_Ap()
-        if self.nextToken() != None and self.nextToken().isValue("**"):
-            self.read(OperatorToken.fromValue("**"), ignore=True)
-            self.proc_Af()
-            self.buildTree("**", 2)
-
-    def proc_Ap(self):
-
-        self.proc_R()
-        if self.nextToken() == None:
-            return
-        # check if the next token is a @
-        while self.nextToken() != None and self.nextToken().isValue("@"):
-            # read the @ token and ignore it
-            self.read(OperatorToken.fromValue("@"))
-
-            # next token should be an identifier
-            self.read(IdentifierToken.fromValue(self.nextToken().value), ignore=False)
+            # read the operator token and ignore it
+            self.skip()
+            if prec == RPALParser.__AT_PREC:
+                # Ap -> Ap '@' <IDENTIFIER> R, the next token should be an identifier
+                self.read(IdentifierToken.fromValue(self.nextToken().value), ignore=False)
+                self.proc_R()
+                self.buildTree(Nodes.AT, 3)
+            else:
+                self.__parseOperators(rightPrec)
+                self.buildTree(node, 2)
 
-            self.proc_R()
-            self.buildTree(Nodes.AT, 3)
+            # the operand consumed the tighter operators, except a comparison following a comparison: 
+            # Bp -> A ('gr' | ...) A is not associative, and the layers above it do not read it either
+            maxPrec = prec - 1 if prec == RPALParser.__REL_PREC else prec
 
     def proc_R(self):
         self.proc_Rn()
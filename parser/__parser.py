@@ -56,6 +56,28 @@ class Parser:
             None
         """
         
+        # raise an exception if the next token is not the expected token
+        if self.__nextToken != token:
+            self.__raiseUnexpectedToken(token, self.__nextToken)
+        
+        # push the token to the stack as an ASTNode and get the next token from the lexer
+        if not ignore:
+            self.__pushStack(ASTNode(self.nextToken()))
+        self.__setNextToken(self.__getTokenFromLexer())
+            
+
+    def __raiseUnexpectedToken(self, token, next_token):
+        """
+        Raises an exception for the next token not being the expected token.
+
+        Args:
+            token (Token): The expected token.
+            next_token (Token): The next token.
+
+        Raises:
+            InvalidTokenException: Always.
+        """
+
         # helper function raise_invalid_token_exception
         #   :raise an exception with an error message
         def raise_invalid_token_exception(token, expected_token, line=None, col=None):
@@ -87,18 +109,13 @@ class Parser:
                 
             raise_invalid_token_exception(_token, _expected_token, _line, _col)
             
-        # get the next token from the lexer
-        _next_token = self.nextToken()
-        
-        # raise an exception if the next token is not the expected token
-        if _next_token != token:
-            raise_exception(token, _next_token)
-        
-        # push the token to the stack as an ASTNode and get the next token from the lexer
-        if not ignore:
-            self.__pushStack(ASTNode(self.nextToken()))
+        raise_exception(token, next_token)
+
+    def skip(self):
+        """
+        Gets the next token from the lexer without checking the current one, for a token the caller has checked.
+        """
         self.__setNextToken(self.__getTokenFromLexer())
-            
 
     def __getTokenFromLexer(self):
         """
@@ -0,0 +1,85 @@
+import json
+import os
+import struct
+
+
+class ProtocolException(Exception):
+    """Raised when a message of the evaluation server protocol can not be read."""
+
+
+class Protocol:
+    """
+    The protocol between the evaluation server and its clients, over a Unix socket.
+
+    A message is a JSON object encoded as UTF-8, prefixed with its length as a 4 byte big
+    endian unsigned integer. The client sends one request and the server answers with one
+    response, then the connection is closed.
+
+    A request holds the source of the program, the switch (-ast, -st or null) and the
+    options of the Interpreter: engine, optimize, memoize, memo_size (null for the default)
+    and cache (whether the server's cache of compiled programs is used), and the timeout,
+    the seconds the evaluation may take, at most the server's limit (the server's limit if
+    it is 0 or left out). A response holds the status ("ok", "error" or "timeout"), the output the program
+    would print to stdout with myrpal.py, the error message (null if it succeeded) and the
+    memo statistics (null if memoization is off).
+    """
+
+    HEADER = struct.Struct(">I")
+
+    # the largest message accepted
+    MAX_MESSAGE_SIZE = 256 * 1024 * 1024
+
+    OK = "ok"
+    ERROR = "error"
+    TIMEOUT = "timeout"
+
+    # the most seconds an evaluation may take on a server started without --timeout, a worker
+    # evaluates one request at a time so a long one keeps the requests queued behind it waiting
+    DEFAULT_TIMEOUT = 10
+    # the seconds a client waits to connect, and for the response beyond the time limit it asked for
+    CONNECT_TIMEOUT = 5
+    RESPONSE_GRACE = 5
+
+    @staticmethod
+    def defaultSocket():
+        """Returns the default path of the server socket, in the user's runtime directory."""
+        directory = os.environ.get("XDG_RUNTIME_DIR")
+        if directory:
+            return os.path.join(directory, "myrpal.sock")
+        return os.path.join("/tmp", f"myrpal-{os.getuid()}.sock")
+
+    @staticmethod
+    def send(sock, message):
+        """Sends the message, a JSON serializable dict."""
+        data = json.dumps(message).encode("utf-8")
+        sock.sendall(Protocol.HEADER.pack(len(data)) + data)
+
+    @staticmethod
+    def receive(sock):
+        """Receives a message, None if the connection was closed before it started."""
+        header = Protocol.__read(sock, Protocol.HEADER.size)
+        if header is None:
+            return None
+        size, = Protocol.HEADER.unpack(header)
+        if size > Protocol.MAX_MESSAGE_SIZE:
+            raise ProtocolException(f"The message is too large: {size} bytes")
+        data = Protocol.__read(sock, size)
+        if data is None:
+            raise ProtocolException("The connection was closed in the middle of a message")
+        try:
+            return json.loads(data.decode("utf-8"))
+        except ValueError as e:
+            raise ProtocolException(f"Invalid message: {e}")
+
+    @staticmethod
+    def __read(sock, size):
+        """Reads exactly size bytes, None if the connection is closed before the first one."""
+        chunks = bytearray()
+        while len(chunks) < size:
+            chunk = sock.recv(min(size - len(chunks), 1024 * 1024))
+            if not chunk:
+                if not chunks and size:
+                    return None
+                raise ProtocolException("The connection was closed in the middle of a message")
+            chunks += chunk
+        return bytes(chunks)
@@ -0,0 +1,238 @@
+import contextlib
+import io
+import os
+import signal
+import socket
+import sys
+
+from cache import MemoryProgramCache
+from cse_machine.output import StreamSink
+from interpreter import Interpreter
+from protocol import Protocol, ProtocolException
+from timelimit import TimeLimit, TimeoutException
+
+
+class EvaluationServer:
+    """
+    A daemon evaluating RPAL programs sent over a Unix socket (see Protocol).
+
+    The server imports the interpreter once, listens on the socket and forks its workers,
+    so a request pays neither the startup of python nor the imports. The workers accept the
+    connections on the shared socket, one at a time each, and keep the programs they compiled
+    in a MemoryProgramCache, so a program sent again is evaluated without the front end. A
+    worker which dies is replaced. Each evaluation has a time limit, so a program which never
+    ends does not keep its worker busy.
+
+    Attributes:
+        path (str): The path of the socket.
+        workers (int): The number of worker processes.
+        cacheBytes (int): The size cap of the compiled programs each worker keeps.
+        timeout (float): The most seconds an evaluation may take, None for no limit. A request may
+            ask for a lower limit.
+    """
+
+    BACKLOG = 128
+
+    # the seconds a worker waits for the request of a connection
+    RECEIVE_TIMEOUT = 10
+
+    def __init__(self, path = None, workers = None, cacheBytes = MemoryProgramCache.DEFAULT_MAX_BYTES,
+                 timeout = Protocol.DEFAULT_TIMEOUT):
+        self.path = path if path is not None else Protocol.defaultSocket()
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.cacheBytes = cacheBytes
+        self.timeout = timeout
+        self.__socket = None
+        self.__children = set()
+        self.__stopping = False
+
+    def serve(self):
+        """Listens on the socket and runs the workers until the server is terminated (SIGTERM or SIGINT)."""
+        # the workers are forked, so they run with the limit of the server
+        Interpreter.raiseRecursionLimit()
+        EvaluationServer.__preload()
+        self.__listen()
+        signal.signal(signal.SIGTERM, self.__stop)
+        signal.signal(signal.SIGINT, self.__stop)
+        try:
+            while not self.__stopping:
+                while len(self.__children) < self.workers and not self.__stopping:
+                    self.__fork()
+                try:
+                    pid, _ = os.wait()
+                except ChildProcessError:
+                    continue
+                self.__children.discard(pid)
+        finally:
+            for pid in self.__children:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except OSError:
+                    pass
+            for pid in list(self.__children):
+                try:
+                    os.waitpid(pid, 0)
+                except OSError:
+                    pass
+            self.__socket.close()
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def __preload():
+        """
+        Evaluates a program with each engine, so the modules the interpreter imports when a phase
+        first runs are imported before the workers are forked.
+        """
+        for engine in Interpreter.ENGINES:
+            EvaluationServer.evaluate({"source": "Print 0", "switch": None,
+                                       "options": {"engine": engine, "memoize": True}},
+                                      MemoryProgramCache(Interpreter.VERSION))
+
+    def __stop(self, signum, frame):
+        """Stops the workers, the server exits once os.wait sees them exit."""
+        self.__stopping = True
+        for pid in list(self.__children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+
+    def __listen(self):
+        """Binds the socket, replacing the socket file of a server which is not running anymore."""
+        if os.path.exists(self.path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.remove(self.path)
+            else:
+                raise OSError(f"A server is already listening on {self.path}")
+            finally:
+                probe.close()
+        self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.__socket.bind(self.path)
+        os.chmod(self.path, 0o600)
+        self.__socket.listen(EvaluationServer.BACKLOG)
+
+    def __fork(self):
+        pid = os.fork()
+        if pid:
+            self.__children.add(pid)
+            return
+        # the worker
+        status = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            self.__work(MemoryProgramCache(Interpreter.VERSION, self.cacheBytes))
+        except BaseException:
+            status = 1
+        finally:
+            os._exit(status)
+
+    def __work(self, cache):
+        """Accepts the connections and answers their requests, in a worker."""
+        while True:
+            connection, _ = self.__socket.accept()
+            with connection:
+                try:
+                    connection.settimeout(EvaluationServer.RECEIVE_TIMEOUT)
+                    request = Protocol.receive(connection)
+                    if request is None:
+                        continue
+                    Protocol.send(connection, EvaluationServer.evaluate(request, cache, self.timeout))
+                except (OSError, ProtocolException):
+                    # the client went away or sent garbage, it gets no answer
+                    pass
+
+    @staticmethod
+    def evaluate(request, cache = None, timeout = None):
+        """
+        Evaluates the program of a request and returns the response.
+
+        The output is what myrpal.py would print to stdout: the messages of the interpreter,
+        the output of the program and the result. The evaluation may take the seconds of the
+        timeout of the request, at most timeout (None for no limit), or timeout if the request
+        gives none or 0.
+        """
+        output = io.StringIO()
+        options = request.get("options", {})
+        switch = request.get("switch")
+        seconds = timeout
+        try:
+            requested = request.get("timeout")
+            if requested is not None and (not isinstance(requested, (int, float)) or requested < 0):
+                raise ValueError(f"Invalid timeout {requested!r}, expected a number of seconds (0 for the server's limit)")
+            if requested:
+                seconds = min(requested, timeout) if timeout else requested
+            with TimeLimit(seconds), contextlib.redirect_stdout(output):
+                interpreter = Interpreter(request["source"], switch,
+                                          engine=options.get("engine"),
+                                          optimize=options.get("optimize", True),
+                                          memoize=options.get("memoize", False),
+                                          memo_size=options.get("memo_size"),
+                                          cache=cache if options.get("cache", True) else None,
+                                          output=StreamSink(output))
+                interpreter.interpret()
+                error = interpreter.get_error()
+                try:
+                    print(interpreter.get_result(switch))
+                except AttributeError:
+                    # there is no output when the evaluation failed, myrpal.py raises here
+                    pass
+        except TimeoutException:
+            return {"status": Protocol.TIMEOUT, "output": output.getvalue(),
+                    "error": f"Timed out after {seconds} seconds", "memo": None}
+        except Exception as e:
+            # an invalid request
+            return {"status": Protocol.ERROR, "output": output.getvalue(), "error": f"{e.__class__.__name__}: {e}",
+                    "memo": None}
+
+        memo = interpreter.get_memo_stats()
+        return {"status": Protocol.OK if error is None else Protocol.ERROR, "output": output.getvalue(),
+                "error": None if error is None else str(error), "memo": None if memo is None else str(memo)}
+
+
+def main():
+    """
+    Starts the evaluation server.
+
+    Usage: python3 server.py [--socket=<path>] [--workers=<n>] [--cache-size=<MiB>] [--timeout=<seconds>]
+    """
+    options = {}
+    for arg in sys.argv[1:]:
+        name, _, value = arg.partition("=")
+        if name not in ["--socket", "--workers", "--cache-size", "--timeout"] or value == "":
+            print(main.__doc__.strip().splitlines()[-1])
+            exit(1)
+        options[name[2:]] = value
+
+    for name in ["workers", "cache-size"]:
+        if name in options and (not options[name].isdigit() or int(options[name]) < 1):
+            print(f"Invalid value {options[name]} for --{name}, expected a positive integer")
+            exit(1)
+    timeout = options.get("timeout", Protocol.DEFAULT_TIMEOUT)
+    try:
+        timeout = float(timeout)
+    except ValueError:
+        timeout = -1
+    if timeout < 0:
+        print(f"Invalid value {options['timeout']} for --timeout, expected a number of seconds (0 for no limit)")
+        exit(1)
+
+    server = EvaluationServer(options.get("socket"),
+                              int(options["workers"]) if "workers" in options else None,
+                              int(options["cache-size"]) * 1024 * 1024 if "cache-size" in options
+                                  else MemoryProgramCache.DEFAULT_MAX_BYTES,
+                              timeout or None)
+    try:
+        server.serve()
+    except OSError as e:
+        print(e)
+        exit(1)
+
+if __name__ == "__main__":
+    main()
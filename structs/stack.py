@@ -1,28 +1,30 @@
-from typing import Generic, TypeVar
+import types
 
-T = TypeVar('T')
-
-class Stack(Generic[T]):
+class Stack:
     """
     A generic stack implementation.
     
     """
+    # the type of the items is given as Stack[T] in annotations, without importing typing,
+    # which is slow to import
+    __class_getitem__ = classmethod(types.GenericAlias)
+
     def __init__(self) -> None:
-        self.items: list[T] = []
+        self.items: list = []
 
     def is_empty(self) -> bool:
         return len(self.items) == 0
 
-    def push(self, item: T) -> None:
+    def push(self, item) -> None:
         self.items.append(item)
 
-    def pop(self) -> T:
+    def pop(self):
         if not self.is_empty():
             return self.items.pop()
         else:
             raise IndexError("pop from an empty stack")
 
-    def peek(self) -> T:
+    def peek(self):
         if not self.is_empty():
             return self.items[-1]
         else:
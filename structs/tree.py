@@ -6,6 +6,9 @@ class BinaryTreeNode:
         __left: The left child of the node.
         __right: The right child of the node.
     """
+
+    __slots__ = ("__value", "__left", "__right")
+
     def __init__(self, value, left=None, right=None):
         self.__value = value
         self.__left = left
@@ -48,11 +51,24 @@ class BinaryTreeNode:
     @classmethod
     def deep_copy(cls, node):
         """
-        Creates a new deep copy of the given node.
+        Creates a new deep copy of the given node, with its children and right siblings.
         """
         if node is None:
             return None
-        return cls(node.getValue(), BinaryTreeNode.deep_copy(node.getLeft()), BinaryTreeNode.deep_copy(node.getRight()))
+        root = cls(node.getValue())
+        # (original node, its copy)
+        pending = [(node, root)]
+        while pending:
+            original, copy = pending.pop()
+            left = original.getLeft()
+            if left is not None:
+                copy.setLeft(cls(left.getValue()))
+                pending.append((left, copy.getLeft()))
+            right = original.getRight()
+            if right is not None:
+                copy.setRight(cls(right.getValue()))
+                pending.append((right, copy.getRight()))
+        return root
 
 
     def is_name(self):
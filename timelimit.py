@@ -0,0 +1,46 @@
+import signal
+
+
+class TimeoutException(BaseException):
+    """
+    Raised in the block of a TimeLimit once it has run out of time.
+
+    It is not an Exception, so the interpreter and the engines, which catch the errors of the
+    program they evaluate, let it through.
+    """
+
+
+class TimeLimit:
+    """
+    A context manager which raises TimeoutException in its block once it has run for the given seconds.
+
+    Used by the workers of the batch mode and of the evaluation server, so a program which
+    never ends does not keep its worker busy. It uses the real time interval timer, which
+    interrupts the main thread, so there is no limit where the timer is not available (Windows).
+
+    Attributes:
+        seconds (float): The seconds the block may take, None or 0 for no limit.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.__previous = None
+        self.__active = False
+
+    def __enter__(self):
+        if self.seconds and hasattr(signal, "setitimer"):
+            self.__previous = signal.signal(signal.SIGALRM, TimeLimit.__expired)
+            self.__active = True
+            signal.setitimer(signal.ITIMER_REAL, self.seconds)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.__active:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self.__previous)
+            self.__active = False
+        return False
+
+    @staticmethod
+    def __expired(signum, frame):
+        raise TimeoutException()
@@ -1,4 +1,6 @@
-from typing import Tuple
+import mmap
+import os
+import re
 
 
 def read_file(file):
@@ -11,24 +13,116 @@ def read_file(file):
         print(f"File {file} not found.")
         exit(1)
 
-__RUN_COMMAND_USAGE = "Usage: python3 myrpal.py [-ast, -st] <file_name>\nRequired: <file_name>\nOptional: -as"
+# files from this size on are memory-mapped rather than read into a string
+MMAP_THRESHOLD = 16 * 1024 * 1024
 
-def init_args(args)->Tuple[str, str]:
+# the bytes a file read as text would differ in: decoded characters and translated newlines
+__NOT_PLAIN_ASCII = re.compile(rb"[^\x00-\x7f]|\r")
+
+def map_file(file):
+    """
+    Memory-maps a file and returns its bytes, None if it is empty or not plain ASCII.
+
+    The bytes are only returned if the lexer reads them as it reads the contents of the file
+    as text: ASCII only and with no carriage returns, which text mode translates to newlines.
+    """
+    try:
+        with open(file, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        print(f"File {file} not found.")
+        exit(1)
+    if __NOT_PLAIN_ASCII.search(content):
+        content.close()
+        return None
+    return content
+
+def read_program(file):
+    """
+    Returns the program in a file, memory-mapped if the file is at least MMAP_THRESHOLD bytes 
+    and plain ASCII, read as a string otherwise.
+    """
+    try:
+        size = os.path.getsize(file)
+    except OSError:
+        size = 0
+    if size >= MMAP_THRESHOLD:
+        content = map_file(file)
+        if content is not None:
+            return content
+    return read_file(file)
+
+__RUN_COMMAND_USAGE = ("Usage: python3 myrpal.py [-ast, -st] [--engine=cse|vm|closure] [--no-optimize] "
+                       "[--memoize] [--memo-size=<n>] [--memo-stats] [--no-cache] [--cache-dir=<dir>] <file_name>\n"
+                       "       python3 myrpal.py --batch [--jobs=<n>] [--timeout=<seconds>] [--results=<file>] "
+                       "[options] <directory, glob or manifest>\n"
+                       "Required: <file_name>\n"
+                       "Optional: -ast, -st, --engine, --no-optimize, --memoize, --memo-size, --memo-stats, "
+                       "--no-cache, --cache-dir, --batch, --jobs, --timeout, --results")
+
+# long options that take a value, with the allowed values (None allows any value)
+__VALUE_OPTIONS = {
+    "engine": ["cse", "vm", "closure"],
+    "memo-size": None,
+    "cache-dir": None,
+    "jobs": None,
+    "timeout": None,
+    "results": None,
+}
+
+# long options that are flags, given without a value
+__FLAG_OPTIONS = {"no-optimize", "memoize", "memo-stats", "no-cache", "batch"}
+
+def init_args(args)->tuple[str, str, dict]:
     
-    """Takes command line arguments as input and returns the file name and switch"""
+    """
+    Takes command line arguments as input and returns the file name, switch and options.
+    
+    Switches start with a single "-" (-ast, -st). Long options start with "--", and are 
+    given as --name=value or --name value, or are flags given without a value. An unknown
+    option, or a flag given a value, prints the usage and exits.
+    """
     
     switch:str = None
     file_name = ""
+    options = {}
     
     if len(args) < 2:
         print(__RUN_COMMAND_USAGE)
         exit(1)
     
-    if len(args) > 2:
-        file_name = args[2]
-        if str.startswith(args[1], "-"):
-            switch = args[1]
-    else:
-        file_name = args[1]
+    i = 1
+    while i < len(args):
+        arg = args[i]
+        if str.startswith(arg, "--"):
+            name, _, value = arg[2:].partition("=")
+            if name in __VALUE_OPTIONS:
+                if value == "":
+                    i += 1
+                    if i == len(args):
+                        print(__RUN_COMMAND_USAGE)
+                        exit(1)
+                    value = args[i]
+                choices = __VALUE_OPTIONS[name]
+                if choices is not None and value not in choices:
+                    print(f"Invalid value {value} for --{name}, expected one of {', '.join(choices)}")
+                    exit(1)
+                options[name] = value
+            elif name in __FLAG_OPTIONS and "=" not in arg:
+                options[name] = True
+            else:
+                print(__RUN_COMMAND_USAGE)
+                exit(1)
+        elif str.startswith(arg, "-"):
+            switch = arg
+        else:
+            file_name = arg
+        i += 1
+
+    if file_name == "":
+        print(__RUN_COMMAND_USAGE)
+        exit(1)
         
-    return file_name, switch
\ No newline at end of file
+    return file_name, switch, options